@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: nested instances × alarms matching vs. AlarmIndex lookups.
+
+Builds synthetic fleets (100, 1 000 and 5 000 instances) with a realistic alarm mix
+(CPU, RAM, ping, 2 per disk with InstanceId dimension plus SSM/SAP alarms with Server
+dimension), checks that both strategies attach exactly the same alarms, and prints timings.
+
+Usage:
+    python ScriptsUtil/benchmark_alarm_index.py
+    python ScriptsUtil/benchmark_alarm_index.py --sizes 100 1000 --full
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import time
+from utils.alarm_index import AlarmIndex
+
+
+def build_fleet(num_instances, seed=42):
+    """Create synthetic instances (id, name) and their alarms."""
+    rng = random.Random(seed)
+    instances = []
+    alarms = []
+
+    for i in range(num_instances):
+        instance_id = f"i-{i:017x}"
+        instance_name = f"SRVBENCH{i:05d}"
+        instances.append((instance_id, instance_name))
+
+        disks = rng.randint(1, 4)
+        for metric in ['CPU', 'RAM', 'PING'] + [f'DISK{d}' for d in range(disks * 2)]:
+            alarms.append({
+                'AlarmName': f"EPMAPS PROD {instance_name} INCIDENTE {metric}",
+                'StateValue': rng.choice(['OK', 'OK', 'OK', 'ALARM', 'INSUFFICIENT_DATA']),
+                'Dimensions': [
+                    {'Name': 'InstanceId', 'Value': instance_id},
+                    {'Name': 'ImageId', 'Value': 'ami-0123456789'},
+                ]
+            })
+
+        # Roughly 1 in 12 alarms uses the Server dimension (63/841 in production)
+        if rng.random() < 0.7:
+            alarms.append({
+                'AlarmName': f"EPMAPS PROD {instance_name} INCIDENTE SAP SERVICES",
+                'StateValue': 'OK',
+                'Dimensions': [{'Name': 'Server', 'Value': instance_name.lower()}]
+            })
+
+    rng.shuffle(alarms)
+    return instances, alarms
+
+
+def match_nested(instances, alarms):
+    """Original strategy: scan every alarm for every instance."""
+    result = {}
+    for instance_id, instance_name in instances:
+        matched = []
+        for alarm in alarms:
+            dimensions = alarm.get('Dimensions', [])
+            if (any(d['Name'] == 'InstanceId' and d['Value'] == instance_id for d in dimensions) or
+                    any(d['Name'] == 'Server' and d['Value'].upper() == instance_name.upper() for d in dimensions)):
+                matched.append(alarm)
+        result[instance_id] = matched
+    return result
+
+
+def match_indexed(instances, alarms):
+    """New strategy: build the index once, then one lookup per instance."""
+    alarm_index = AlarmIndex(alarms)
+    return {
+        instance_id: alarm_index.alarms_for_instance(instance_id, instance_name)
+        for instance_id, instance_name in instances
+    }
+
+
+def run_benchmark(size, full, sample_size):
+    """Time both strategies on one fleet size and verify they agree."""
+    instances, alarms = build_fleet(size)
+
+    start = time.perf_counter()
+    indexed = match_indexed(instances, alarms)
+    indexed_seconds = time.perf_counter() - start
+
+    # The nested loop is linear in the number of instances for a fixed alarm set,
+    # so on big fleets we time a sample and scale it unless --full is given.
+    sample = instances if full or size <= sample_size else instances[:sample_size]
+    start = time.perf_counter()
+    nested = match_nested(sample, alarms)
+    nested_seconds = (time.perf_counter() - start) * (len(instances) / len(sample))
+    estimated = len(sample) != len(instances)
+
+    for instance_id, _ in sample:
+        if [id(a) for a in nested[instance_id]] != [id(a) for a in indexed[instance_id]]:
+            raise AssertionError(f"Mismatch for {instance_id}")
+
+    return {
+        'instances': size,
+        'alarms': len(alarms),
+        'nested': nested_seconds,
+        'indexed': indexed_seconds,
+        'estimated': estimated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark alarm-to-instance matching")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--full', action='store_true', help="Time the nested loop on every instance (slow)")
+    parser.add_argument('--sample-size', type=int, default=200)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Alarm matching benchmark: nested loop vs. AlarmIndex")
+    print("=" * 80)
+    print(f"{'Instances':>10} {'Alarms':>8} {'Nested (s)':>14} {'Index (s)':>12} {'Speedup':>10}")
+
+    for size in args.sizes:
+        r = run_benchmark(size, args.full, args.sample_size)
+        nested_label = f"{r['nested']:.3f}{'*' if r['estimated'] else ''}"
+        speedup = r['nested'] / r['indexed'] if r['indexed'] > 0 else float('inf')
+        print(f"{r['instances']:>10} {r['alarms']:>8} {nested_label:>14} {r['indexed']:>12.4f} {speedup:>9.0f}x")
+
+    print()
+    print("* estimated from a sample of instances (run with --full for the exact time)")
+    print("✅ Both strategies attached the same alarms, in the same order")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs. concurrent EC2/CloudWatch collection in AWSService.get_aws_data.
+
+Real boto3 clients are answered by an in-process fixture hooked on botocore's
+before-call event (the same mechanism botocore's Stubber uses). Unlike Stubber, the
+fixture does not depend on call order, so it can serve concurrent requests. Every call
+sleeps a fixed latency to simulate the round trip, and the fixture pages like AWS does:
+up to 1 000 instances per describe_instances page and 100 alarms per describe_alarms page.
+
+Usage:
+    python ScriptsUtil/benchmark_parallel_collection.py
+    python ScriptsUtil/benchmark_parallel_collection.py --instances 500 --latency 0.15
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+import boto3
+from botocore.awsrequest import AWSResponse
+from services.aws_service import AWSService
+from utils.alarm_index import AlarmIndex
+
+EC2_PAGE_SIZE = 1000
+ALARM_PAGE_SIZE = 100
+
+
+def build_fleet(num_instances, seed=42):
+    """Create synthetic describe_instances records and their alarms."""
+    rng = random.Random(seed)
+    instances = []
+    alarms = []
+
+    for i in range(num_instances):
+        instance_id = f"i-{i:017x}"
+        instance_name = f"SRVBENCH{i:05d}"
+        disks = rng.randint(1, 4)
+        instances.append({
+            'InstanceId': instance_id,
+            'State': {'Name': 'running'},
+            'PrivateIpAddress': f"10.0.{i // 250}.{i % 250}",
+            'PlatformDetails': 'Linux/UNIX',
+            'BlockDeviceMappings': [{'DeviceName': f"/dev/sd{chr(97 + d)}"} for d in range(disks)],
+            'Tags': [
+                {'Key': 'Name', 'Value': instance_name},
+                {'Key': 'DashboardGroup', 'Value': rng.choice(['ERP', 'CRM', 'BI'])},
+                {'Key': 'Environment', 'Value': rng.choice(['Production', 'QA', 'DEV'])},
+            ],
+        })
+
+        for metric in ['CPU', 'RAM', 'PING'] + [f'DISK{d}' for d in range(disks * 2)]:
+            alarms.append({
+                'AlarmName': f"EPMAPS PROD {instance_name} INCIDENTE {metric}",
+                'StateValue': rng.choice(['OK', 'OK', 'OK', 'ALARM', 'INSUFFICIENT_DATA']),
+                'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}],
+            })
+
+    alarms.sort(key=lambda alarm: alarm['AlarmName'])
+    return instances, alarms
+
+
+class LatencyFixture:
+    """Answers ec2/cloudwatch calls from memory after a simulated round trip."""
+
+    def __init__(self, instances, alarms, latency):
+        """Initialize with the fleet to serve and the per-call latency in seconds."""
+        self.instances = instances
+        self.alarms = alarms
+        self.latency = latency
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def attach(self, client):
+        """Register the fixture on a client so no request leaves the process."""
+        client.meta.events.register('before-parameter-build', self._capture_params)
+        client.meta.events.register_first('before-call', self._respond)
+        return client
+
+    @staticmethod
+    def _capture_params(params, context, **kwargs):
+        context['benchmark_params'] = dict(params)
+
+    def _respond(self, model, context, **kwargs):
+        params = context.get('benchmark_params', {})
+        with self._lock:
+            self.calls[model.name] += 1
+        time.sleep(self.latency)
+
+        if model.name == 'DescribeInstances':
+            body = self._page(self.instances, params, EC2_PAGE_SIZE, 'Reservations')
+            body['Reservations'] = [{'Instances': body['Reservations']}]
+        elif model.name == 'DescribeAlarms':
+            alarms = self.alarms
+            if params.get('StateValue'):
+                alarms = [a for a in alarms if a['StateValue'] == params['StateValue']]
+            body = self._page(alarms, params, ALARM_PAGE_SIZE, 'MetricAlarms')
+        else:
+            raise ValueError(f"Unexpected operation {model.name}")
+
+        return AWSResponse(None, 200, {}, None), body
+
+    @staticmethod
+    def _page(items, params, page_size, key):
+        start = int(params.get('NextToken') or 0)
+        body = {key: items[start:start + page_size]}
+        if start + page_size < len(items):
+            body['NextToken'] = str(start + page_size)
+        return body
+
+
+def collect_sequential(ec2, cloudwatch):
+    """Original strategy: describe_instances pages, then describe_alarms pages, one call at a time."""
+    instances = []
+    for page in ec2.get_paginator('describe_instances').paginate(
+            Filters=[{'Name': 'tag-key', 'Values': ['DashboardGroup']}]):
+        for reservation in page['Reservations']:
+            instances.extend(reservation['Instances'])
+
+    alarms = []
+    for page in cloudwatch.get_paginator('describe_alarms').paginate():
+        alarms.extend(page['MetricAlarms'])
+
+    alarm_index = AlarmIndex(alarms)
+    return {
+        instance['InstanceId']: Counter(
+            alarm['StateValue'] for alarm in alarm_index.alarms_for_instance(instance['InstanceId'], '')
+        )
+        for instance in instances
+    }
+
+
+def run_benchmark(num_instances, latency):
+    """Time both strategies on one fleet and verify they count the same alarms."""
+    instances, alarms = build_fleet(num_instances)
+    fixture = LatencyFixture(instances, alarms, latency)
+    clients = {
+        name: fixture.attach(boto3.client(name, region_name='us-east-1',
+                                          aws_access_key_id='x', aws_secret_access_key='x'))
+        for name in ('ec2', 'cloudwatch')
+    }
+
+    start = time.perf_counter()
+    sequential = collect_sequential(clients['ec2'], clients['cloudwatch'])
+    sequential_seconds = time.perf_counter() - start
+    sequential_calls = sum(fixture.calls.values())
+
+    fixture.calls.clear()
+    aws_service = AWSService()
+    aws_service.get_cross_account_boto3_client = clients.get
+    start = time.perf_counter()
+    concurrent = aws_service.get_aws_data()
+    concurrent_seconds = time.perf_counter() - start
+    concurrent_calls = sum(fixture.calls.values())
+
+    for instance in concurrent:
+        if Counter(instance['Alarms']) != sequential[instance['ID']]:
+            raise AssertionError(f"Mismatch for {instance['ID']}")
+    if len(concurrent) != len(sequential):
+        raise AssertionError("Different number of instances")
+
+    return {
+        'instances': num_instances,
+        'alarms': len(alarms),
+        'sequential': sequential_seconds,
+        'sequential_calls': sequential_calls,
+        'concurrent': concurrent_seconds,
+        'concurrent_calls': concurrent_calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs. concurrent inventory collection")
+    parser.add_argument('--instances', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--latency', type=float, default=0.1, help="Simulated seconds per API call")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"Inventory collection benchmark (simulated latency {args.latency * 1000:.0f} ms per call)")
+    print("=" * 80)
+    print(f"{'Instances':>10} {'Alarms':>8} {'Sequential (s)':>16} {'Concurrent (s)':>16} {'Speedup':>9}")
+
+    for size in args.instances:
+        r = run_benchmark(size, args.latency)
+        speedup = r['sequential'] / r['concurrent'] if r['concurrent'] > 0 else float('inf')
+        sequential_label = f"{r['sequential']:.2f} ({r['sequential_calls']})"
+        concurrent_label = f"{r['concurrent']:.2f} ({r['concurrent_calls']})"
+        print(f"{r['instances']:>10} {r['alarms']:>8} {sequential_label:>16} {concurrent_label:>16} {speedup:>8.1f}x")
+
+    print()
+    print("(n) = number of API calls")
+    print("✅ Both strategies attached the same alarm states to every instance")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@ Dashboard Manager class that coordinates all components while preserving origina
 """
 import streamlit as st
 import yaml
-from services.aws_service import AWSService
+from services.inventory_collector import get_inventory_collector
+from services.job_queue import DEFAULT_JOB_TTL, DEFAULT_JOB_WORKERS, get_job_queue
 from ui_components.dashboard_ui import DashboardUI
 from ui_components.detail_ui import DetailUI
 from ui_components.alarm_report_ui import AlarmReportUI
@@ -11,6 +12,7 @@ from ui_components.monthly_report_ui import MonthlyReportUI
 from ui_components.alarm_health_ui import AlarmHealthUI
 from utils.helpers import load_css
 from utils.auth import get_authenticator
+from utils.debug_log import setup_logging
 
 
 class DashboardManager:
@@ -22,19 +24,41 @@ class DashboardManager:
         with open("config.yaml", "r") as f:
             self.config = yaml.safe_load(f)
         
-        # Initialize services
-        self.aws_service = AWSService()
-        
-        # Initialize UI components
-        self.dashboard_ui = DashboardUI(self.aws_service)
-        self.detail_ui = DetailUI(self.aws_service)
-        self.alarm_report_ui = AlarmReportUI(self.aws_service)
-        self.monthly_report_ui = MonthlyReportUI(self.aws_service)
-        self.alarm_health_ui = AlarmHealthUI(self.aws_service)
-        
         # Configuration values
         self.show_aws_errors = self.config['settings']['show_aws_errors']
         self.refresh_interval = self.config['settings']['refresh_interval_seconds']
+
+        # Configure the shared debug logger before any service starts logging
+        setup_logging(self.config['settings'].get('log_level', 'INFO'))
+
+        # Initialize services (shared by every session through the inventory collector);
+        # one AWSService per (account role, region) target, collected in parallel
+        self.inventory = get_inventory_collector(
+            self.refresh_interval,
+            self.config.get('aws_targets'),
+            self.config['settings'].get('metric_store_dir')
+        )
+        self.aws_service = self.inventory.aws_service
+
+        # Background workers for the long reports (shared by every session, like the inventory)
+        self.job_queue = get_job_queue(
+            self.config['settings'].get('report_job_workers', DEFAULT_JOB_WORKERS),
+            self.config['settings'].get('report_job_ttl_seconds', DEFAULT_JOB_TTL)
+        )
+        
+        # Initialize UI components
+        self.dashboard_ui = DashboardUI(self.aws_service, self.inventory)
+        self.detail_ui = DetailUI(self.aws_service, self.inventory)
+        self.alarm_report_ui = AlarmReportUI(self.aws_service, self.inventory)
+        self.monthly_report_ui = MonthlyReportUI(
+            self.aws_service,
+            self.inventory,
+            self.job_queue,
+            pdf_chart_renderer=self.config['settings'].get('pdf_chart_renderer', 'native'),
+            pdf_render_workers=self.config['settings'].get('pdf_render_workers')
+        )
+        self.alarm_health_ui = AlarmHealthUI(self.aws_service, self.job_queue)
+        
         self.app_version = self.config['settings']['version']
         self.authenticator = get_authenticator()
     
@@ -0,0 +1,176 @@
+"""
+API Rate Limiter - Process-wide token buckets for the CloudWatch APIs of each account and region, with adaptive backoff.
+"""
+import streamlit as st
+import random
+import threading
+import time
+from functools import partial
+from typing import Dict
+from utils.debug_log import get_logger
+
+
+logger = get_logger('api_rate_limiter')
+
+# Requests per second per API and (account, region). Kept well below the account quotas (GetMetricStatistics 400,
+# GetMetricData 50, ListMetrics 25, DescribeAlarms 9 TPS) because other tools share them.
+DEFAULT_API_RATES = {
+    'GetMetricStatistics': 50.0,
+    'GetMetricData': 10.0,
+    'ListMetrics': 10.0,
+    'DescribeAlarms': 5.0,
+}
+
+THROTTLING_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestLimitExceeded',
+    'TooManyRequestsException', 'RequestThrottled', 'RequestThrottledException',
+}
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to throttling (AIMD).
+
+    Every throttled response halves the rate and pauses the bucket for a jittered,
+    exponentially growing cooldown; every successful response adds back a small step
+    until the configured rate is reached again.
+    """
+
+    def __init__(self, rate: float, burst: float = None, min_rate: float = 0.5,
+                 base_cooldown: float = 0.5, max_cooldown: float = 20.0):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Target requests per second
+            burst: Bucket capacity (defaults to one second of traffic)
+            min_rate: Lowest rate the bucket backs off to
+            base_cooldown: Pause after the first throttle, doubled on each consecutive one
+            max_cooldown: Upper bound for the pause
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.min_rate = min(min_rate, rate)
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available (and any throttling cooldown has passed)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase back towards the configured rate."""
+        with self._lock:
+            self._consecutive_throttles = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def on_throttle(self) -> float:
+        """
+        Multiplicative decrease plus a jittered pause.
+
+        Returns:
+            The cooldown applied, in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._consecutive_throttles += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+
+            backoff = min(self.max_cooldown, self.base_cooldown * 2 ** (self._consecutive_throttles - 1))
+            cooldown = random.uniform(backoff / 2, backoff)
+            self._paused_until = max(self._paused_until, now + cooldown)
+            return cooldown
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill (caller holds the lock)."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+
+class ApiRateLimiter:
+    """
+    One TokenBucket per API operation, shared by every client it is attached to.
+
+    CloudWatch throttles per account and region, so one limiter is used per
+    (account, region) pair (see get_api_rate_limiter), whatever the number of
+    AWSService objects or roles that reach it.
+
+    attach() hooks the buckets into botocore's event system, so every HTTP attempt
+    (retries included) of a limited operation waits for a token, whichever code path
+    made the call. Operations without a bucket are not limited.
+    """
+
+    def __init__(self, rates: Dict[str, float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rates: Operation name -> requests per second (defaults to DEFAULT_API_RATES)
+        """
+        self.buckets = {
+            operation: TokenBucket(rate)
+            for operation, rate in (rates or DEFAULT_API_RATES).items()
+        }
+
+    def attach(self, client):
+        """Register the limiter on a boto3 client (called once per created client)."""
+        service_id = client.meta.service_model.service_id.hyphenize()
+        operation_names = client.meta.service_model.operation_names
+
+        for operation, bucket in self.buckets.items():
+            if operation not in operation_names:
+                continue
+            client.meta.events.register(
+                f'before-send.{service_id}.{operation}', partial(self._before_send, bucket)
+            )
+            client.meta.events.register(
+                f'needs-retry.{service_id}.{operation}', partial(self._after_attempt, bucket)
+            )
+        return client
+
+    @staticmethod
+    def _before_send(bucket, **kwargs):
+        bucket.acquire()
+
+    @staticmethod
+    def _after_attempt(bucket, response=None, attempts=1, operation=None, **kwargs):
+        # Returning None leaves the retry decision to botocore's retry handler
+        if response is None:
+            return None
+
+        http_response, parsed = response
+        error_code = parsed.get('Error', {}).get('Code') if isinstance(parsed, dict) else None
+        if error_code in THROTTLING_ERROR_CODES or http_response.status_code == 429:
+            cooldown = bucket.on_throttle()
+            logger.warning("%s throttled (attempt %d): rate lowered to %.1f/s, pausing %.2fs",
+                           getattr(operation, 'name', 'API call'), attempts, bucket.rate, cooldown)
+        elif http_response.status_code < 400:
+            bucket.on_success()
+        return None
+
+
+@st.cache_resource
+def get_api_rate_limiter(account_id: str, region: str) -> ApiRateLimiter:
+    """
+    Get the process-wide limiter of an account and region.
+    Cached with st.cache_resource so every AWSService of the same target shares one budget.
+    """
+    return ApiRateLimiter()
@@ -0,0 +1,372 @@
+"""
+Availability Rollups - Daily availability counts of closed days, summed by monthly, quarterly and year-to-date reports.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from services.metric_store import SECONDS_PER_DAY
+from services.timeseries_cache import from_epoch, to_epoch
+from utils.availability_calculator import AvailabilityCalculator
+from utils.debug_log import get_logger
+
+
+logger = get_logger('availability_rollups')
+
+PING_NAMESPACE = 'EC2/ICMPHealthcheck'
+
+# Environments of the availability reports (Production includes Production-Burbuja)
+REPORT_ENVIRONMENTS = ('Production', 'QA', 'DEV')
+
+# Seconds between checks of the rollup worker for a newly closed day
+DEFAULT_ROLLUP_CHECK_INTERVAL = 600
+
+# Closed days the rollup worker backfills per pass (newest first), so the first start
+# does not fetch the whole year of the fleet at once through the shared rate limiter
+DEFAULT_ROLLUP_BACKFILL_DAYS = 7
+
+
+def ping_query(instance: dict, period: int) -> dict:
+    """GetMetricData query of the PingReachable series of an instance."""
+    # The EC2/ICMPHealthcheck namespace requires BOTH dimensions (InstanceId and Name)
+    return {
+        'Key': instance['ID'],
+        'Namespace': PING_NAMESPACE,
+        'MetricName': 'PingReachable',
+        'Dimensions': [
+            {'Name': 'InstanceId', 'Value': instance['ID']},
+            {'Name': 'Name', 'Value': instance['Name']}
+        ],
+        'Stat': 'Maximum',
+        'Period': period
+    }
+
+
+def sap_namespace(environment: str) -> str:
+    """CloudWatch namespace of the SAP heartbeat metrics of an environment."""
+    if environment and environment.upper() == 'PRODUCTION':
+        return 'SAP_Monitoring_Availability_Prod'
+    return 'SAP_Monitoring_Availability'
+
+
+def sap_service_name(metric_name: str, instance_name: str) -> str:
+    """SAP service of a heartbeat metric (e.g., ERQ_ASCS01 from SRVERPQA_ERQ_ASCS01_heartbeat)."""
+    # Format: {ServerName}_{System}_{Service}_heartbeat
+    service_name = metric_name.replace('_heartbeat', '').replace(f'{instance_name}_', '').replace(f'{instance_name}-', '')
+    if not service_name or service_name == metric_name:
+        # Fallback if pattern doesn't match
+        service_name = metric_name.split('_')[0] if '_' in metric_name else metric_name
+    return service_name
+
+
+def availability_series(aws_service, instance: dict, environment: str) -> List[Tuple[str, dict]]:
+    """
+    Series of the availability percentage of one instance: its ping and every SAP service.
+
+    Args:
+        aws_service: AWSService of the target the instance belongs to
+        instance: Instance dict with ID and Name
+        environment: Report environment ('Production', 'QA' or 'DEV')
+
+    Returns:
+        List of (service name, query) with 'Ping' first; queries have Key, Namespace,
+        MetricName and Dimensions (count_queries sets the statistic and period)
+    """
+    ping = ping_query(instance, period=60)
+    series = [('Ping', {key: ping[key] for key in ('Key', 'Namespace', 'MetricName', 'Dimensions')})]
+
+    namespace = sap_namespace(environment)
+    for metric_info in aws_service.get_availability_metrics_for_instance(instance['ID'], environment):
+        metric_name = metric_info['MetricName']
+        series.append((sap_service_name(metric_name, instance['Name']), {
+            'Key': (instance['ID'], metric_name),
+            'Namespace': namespace,
+            'MetricName': metric_name,
+            'Dimensions': metric_info.get('Dimensions', [])
+        }))
+    return series
+
+
+def count_queries(query: dict, schedule_tag: Optional[str]) -> list:
+    """
+    Sum and SampleCount variants of the query of a 0/1 series, aggregated by CloudWatch.
+
+    Series with a schedule use hourly buckets (the granularity of the schedule rules);
+    the others one bucket per day.
+    """
+    period = 3600 if schedule_tag in AvailabilityCalculator.SCHEDULES else 86400
+    return [
+        {**query, 'Key': (query['Key'], stat), 'Stat': stat, 'Period': period}
+        for stat in ('Sum', 'SampleCount')
+    ]
+
+
+class AvailabilityRollups:
+    """
+    Daily availability counts (AvailabilityCalculator.ROLLUP_COUNTS) of closed UTC days.
+
+    A closed day is rolled up once, from its complete datapoints in the metric store,
+    and the counts are kept per series, schedule and day. The availability of any range
+    is then the sum of the rollups of its closed days plus a calculation over the
+    datapoints of the remaining (open or partial) days only, so a year-to-date report
+    reads a few hundred rows per series instead of scanning its datapoints.
+    Without a metric store everything is calculated from datapoints.
+    """
+
+    def __init__(self, aws_service):
+        """
+        Initialize the rollups of one target.
+
+        Args:
+            aws_service: AWSService of the target (its metric_store keeps the rollups)
+        """
+        self.aws_service = aws_service
+        self.store = aws_service.metric_store
+
+    def calculate(self, query: dict, df: pd.DataFrame, schedule_tag: Optional[str],
+                  start_time: datetime, end_time: datetime, value_column: str = 'Maximum') -> dict:
+        """
+        Availability of an already fetched series of raw 0/1 datapoints (chart reports).
+
+        Args:
+            query: get_metric_data_history query of the series
+            df: Datapoints of the series within start_time and end_time
+            schedule_tag: Schedule tag of the instance
+
+        Returns:
+            Same dictionary as AvailabilityCalculator.calculate_availability
+        """
+        if self.store is None:
+            return AvailabilityCalculator.calculate_availability(df, schedule_tag, value_column)
+
+        series_id = self.aws_service.metric_series_id(query)
+        return self._combine(series_id, [series_id], df, schedule_tag, start_time, end_time,
+                             value_column=value_column)
+
+    def get_availability(self, series: List[Tuple[dict, Optional[str]]], start_time: datetime,
+                         end_time: datetime, raise_errors: bool = False) -> Dict[object, Optional[dict]]:
+        """
+        Availability of many series from their rollups, fetching only the days without one.
+
+        Each series is requested as Sum and SampleCount buckets (see count_queries); the
+        days that still need datapoints share batched get_metric_data_history calls.
+
+        Args:
+            series: List of (query, schedule tag); queries as returned by availability_series
+            start_time: Start datetime
+            end_time: End datetime
+            raise_errors: If True, raise when a GetMetricData batch fails (see get_metric_data_history)
+
+        Returns:
+            Dict query Key -> calculate_availability dictionary (None for series without data)
+        """
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        covered_days = self._covered_days(start, end)
+
+        days = range(start // SECONDS_PER_DAY, (end - 1) // SECONDS_PER_DAY + 1)
+
+        rollups = {}
+        fetch_ranges = defaultdict(list)  # (first day, stop day) -> queries to fetch
+        for query, schedule_tag in series:
+            sum_query, count_query = count_queries(query, schedule_tag)
+            series_id = self.aws_service.metric_series_id(sum_query)
+            rollups[query['Key']] = self._read(series_id, schedule_tag, covered_days)
+
+            # Days without a rollup (open, partial or not rolled up yet) need datapoints
+            missing = [day for day in days if day not in rollups[query['Key']]]
+            if missing:
+                fetch_ranges[(missing[0], missing[-1] + 1)].extend([sum_query, count_query])
+
+        fetched = {}
+        for (first_day, stop_day), queries in fetch_ranges.items():
+            range_start = max(start, first_day * SECONDS_PER_DAY)
+            range_end = min(end, stop_day * SECONDS_PER_DAY)
+            fetched.update(self.aws_service.get_metric_data_history(
+                queries, from_epoch(range_start), from_epoch(range_end), raise_errors=raise_errors
+            ))
+
+        results = {}
+        for query, schedule_tag in series:
+            sum_query, count_query = count_queries(query, schedule_tag)
+            sums = fetched.get(sum_query['Key'], pd.DataFrame())
+            sample_counts = fetched.get(count_query['Key'], pd.DataFrame())
+            df = pd.DataFrame()
+            if not sums.empty and not sample_counts.empty:
+                df = sums.rename(columns={'Value': 'Sum'}).merge(
+                    sample_counts.rename(columns={'Value': 'SampleCount'}), on='Timestamp'
+                )
+
+            if self.store is None:
+                stats = AvailabilityCalculator.calculate_availability_from_counts(df, schedule_tag)
+            else:
+                series_ids = [self.aws_service.metric_series_id(sum_query),
+                              self.aws_service.metric_series_id(count_query)]
+                stats = self._combine(series_ids[0], series_ids, df, schedule_tag, start_time, end_time,
+                                      rollups=rollups[query['Key']], from_counts=True)
+            results[query['Key']] = stats if stats['total_points'] else None
+        return results
+
+    def _combine(self, series_id: str, source_ids: List[str], df: pd.DataFrame, schedule_tag: Optional[str],
+                 start_time: datetime, end_time: datetime, rollups: Dict[int, dict] = None,
+                 value_column: str = 'Maximum', from_counts: bool = False) -> dict:
+        """
+        Sum the rollups of the closed days of a range and calculate the rest from datapoints.
+
+        Closed days whose datapoints are complete in the store (every source series is
+        closed there) and have no rollup yet are rolled up and written.
+
+        Args:
+            series_id: Rollup identity of the series
+            source_ids: Stored series the datapoints come from
+            df: Datapoints of the days without a rollup (may include others, which are ignored)
+            rollups: Rollups already read for the range (read here if None)
+        """
+        start, end = to_epoch(start_time), to_epoch(end_time)
+        covered_days = self._covered_days(start, end)
+        if rollups is None:
+            rollups = self._read(series_id, schedule_tag, covered_days)
+
+        daily = AvailabilityCalculator.calculate_daily_availability(
+            df, schedule_tag, value_column=value_column, from_counts=from_counts
+        )
+
+        # Roll up the closed, complete days that were calculated now
+        first_open_day = self.store.first_open_day()
+        new_days = [day for day in covered_days if day not in rollups and day < first_open_day]
+        if new_days:
+            complete = set.intersection(*(
+                closed for closed in self.store.closed_days(source_ids, new_days[0], new_days[-1]).values()
+            ))
+            new_rollups = {
+                day: daily.get(day) or AvailabilityCalculator.stats_from_counts(0, 0, 0, 0)
+                for day in new_days if day in complete
+            }
+            self.store.put_daily_availability(series_id, schedule_tag, new_rollups)
+            rollups = {**rollups, **new_rollups}
+
+        # Days without a rollup are calculated from their datapoints (only within the range)
+        if not df.empty:
+            timestamps = pd.to_datetime(df['Timestamp'], utc=True)
+            seconds = (timestamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+            rest = df[~(seconds // SECONDS_PER_DAY).isin(list(rollups)) & (seconds >= start) & (seconds <= end)]
+        else:
+            rest = df
+
+        if from_counts:
+            rest_stats = AvailabilityCalculator.calculate_availability_from_counts(rest, schedule_tag)
+        else:
+            rest_stats = AvailabilityCalculator.calculate_availability(rest, schedule_tag, value_column)
+        return AvailabilityCalculator.combine_availability(list(rollups.values()) + [rest_stats])
+
+    def _read(self, series_id: str, schedule_tag: Optional[str], covered_days: range) -> Dict[int, dict]:
+        """Stored rollups of a series within the covered days."""
+        if self.store is None or not covered_days:
+            return {}
+        return self.store.get_daily_availability(
+            [series_id], schedule_tag, covered_days.start, covered_days.stop - 1
+        )[series_id]
+
+    @staticmethod
+    def _covered_days(start: int, end: int) -> range:
+        """Day numbers (epoch days) entirely within start and end (epoch seconds, end inclusive)."""
+        return range(-(-start // SECONDS_PER_DAY), (end + 1) // SECONDS_PER_DAY)
+
+
+class AvailabilityRollupWorker:
+    """
+    Background thread that rolls up the availability series of the whole fleet after each day closes.
+
+    Every check_interval it looks whether a new day has closed; when one has, it rolls up
+    the newly closed days. The other closed days of the current year are backfilled
+    newest first, backfill_days per pass, so the first start spreads its GetMetricData
+    calls over several passes. Days already rolled up are only read, so monthly,
+    quarterly and year-to-date reports of the Availability Percentage only need the
+    open days from CloudWatch.
+    """
+
+    def __init__(self, inventory, check_interval: int = DEFAULT_ROLLUP_CHECK_INTERVAL,
+                 backfill_days: int = DEFAULT_ROLLUP_BACKFILL_DAYS):
+        """
+        Initialize the worker.
+
+        Args:
+            inventory: The process-wide InventoryCollector (its services share one metric store)
+            check_interval: Seconds between passes (checks for a newly closed day)
+            backfill_days: Most closed days rolled up per pass
+        """
+        self.inventory = inventory
+        self.store = inventory.aws_service.metric_store
+        self.check_interval = check_interval
+        self.backfill_days = backfill_days
+        # Days [_rolled_up_from, _rolled_up_to) are rolled up; None until the first successful pass
+        self._rolled_up_from = None
+        self._rolled_up_to = None
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the background thread (no-op without a metric store or if it is already running)."""
+        if self.store is None:
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="AvailabilityRollups", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Check loop executed in the background thread."""
+        while True:
+            first_open_day = self.store.first_open_day()
+            last_closed = from_epoch((first_open_day - 1) * SECONDS_PER_DAY)
+            year_start_day = to_epoch(datetime(last_closed.year, 1, 1)) // SECONDS_PER_DAY
+            try:
+                if first_open_day != self._rolled_up_to:
+                    # Newly closed days first; after a long gap the skipped days are backfilled
+                    first_day = max(first_open_day - self.backfill_days, year_start_day)
+                    if self._rolled_up_to is not None and self._rolled_up_to >= first_day:
+                        first_day = self._rolled_up_to
+                    else:
+                        self._rolled_up_from = first_day
+                    self.roll_up(first_day, first_open_day)
+                    self._rolled_up_to = first_open_day
+                elif self._rolled_up_from > year_start_day:
+                    first_day = max(self._rolled_up_from - self.backfill_days, year_start_day)
+                    self.roll_up(first_day, self._rolled_up_from)
+                    self._rolled_up_from = first_day
+            except Exception as e:
+                logger.warning("Availability rollup failed (retrying in %ds): %s", self.check_interval, e)
+            time.sleep(self.check_interval)
+
+    def roll_up(self, first_day: int, stop_day: int):
+        """
+        Roll up the closed days [first_day, stop_day) for every instance of the inventory.
+
+        Args:
+            first_day: First day (epoch days) to roll up
+            stop_day: Day after the last one; at most the first open day
+        """
+        started = time.perf_counter()
+        end = stop_day * SECONDS_PER_DAY
+        last_closed = from_epoch(end - SECONDS_PER_DAY)
+        start_time = from_epoch(first_day * SECONDS_PER_DAY)
+
+        self.inventory.get_snapshot(wait_timeout=60)
+        series_by_service = defaultdict(list)
+        for environment in REPORT_ENVIRONMENTS:
+            for instance in self.inventory.get_instances_by_environment(environment):
+                aws_service = self.inventory.service_for(instance['ID'])
+                schedule_tag = instance.get('Schedule')
+                series_by_service[aws_service].extend(
+                    (query, schedule_tag) for _, query in availability_series(aws_service, instance, environment)
+                )
+
+        for aws_service, series in series_by_service.items():
+            # The range ends at the first open day, so only closed days are fetched
+            AvailabilityRollups(aws_service).get_availability(series, start_time, from_epoch(end - 1))
+
+        logger.info("Rolled up %d series from %s to %s in %.1fs",
+                    sum(len(series) for series in series_by_service.values()),
+                    start_time.date(), last_closed.date(), time.perf_counter() - started)
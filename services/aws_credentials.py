@@ -0,0 +1,115 @@
+"""
+Cross-account credential provider that assumes the dashboard role once per credential lifetime.
+"""
+import threading
+import boto3
+import botocore.session
+from botocore.config import Config
+from botocore.credentials import CredentialProvider, CredentialResolver, RefreshableCredentials
+
+
+class _AssumedRoleCredentials(CredentialProvider):
+    """Credential provider of a botocore session that always returns the cached role credentials."""
+
+    METHOD = 'sts-assume-role'
+
+    def __init__(self, credentials: RefreshableCredentials):
+        """Wrap the refreshable credentials of the assumed role."""
+        super().__init__()
+        self._credentials = credentials
+
+    def load(self) -> RefreshableCredentials:
+        """Return the cached credentials (botocore refreshes them before they expire)."""
+        return self._credentials
+
+
+class AssumeRoleCredentialProvider:
+    """
+    Caches the STS credentials of the cross-account role and builds boto3 clients from them.
+
+    The role is assumed once and botocore refreshes the credentials shortly before
+    their Expiration (advisory window of 15 minutes), so STS is called about once per hour
+    instead of once per client or page render. All clients share a single botocore session
+    with a tuned connection pool, and boto3 clients are thread-safe, so they are reused by
+    every session and background thread. If a rate limiter is given, it is attached to
+    every client so all API calls share its buckets.
+    """
+
+    def __init__(self, role_arn: str, region_name: str = 'us-east-1',
+                 session_name: str = 'StreamlitDashboardSession', max_pool_connections: int = 50,
+                 rate_limiter=None):
+        """Initialize the provider. No AWS call is made until a client is requested."""
+        self.role_arn = role_arn
+        self.region_name = region_name
+        self.session_name = session_name
+        self.rate_limiter = rate_limiter
+        # Throttled calls are paced by the rate limiter, so allow enough attempts
+        # to ride out a throttling burst instead of failing with empty data.
+        self.client_config = Config(
+            region_name=region_name,
+            max_pool_connections=max_pool_connections,
+            retries={'max_attempts': 10, 'mode': 'standard'}
+        )
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._session = None
+        self._clients = {}
+
+    def _fetch_credentials(self) -> dict:
+        """Assume the role and return credentials in the format expected by RefreshableCredentials."""
+        sts_client = boto3.client('sts')
+        response = sts_client.assume_role(
+            RoleArn=self.role_arn,
+            RoleSessionName=self.session_name
+        )
+        credentials = response['Credentials']
+        return {
+            'access_key': credentials['AccessKeyId'],
+            'secret_key': credentials['SecretAccessKey'],
+            'token': credentials['SessionToken'],
+            'expiry_time': credentials['Expiration'].isoformat(),
+        }
+
+    def _get_session(self) -> boto3.Session:
+        """Return the shared session, assuming the role on first use."""
+        if self._session is None:
+            self._credentials = RefreshableCredentials.create_from_metadata(
+                metadata=self._fetch_credentials(),
+                refresh_using=self._fetch_credentials,
+                method='sts-assume-role'
+            )
+            botocore_session = botocore.session.Session()
+            botocore_session.register_component(
+                'credential_provider', CredentialResolver([_AssumedRoleCredentials(self._credentials)])
+            )
+            self._session = boto3.Session(botocore_session=botocore_session, region_name=self.region_name)
+        return self._session
+
+    def get_client(self, service_name: str):
+        """Return the shared client for a service (ec2, cloudwatch, logs, ssm, ...)."""
+        with self._lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                client = self._get_session().client(service_name, config=self.client_config)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.attach(client)
+                self._clients[service_name] = client
+            return client
+
+    def ensure_credentials(self):
+        """
+        Make sure valid credentials are available.
+        Calls STS only on first use or when the cached credentials are about to expire.
+        """
+        with self._lock:
+            self._get_session()
+            credentials = self._credentials
+        # RefreshableCredentials refreshes itself here only if needed
+        credentials.get_frozen_credentials()
+
+    def reset(self):
+        """Drop cached credentials and clients so the next request assumes the role again."""
+        with self._lock:
+            self._credentials = None
+            self._session = None
+            self._clients = {}
@@ -1,46 +1,118 @@
 """
 AWS Service class that wraps existing AWS functions without changing behavior.
 """
-import streamlit as st
-import boto3
 import time
 import re
+import json
+import math
+import threading
 from collections import Counter, defaultdict
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError, BotoCoreError
 import pandas as pd
 import datetime
-
+from services.aws_credentials import AssumeRoleCredentialProvider
+from services.api_rate_limiter import get_api_rate_limiter
+from services.metric_catalog import MetricCatalog
+from services.metric_store import MetricStore, SECONDS_PER_DAY
+from services.timeseries_cache import TimeSeriesCache, to_epoch, from_epoch
+from utils.alarm_index import AlarmIndex
+from utils.debug_log import get_logger
+
+
+logger = get_logger('aws_service')
+
+DEFAULT_ROLE_ARN = "arn:aws:iam::011528297340:role/RecolectorDeDashboard"
+DEFAULT_REGION = 'us-east-1'
+
+# GetMetricData accepts up to 500 queries per call and returns up to 100 800 datapoints per page
+MAX_METRIC_DATA_QUERIES = 500
+MAX_METRIC_DATA_POINTS = 100800
+
+# Memory metrics probed for the detail page, in order of preference
+MEMORY_METRICS = [
+    ('CWAgent', 'mem_used_percent'),                 # Linux CloudWatch Agent
+    ('CWAgent', 'Memory % Committed Bytes In Use'),  # Windows CloudWatch Agent
+    ('CWAgent', 'Memory Available Bytes'),
+    ('AWS/EC2', 'MemoryUtilization'),                # Windows Performance Counters
+]
+
+# CWAgent disk metrics (Linux first, then Windows)
+DISK_METRIC_NAMES = ['disk_used_percent', 'LogicalDisk % Free Space']
+
+# Periods a historical series may already be stored at. A report reads a range at a coarser
+# period as it ages (CloudWatch retention), so closed days stored at a finer period are
+# aggregated instead of being fetched again.
+STORED_PERIODS = (60, 300, 900, 3600)
+
+# How finer buckets combine into a coarser one, per statistic (Average assumes evenly
+# sampled buckets, which holds for the 0/1 health metrics of the reports)
+PERIOD_AGGREGATIONS = {
+    'Maximum': max,
+    'Minimum': min,
+    'Sum': sum,
+    'SampleCount': sum,
+    'Average': lambda values: sum(values) / len(values),
+}
 
 class AWSService:
     """Manages all AWS operations, wrapping existing functions."""
     
-    def __init__(self):
-        """Initialize AWS Service."""
-        self.role_arn = "arn:aws:iam::011528297340:role/RecolectorDeDashboard"
+    def __init__(self, role_arn: str = DEFAULT_ROLE_ARN, region_name: str = DEFAULT_REGION,
+                 target_name: str = None, metric_store: MetricStore = None):
+        """
+        Initialize AWS Service for one (account role, region) target.
+
+        Args:
+            role_arn: Cross-account role assumed for every call
+            region_name: AWS region of the target
+            target_name: Display name of the target (defaults to the account ID)
+            metric_store: Optional on-disk store for the closed days of historical reads
+        """
+        self.role_arn = role_arn
+        self.region_name = region_name
+        self.account_id = role_arn.split(':')[4] if role_arn.count(':') >= 5 else ''
+        self.target_name = target_name or self.account_id
+        # Token buckets per CloudWatch API, shared by every AWSService of this account and
+        # region (CloudWatch throttles per account and region); attached to every client
+        # the provider creates, so all pages and reports share the same budget.
+        self.rate_limiter = get_api_rate_limiter(self.account_id, self.region_name)
+        self.credential_provider = AssumeRoleCredentialProvider(
+            self.role_arn, self.region_name, rate_limiter=self.rate_limiter
+        )
+
+        # Incremental alarm sync: full describe_alarms only every few minutes,
+        # describe_alarm_history deltas in between (see _get_all_alarms)
+        self.alarm_full_resync_interval = 600  # seconds
+        self.alarm_history_overlap = datetime.timedelta(seconds=60)
+        self._alarm_cache = {}  # AlarmName -> MetricAlarm dict, in describe_alarms order
+        self._alarm_cache_last_sync = None
+        self._alarm_cache_last_full_sync = 0.0
+        self._alarm_cache_lock = threading.Lock()
+
+        # Bounded pool for the concurrent collector fetches (EC2 pages, alarm paginations).
+        # boto3 clients are thread-safe, so the shared clients are used from every worker.
+        self.max_workers = 8
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='aws-fetch')
+
+        # Fleet-wide list_metrics index (CWAgent, ping, SAP availability), refreshed in the
+        # background, so the detail page and reports never run discovery calls
+        self.metric_catalog = MetricCatalog(self)
+
+        # Datapoints already fetched, per series; metric reads only fetch what is missing
+        self.timeseries_cache = TimeSeriesCache()
+
+        # Closed days of the monthly report series, kept across restarts (see get_metric_data_history)
+        self.metric_store = metric_store
     
-    @st.cache_resource(ttl=60)  # 1 minute cache for good balance between performance and freshness
-    def get_cross_account_boto3_client(_self, service_name: str):
+    def get_cross_account_boto3_client(self, service_name: str):
         """
-        Asume el rol de la cuenta cliente y retorna un cliente de boto3 para el servicio especificado.
-        This is the exact same function as the original, just wrapped in a class.
+        Retorna un cliente de boto3 para el servicio especificado usando el rol de la cuenta cliente.
+        The role is assumed once per credential lifetime and clients are shared (see AssumeRoleCredentialProvider).
         """
         try:
-            sts_client = boto3.client('sts')
-            response = sts_client.assume_role(
-                RoleArn=_self.role_arn,
-                RoleSessionName='StreamlitDashboardSession'
-            )
-            
-            credentials = response['Credentials']
-            
-            return boto3.client(
-                service_name,
-                region_name='us-east-1',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-            )
-        except ClientError as e:
+            return self.credential_provider.get_client(service_name)
+        except (ClientError, BotoCoreError):
             return None
 
     def get_cross_account_boto3_client_cached(self, service_name: str):
@@ -48,188 +120,316 @@ class AWSService:
         return self.get_cross_account_boto3_client(service_name)
     
     def clear_cache(self):
-        """Clear the AWS client cache to force fresh data fetch."""
-        self.get_cross_account_boto3_client.clear()
+        """Clear the cached credentials and clients to force fresh ones on the next call."""
+        self.credential_provider.reset()
 
     def test_aws_connection(self):
         """
-        Attempts to assume the role and create a simple STS client to test AWS connectivity.
+        Checks that valid cross-account credentials are available.
         Returns a tuple (status_message, error_details).
-        Exact same logic as original function.
+        Does not call STS again while the cached credentials are still valid; after a
+        failure the cached credentials and clients are dropped, so the next check
+        assumes the role from scratch.
         """
         try:
-            sts_client = boto3.client('sts')
-            response = sts_client.assume_role(
-                RoleArn=self.role_arn,
-                RoleSessionName='StreamlitConnectionTestSession'
-            )
-            # If assume_role succeeds, we can try to get a client
-            credentials = response['Credentials']
-            boto3.client(
-                'ec2',
-                region_name='us-east-1',
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken'],
-            )
+            self.credential_provider.ensure_credentials()
             return "Conexión AWS OK", None
         except ClientError as e:
+            self.clear_cache()
             return "Error de Conexión AWS", str(e)
         except Exception as e:
+            self.clear_cache()
             return "Error Inesperado de Conexión AWS", str(e)
 
-    def get_aws_data(self):
+    def get_aws_data(self, raise_errors: bool = False):
         """
         Fetch EC2 instances and their CloudWatch alarms from AWS.
-        Returns a list of instance dictionaries with their state and alarms.
-        Exact same logic as original function.
+        Returns a list of instance dictionaries with their state and alarms,
+        tagged with the account and region of this target.
+
+        Args:
+            raise_errors: Re-raise errors instead of returning an empty list, so a
+                          multi-target caller can keep the previous data of this target
         """
         instances_data = []
         
         try:
             # Log the start of data fetching
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Starting get_aws_data()\n")
+            logger.info("Starting get_aws_data()")
             
             # Get EC2 client
             ec2 = self.get_cross_account_boto3_client_cached('ec2')
             if not ec2:
-                with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                    f.write(f"[{time.ctime()}] Failed to get EC2 client\n")
-                return []
+                raise RuntimeError("Failed to get EC2 client")
             
             # Get CloudWatch client
             cloudwatch = self.get_cross_account_boto3_client_cached('cloudwatch')
             if not cloudwatch:
-                with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                    f.write(f"[{time.ctime()}] Failed to get CloudWatch client\n")
-                return []
-            
-            # Fetch all EC2 instances
-            response = ec2.describe_instances()
+                raise RuntimeError("Failed to get CloudWatch client")
             
             # Get all CloudWatch alarms ONCE (more efficient)
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Getting all CloudWatch alarms...\n")
+            logger.debug("Getting EC2 instances and all CloudWatch alarms...")
             
-            alarm_paginator = cloudwatch.get_paginator('describe_alarms')
-            all_alarms = []
-            for page in alarm_paginator.paginate():
-                all_alarms.extend(page['MetricAlarms'])
+            # Page through the tagged EC2 instances on the pool while the alarms are fetched
+            # from this thread; alarm paginations fan out on the same pool, so the total
+            # wall time is the slowest API call instead of the sum of all calls.
+            fetch_started = time.perf_counter()
+            instances_future = self._executor.submit(self._get_dashboard_instances, ec2)
+            all_alarms = self._get_all_alarms(cloudwatch)
+            ec2_instances = instances_future.result()
+            logger.debug("EC2 and CloudWatch fetch took %.2fs", time.perf_counter() - fetch_started)
+            
+            logger.debug("Retrieved %d total alarms", len(all_alarms))
             
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Retrieved {len(all_alarms)} total alarms\n")
+            # Build the alarm index once per sweep instead of scanning every alarm per instance
+            alarm_index = AlarmIndex(all_alarms)
             
             # Process each instance
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    instance_id = instance.get('InstanceId', '')
-                    instance_state = instance.get('State', {}).get('Name', 'unknown')
-                    
-                    # Extract tags
-                    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-                    
-                    # Only include instances with DashboardGroup tag
-                    if 'DashboardGroup' not in tags:
-                        continue
-                    
-                    with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                        f.write(f"[{time.ctime()}] Processing instance {instance_id} ({tags.get('Name', 'NoName')})\n")
-                    
-                    # Count alarms for this instance
-                    instance_alarms = Counter()
-                    alarms_list_for_instance = [] # Store full alarm objects
-                    instance_name = tags.get('Name', instance_id)
-                    
-                    for alarm in all_alarms:
-                        dimensions = alarm.get('Dimensions', [])
-                        alarm_name = alarm.get('AlarmName', '')
-                        
-                        # Check if alarm belongs to this instance using dimension-based matching
-                        belongs_to_instance = (
-                            # 1. InstanceId dimension (most reliable - covers 778/841 alarms)
-                            any(d['Name'] == 'InstanceId' and d['Value'] == instance_id for d in dimensions) or
-
-                            # 2. Server dimension for SSM/Composite alarms (covers remaining 63/841 alarms)
-                            any(d['Name'] == 'Server' and d['Value'].upper() == instance_name.upper() for d in dimensions)
-                        )
-                        
-                        if belongs_to_instance:
-                            alarms_list_for_instance.append(alarm) # Add the full object
-                            alarm_state = alarm.get('StateValue', 'UNKNOWN')
-                            
-                            # Log each alarm for debugging
-                            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                                f.write(f"[{time.ctime()}] Alarm: {alarm_name}, State: {alarm_state}, Instance: {instance_id}\n")
-                            
-                            # Check if this is a preventive alarm
-                            if alarm_state == 'ALARM' and ('ALERTA' in alarm_name.upper() or 'PROACTIVA' in alarm_name.upper() or 'PREVENTIVA' in alarm_name.upper() or 'SMDA98' in alarm_name.upper()):
-                                instance_alarms['PREVENTIVE'] += 1
-                            else:
-                                instance_alarms[alarm_state] += 1
-                    
-                    with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                        f.write(f"[{time.ctime()}] Instance {instance_id} has {len(instance_alarms)} alarm states: {dict(instance_alarms)}\n")
-                    
-                    # Create instance data structure
-                    # Clean DashboardGroup value to remove extra whitespace
-                    dashboard_group = tags.get('DashboardGroup', 'Uncategorized').strip()
-                    
-                    # Get the actual number of attached EBS volumes, ignoring other block devices.
-                    ebs_volumes = [
-                        mapping for mapping in instance.get('BlockDeviceMappings', [])
-                        if 'Ebs' in mapping
-                    ]
-                    disk_count = len(ebs_volumes)
-
-                    instance_data = {
-                        'ID': instance_id,
-                        'Name': tags.get('Name', instance_id),
-                        'State': instance_state,
-                        'Environment': tags.get('Environment', 'Unknown'),
-                        'Owner': tags.get('Owner') or 'TBD',
-                        'DashboardGroup': dashboard_group,
-                        'Alarms': instance_alarms,
-                        'AlarmsList': [], # Placeholder, as alarms_list is not defined here
-                        'OperatingSystem': instance.get('PlatformDetails', 'Linux/UNIX'),
-                        'PrivateIP': instance.get('PrivateIpAddress', 'N/A'),
-                        'DiskCount': disk_count,
-                        'AlarmObjects': alarms_list_for_instance,
-                        'CpuOptions': instance.get('CpuOptions', {}),
-                        'Schedule': tags.get('Schedule', None)  # For availability calculations (case sensitive)
-                    }
+            for instance in ec2_instances:
+                instance_id = instance.get('InstanceId', '')
+                instance_state = instance.get('State', {}).get('Name', 'unknown')
+                
+                # Extract tags
+                tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+                
+                # Only include instances with DashboardGroup tag
+                if 'DashboardGroup' not in tags:
+                    continue
+                
+                logger.debug("Processing instance %s (%s)", instance_id, tags.get('Name', 'NoName'))
+                
+                # Count alarms for this instance
+                instance_alarms = Counter()
+                alarms_list_for_instance = [] # Store full alarm objects
+                instance_name = tags.get('Name', instance_id)
+                
+                # Dimension-based matching (InstanceId or Server) through the index
+                for alarm in alarm_index.alarms_for_instance(instance_id, instance_name):
+                    alarm_name = alarm.get('AlarmName', '')
+                    alarms_list_for_instance.append(alarm) # Add the full object
+                    alarm_state = alarm.get('StateValue', 'UNKNOWN')
                     
+                    # Log each alarm for debugging
+                    logger.debug("Alarm: %s, State: %s, Instance: %s", alarm_name, alarm_state, instance_id)
                     
-                    instances_data.append(instance_data)
-            
+                    # Check if this is a preventive alarm
+                    if alarm_state == 'ALARM' and ('ALERTA' in alarm_name.upper() or 'PROACTIVA' in alarm_name.upper() or 'PREVENTIVA' in alarm_name.upper() or 'SMDA98' in alarm_name.upper()):
+                        instance_alarms['PREVENTIVE'] += 1
+                    else:
+                        instance_alarms[alarm_state] += 1
+                
+                logger.debug("Instance %s has %d alarm states: %s", instance_id, len(instance_alarms), dict(instance_alarms))
+                
+                # Create instance data structure
+                # Clean DashboardGroup value to remove extra whitespace
+                dashboard_group = tags.get('DashboardGroup', 'Uncategorized').strip()
+                
+                # Get the actual number of attached EBS volumes, ignoring other block devices.
+                ebs_volumes = [
+                    mapping for mapping in instance.get('BlockDeviceMappings', [])
+                    if 'Ebs' in mapping
+                ]
+                disk_count = len(ebs_volumes)
+
+                instance_data = {
+                    'ID': instance_id,
+                    'Name': tags.get('Name', instance_id),
+                    'State': instance_state,
+                    'Environment': tags.get('Environment', 'Unknown'),
+                    'Owner': tags.get('Owner') or 'TBD',
+                    'DashboardGroup': dashboard_group,
+                    'Alarms': instance_alarms,
+                    'AlarmsList': [], # Placeholder, as alarms_list is not defined here
+                    'OperatingSystem': instance.get('PlatformDetails', 'Linux/UNIX'),
+                    'PrivateIP': instance.get('PrivateIpAddress', 'N/A'),
+                    'DiskCount': disk_count,
+                    'BlockDeviceMappings': instance.get('BlockDeviceMappings', []),
+                    'AlarmObjects': alarms_list_for_instance,
+                    'CpuOptions': instance.get('CpuOptions', {}),
+                    'Schedule': tags.get('Schedule', None),  # For availability calculations (case sensitive)
+                    'AccountId': self.account_id,
+                    'Region': self.region_name,
+                    'Target': self.target_name,
+                    'RawInstance': instance  # describe_instances record (VPC, SGs, placement, ...)
+                }
+                
+                
+                instances_data.append(instance_data)
+        
             # Log the results
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Found {len(instances_data)} instances with DashboardGroup tag\n")
-                f.write(f"[{time.ctime()}] Total alarms processed: {len(all_alarms)}\n")
+            logger.info("Found %d instances with DashboardGroup tag", len(instances_data))
+            logger.info("Total alarms processed: %d", len(all_alarms))
             
             return instances_data
             
         except Exception as e:
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Error in get_aws_data(): {str(e)}\n")
+            logger.error("Error in get_aws_data() for %s/%s: %s", self.target_name, self.region_name, e)
+            if raise_errors:
+                raise
             return []
 
-    def get_instance_details(self, instance_id: str):
-        """Get detailed information for a specific instance. Same as original function."""
+    def _get_dashboard_instances(self, ec2) -> list:
+        """
+        Get every EC2 instance that has the DashboardGroup tag.
+
+        EC2 filters by tag key on the server side and the paginator follows NextToken,
+        so large accounts are neither truncated nor transferred in full.
+
+        Returns:
+            List of instance dictionaries as returned by describe_instances
+        """
+        paginator = ec2.get_paginator('describe_instances')
+        pages = paginator.paginate(
+            Filters=[{'Name': 'tag-key', 'Values': ['DashboardGroup']}],
+            PaginationConfig={'PageSize': 1000}
+        )
+
+        instances = []
+        for page in pages:
+            for reservation in page['Reservations']:
+                instances.extend(reservation['Instances'])
+        return instances
+
+    def _get_all_alarms(self, cloudwatch) -> list:
+        """
+        Get every MetricAlarm, using the in-memory alarm set between full resyncs.
+
+        A full describe_alarms pagination runs on the first call and then every
+        alarm_full_resync_interval seconds (this also picks up created and deleted alarms).
+        In between, only the StateUpdate history since the last sync is downloaded and the
+        changed alarms are patched into the cached set. If a state change refers to an alarm
+        we don't know yet, a full resync is done instead.
+
+        Returns:
+            List of MetricAlarm dictionaries, in describe_alarms order
+        """
+        with self._alarm_cache_lock:
+            sync_started = datetime.datetime.now(datetime.timezone.utc)
+            full_resync_due = (
+                not self._alarm_cache or
+                self._alarm_cache_last_sync is None or
+                time.time() - self._alarm_cache_last_full_sync >= self.alarm_full_resync_interval
+            )
+
+            if not full_resync_due:
+                try:
+                    full_resync_due = not self._apply_alarm_state_changes(
+                        cloudwatch, self._alarm_cache_last_sync - self.alarm_history_overlap
+                    )
+                except Exception:
+                    # Any problem with the history API falls back to a full resync
+                    full_resync_due = True
+
+            if full_resync_due:
+                all_alarms = self._describe_all_alarms(cloudwatch)
+                self._alarm_cache = {alarm['AlarmName']: alarm for alarm in all_alarms}
+                self._alarm_cache_last_full_sync = time.time()
+                logger.info("Full alarm resync: %d alarms", len(all_alarms))
+
+            self._alarm_cache_last_sync = sync_started
+            return list(self._alarm_cache.values())
+
+    def _describe_all_alarms(self, cloudwatch) -> list:
+        """
+        Run a full describe_alarms sweep, one pagination per alarm state in parallel.
+
+        describe_alarms pages must be read one after another, so the sweep is split by
+        StateValue and the three paginations run concurrently on the pool. An alarm that
+        changes state during the sweep may be missed; the next incremental sync then sees
+        an unknown alarm and schedules a new full resync.
+
+        Returns:
+            List of MetricAlarm dictionaries sorted by AlarmName (describe_alarms order)
+        """
+        futures = [
+            self._executor.submit(self._describe_alarms_in_state, cloudwatch, state_value)
+            for state_value in ('OK', 'ALARM', 'INSUFFICIENT_DATA')
+        ]
+
+        alarms_by_name = {}
+        for future in futures:
+            for alarm in future.result():
+                alarms_by_name[alarm['AlarmName']] = alarm
+
+        return [alarms_by_name[name] for name in sorted(alarms_by_name)]
+
+    def _describe_alarms_in_state(self, cloudwatch, state_value: str) -> list:
+        """Get every MetricAlarm currently in the given state."""
+        alarm_paginator = cloudwatch.get_paginator('describe_alarms')
+        alarms = []
+        for page in alarm_paginator.paginate(StateValue=state_value):
+            alarms.extend(page['MetricAlarms'])
+        return alarms
+
+    def _apply_alarm_state_changes(self, cloudwatch, since: datetime.datetime) -> bool:
+        """
+        Patch the cached alarm set with the state changes recorded since a given time.
+
+        Patched alarms are replaced by new dictionaries (never modified in place) because
+        the previous ones may still be referenced by a published inventory snapshot.
+
+        Returns:
+            False if a change refers to an unknown alarm and a full resync is needed, True otherwise
+        """
+        paginator = cloudwatch.get_paginator('describe_alarm_history')
+        pages = paginator.paginate(
+            AlarmTypes=['MetricAlarm'],
+            HistoryItemType='StateUpdate',
+            StartDate=since,
+            ScanBy='TimestampAscending'
+        )
+
+        patched_alarms = {}
+        for page in pages:
+            for item in page['AlarmHistoryItems']:
+                alarm_name = item.get('AlarmName', '')
+                alarm = patched_alarms.get(alarm_name) or self._alarm_cache.get(alarm_name)
+                if alarm is None:
+                    return False
+
+                try:
+                    new_state = json.loads(item.get('HistoryData', '{}')).get('newState', {})
+                except json.JSONDecodeError:
+                    return False
+                if 'stateValue' not in new_state:
+                    continue
+
+                patched_alarms[alarm_name] = {
+                    **alarm,
+                    'StateValue': new_state['stateValue'],
+                    'StateReason': new_state.get('stateReason', alarm.get('StateReason')),
+                    'StateUpdatedTimestamp': item.get('Timestamp', alarm.get('StateUpdatedTimestamp'))
+                }
+
+        # Replacing values keeps the original key order of the cached set
+        self._alarm_cache.update(patched_alarms)
+        logger.debug("Incremental alarm sync: %d alarms changed state", len(patched_alarms))
+        return True
+
+    def get_instance_details(self, instance_id: str) -> dict:
+        """
+        Get detailed information for a specific instance (empty dict if it is not found).
+        Errors are logged, not shown: this may run on worker threads without a Streamlit context.
+        """
         try:
             ec2 = self.get_cross_account_boto3_client('ec2')
             if not ec2: 
-                return None
+                return {}
             response = ec2.describe_instances(InstanceIds=[instance_id])
             if response['Reservations'] and response['Reservations'][0]['Instances']:
                 return response['Reservations'][0]['Instances'][0]
-            return None
+            return {}
         except Exception as e:
-            st.error(f"Error getting instance details: {e}")
-            return None
+            logger.warning("Error getting instance details of %s: %s", instance_id, e)
+            return {}
 
-    def get_volume_details(self, block_device_mappings: list) -> dict:
-        """Get detailed information for EBS volumes from block device mappings."""
+    def get_volume_details(self, block_device_mappings: list, raise_errors: bool = False) -> dict:
+        """
+        Get detailed information for EBS volumes from block device mappings.
+
+        Errors are logged, not shown (the detail page runs this on its worker pool);
+        with raise_errors they are re-raised so the caller can show them.
+        """
         volume_details = {}
         volume_ids = [device['Ebs']['VolumeId'] for device in block_device_mappings if 'Ebs' in device]
 
@@ -252,37 +452,519 @@ class AWSService:
                 }
             return volume_details
         except Exception as e:
-            st.error(f"Error getting volume details: {e}")
+            logger.warning("Error getting volume details of %s: %s", volume_ids, e)
+            if raise_errors:
+                raise
             return {}
 
     def get_metric_history(self, instance_id: str, metric_name: str, namespace: str, statistic: str = 'Average', hours: int = 3) -> pd.DataFrame:
-        """Get time-series data for a specific CloudWatch metric."""
-        try:
-            cloudwatch = self.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch: return pd.DataFrame()
+        """
+        Get time-series data for a specific CloudWatch metric.
+        Served from the time-series cache; only the part of the window not held yet is fetched.
+        """
+        end_time = datetime.datetime.utcnow()
+        start_time = end_time - datetime.timedelta(hours=hours)
+        frames = self.get_metric_data_batch([{
+            'Key': metric_name,
+            'Namespace': namespace,
+            'MetricName': metric_name,
+            'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}],
+            'Stat': statistic,
+            'Period': 300  # 5-minute intervals
+        }], start_time, end_time)
+
+        df = frames[metric_name]
+        return df.rename(columns={'Value': statistic}) if not df.empty else df
+
+    def get_metric_data_batch(self, queries: list, start_time: datetime.datetime,
+                              end_time: datetime.datetime) -> dict:
+        """
+        Fetch many metrics with as few GetMetricData calls as possible.
 
-            response = cloudwatch.get_metric_statistics(
-                Namespace=namespace,
-                MetricName=metric_name,
-                Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                StartTime=datetime.datetime.utcnow() - datetime.timedelta(hours=hours),
-                EndTime=datetime.datetime.utcnow(),
-                Period=300,  # 5-minute intervals
-                Statistics=[statistic]
+        Each query is looked up in the time-series cache first and only its missing
+        ranges are fetched. Queries missing the same range (usually the newest tail)
+        share GetMetricData calls of up to MAX_METRIC_DATA_QUERIES (500) queries,
+        and the NextToken pages of each call are merged per query.
+
+        Args:
+            queries: List of dicts with Key (any hashable, used in the result), Namespace,
+                     MetricName, Dimensions, Stat and Period
+            start_time: Start datetime
+            end_time: End datetime
+
+        Returns:
+            Dict Key -> DataFrame with Timestamp and Value columns sorted by Timestamp
+            (empty DataFrame for queries without data)
+        """
+        cache_keys = {}
+        queries_by_gap = defaultdict(list)
+        for query in queries:
+            cache_key = TimeSeriesCache.make_key(
+                query['Namespace'], query['MetricName'], query['Dimensions'], query['Stat'], query['Period']
             )
+            cache_keys[query['Key']] = cache_key
+            for gap in self.timeseries_cache.missing_ranges(cache_key, start_time, end_time):
+                queries_by_gap[gap].append(query)
+
+        for (gap_start, gap_end), gap_queries in queries_by_gap.items():
+            try:
+                points = self._fetch_metric_data(gap_queries, gap_start, gap_end)
+            except Exception as e:
+                # Nothing is stored, so the gap is fetched again on the next request
+                logger.warning("GetMetricData batch of %d queries failed: %s", len(gap_queries), e)
+                continue
+            for query in gap_queries:
+                self.timeseries_cache.store(cache_keys[query['Key']], gap_start, gap_end, points[query['Key']])
+
+        results = {
+            key: self.timeseries_cache.get(cache_key, start_time, end_time)
+            for key, cache_key in cache_keys.items()
+        }
+        self.timeseries_cache.evict()
+        return results
+
+    def metric_series_id(self, query: dict) -> str:
+        """Stored identity (see MetricStore.series_id) of a get_metric_data_batch query."""
+        cache_key = TimeSeriesCache.make_key(
+            query['Namespace'], query['MetricName'], query['Dimensions'], query['Stat'], query['Period']
+        )
+        return MetricStore.series_id(self.account_id, self.region_name, cache_key)
+
+    def get_metric_data_history(self, queries: list, start_time: datetime.datetime,
+                                end_time: datetime.datetime, raise_errors: bool = False,
+                                progress=None) -> dict:
+        """
+        Fetch long historical ranges (monthly reports), reading closed days from the metric store.
 
-            if not response['Datapoints']:
-                return pd.DataFrame()
+        Days (UTC) already closed in the store are never requested again, including days
+        stored at a finer period, which are aggregated to the query period. The remaining
+        days of each query are fetched as whole days, grouped into shared GetMetricData
+        calls, and the days that are now closed are written to the store. Without a
+        store the whole range is fetched, bypassing the in-memory time-series cache
+        (month-long 1-minute series of the fleet would only evict the live series).
 
-            # Convert to DataFrame and sort
-            df = pd.DataFrame(response['Datapoints'])
-            df = df.sort_values(by='Timestamp').reset_index(drop=True)
-            return df
+        Args:
+            queries: Same query dicts as get_metric_data_batch
+            start_time: Start datetime
+            end_time: End datetime
+            raise_errors: If True, raise when a GetMetricData batch fails (after storing the
+                ranges that succeeded) instead of returning its series without those days
+            progress: Optional callback progress(done, total), called on the calling thread
+                each time one of the total GetMetricData windows of the fetch is finished
 
-        except Exception as e:
-            # Don't show error for metrics that might not exist
-            # st.warning(f"Could not retrieve metric {metric_name}: {e}")
+        Returns:
+            Dict Key -> DataFrame with Timestamp and Value columns sorted by Timestamp
+            (empty DataFrame for queries without data)
+        """
+        total = windows_done = 0
+
+        def on_window():
+            nonlocal windows_done
+            windows_done += 1
+            if progress is not None:
+                progress(windows_done, total)
+
+        if self.metric_store is None:
+            total = len(self._metric_data_calls(queries, start_time, end_time))
+            try:
+                points = self._fetch_metric_data(queries, start_time, end_time, on_window)
+            except Exception as e:
+                logger.warning("GetMetricData history batch of %d queries failed: %s", len(queries), e)
+                if raise_errors:
+                    raise
+                points = {}
+            return {
+                query['Key']: self._points_frame([
+                    (to_epoch(timestamp), value) for timestamp, value in points.get(query['Key'], [])
+                ])
+                for query in queries
+            }
+
+        start = to_epoch(start_time)
+        end = to_epoch(end_time)
+        now = int(time.time())
+        first_open_day = self.metric_store.first_open_day(now)
+        days = range(start // SECONDS_PER_DAY, (end - 1) // SECONDS_PER_DAY + 1)
+
+        series_ids = {query['Key']: self.metric_series_id(query) for query in queries}
+        closed = self.metric_store.closed_days(series_ids.values(), days.start, days.stop - 1)
+        finer = self._finer_closed_days(queries, series_ids, closed, days)
+
+        # Consecutive open days become one (whole-day) range; queries missing the same range share calls
+        queries_by_range = defaultdict(list)
+        for query in queries:
+            open_days = [
+                day for day in days
+                if day not in closed[series_ids[query['Key']]] and day not in finer[query['Key']]
+            ]
+            range_start = None
+            for position, day in enumerate(open_days):
+                if range_start is None:
+                    range_start = day
+                if position + 1 == len(open_days) or open_days[position + 1] != day + 1:
+                    queries_by_range[(range_start, day + 1)].append(query)
+                    range_start = None
+
+        fetch_ranges = []  # (first day, stop day, queries, start, end, GetMetricData windows)
+        for (first_day, stop_day), range_queries in queries_by_range.items():
+            range_start = from_epoch(first_day * SECONDS_PER_DAY)
+            range_end = from_epoch(min(stop_day * SECONDS_PER_DAY, now))
+            if range_end <= range_start:
+                continue  # Days that have not started yet
+            windows = len(self._metric_data_calls(range_queries, range_start, range_end))
+            fetch_ranges.append((first_day, stop_day, range_queries, range_start, range_end, windows))
+
+        total = sum(fetch_range[-1] for fetch_range in fetch_ranges)
+        fetched = defaultdict(dict)  # Key -> {epoch seconds: value} of the open days
+        failed = []  # Errors of the ranges that could not be fetched
+        for first_day, stop_day, range_queries, range_start, range_end, windows in fetch_ranges:
+            range_done = windows_done + windows
+            try:
+                points = self._fetch_metric_data(range_queries, range_start, range_end, on_window)
+            except Exception as e:
+                # Nothing is stored, so these days are fetched again on the next request
+                logger.warning("GetMetricData history batch of %d queries failed: %s", len(range_queries), e)
+                failed.append(e)
+                # The windows of the failed range count as finished
+                windows_done = range_done
+                if progress is not None:
+                    progress(windows_done, total)
+                continue
+
+            closed_days = range(first_day, min(stop_day, first_open_day))
+            for query in range_queries:
+                series_points = [(to_epoch(timestamp), value) for timestamp, value in points[query['Key']]]
+                fetched[query['Key']].update(series_points)
+                self.metric_store.write_closed_days(series_ids[query['Key']], closed_days, series_points)
+
+        if failed and raise_errors:
+            raise RuntimeError(
+                f"{len(failed)} of {len(fetch_ranges)} GetMetricData history batches failed: {failed[0]}"
+            )
+
+        stored = self.metric_store.read(series_ids.values(), start, end)
+        finer_ids = {finer_id for finer_days in finer.values() for finer_id in finer_days.values()}
+        finer_stored = self.metric_store.read(finer_ids, start, end) if finer_ids else {}
+        queries_by_key = {query['Key']: query for query in queries}
+
+        results = {}
+        for key, series_id in series_ids.items():
+            window = dict(stored[series_id])
+            if finer[key]:
+                # Days stored at a finer period, aggregated to the query period
+                query = queries_by_key[key]
+                finer_points = [
+                    (ts, value)
+                    for finer_id in set(finer[key].values())
+                    for ts, value in finer_stored[finer_id]
+                    if finer[key].get(ts // SECONDS_PER_DAY) == finer_id
+                ]
+                window.update(self._aggregate_points(finer_points, int(query['Period']), query['Stat']))
+            window.update((ts, value) for ts, value in fetched[key].items() if start <= ts <= end)
+            results[key] = self._points_frame(sorted(window.items()))
+        return results
+
+    @staticmethod
+    def _points_frame(points: list) -> pd.DataFrame:
+        """DataFrame (Timestamp UTC, Value) of sorted (epoch seconds, value) datapoints (empty if none)."""
+        if not points:
             return pd.DataFrame()
+        timestamps, values = zip(*points)
+        return pd.DataFrame({'Timestamp': pd.to_datetime(timestamps, unit='s', utc=True), 'Value': values})
+
+    def _finer_closed_days(self, queries: list, series_ids: dict, closed: dict, days: range) -> dict:
+        """
+        Find the days that are not closed at the query period but are at a finer stored one.
+
+        Returns:
+            Dict Key -> {day number: finer series id}, preferring the finest period
+        """
+        finer = {query['Key']: {} for query in queries}
+        for finer_period in STORED_PERIODS:
+            candidates = {
+                query['Key']: self.metric_series_id({**query, 'Period': finer_period})
+                for query in queries
+                if query['Stat'] in PERIOD_AGGREGATIONS
+                and finer_period < int(query['Period']) and int(query['Period']) % finer_period == 0
+            }
+            if not candidates:
+                continue
+            finer_closed = self.metric_store.closed_days(candidates.values(), days.start, days.stop - 1)
+            for key, finer_id in candidates.items():
+                for day in finer_closed[finer_id] - closed[series_ids[key]]:
+                    finer[key].setdefault(day, finer_id)
+        return finer
+
+    @staticmethod
+    def _aggregate_points(points: list, period: int, statistic: str) -> list:
+        """
+        Combine finer (epoch seconds, value) datapoints into buckets of a coarser period.
+
+        Buckets are aligned to the epoch, like the whole-day ranges of the history reads.
+
+        Returns:
+            List of (bucket epoch seconds, value) tuples sorted by time
+        """
+        buckets = defaultdict(list)
+        for ts, value in points:
+            buckets[ts - ts % period].append(value)
+        aggregate = PERIOD_AGGREGATIONS[statistic]
+        return [(ts, aggregate(values)) for ts, values in sorted(buckets.items())]
+
+    def _fetch_metric_data(self, queries: list, start_time: datetime.datetime,
+                           end_time: datetime.datetime, on_window=None) -> dict:
+        """
+        Run GetMetricData for one time range at the full resolution of every query.
+
+        Queries go in chunks of up to MAX_METRIC_DATA_QUERIES. Long ranges are split into
+        period-aligned time windows of up to MAX_METRIC_DATA_POINTS datapoints per call;
+        the windows run concurrently on the pool and are stitched per query, dropping
+        duplicates at the window boundaries.
+
+        Args:
+            on_window: Optional callback called (on the calling thread) after each window
+
+        Returns:
+            Dict Key -> list of (timestamp, value) tuples sorted by timestamp
+        """
+        cloudwatch = self.get_cross_account_boto3_client('cloudwatch')
+        if not cloudwatch:
+            raise RuntimeError("Failed to get CloudWatch client")
+
+        windows = self._metric_data_calls(queries, start_time, end_time)
+        if len(windows) == 1:
+            window_results = [self._fetch_metric_data_window(cloudwatch, *windows[0])]
+            if on_window is not None:
+                on_window()
+        else:
+            futures = [
+                self._executor.submit(self._fetch_metric_data_window, cloudwatch, *window)
+                for window in windows
+            ]
+            # Any failed window fails the whole range, so callers never store a partial range
+            window_results = []
+            for future in futures:
+                window_results.append(future.result())
+                if on_window is not None:
+                    on_window()
+
+        stitched = {query['Key']: {} for query in queries}
+        for window_result in window_results:
+            for key, points in window_result.items():
+                stitched[key].update(points)
+        return {key: sorted(points.items()) for key, points in stitched.items()}
+
+    @classmethod
+    def _metric_data_calls(cls, queries: list, start_time: datetime.datetime, end_time: datetime.datetime) -> list:
+        """
+        Split a fetch into its GetMetricData calls (query chunk and time window).
+
+        Returns:
+            List of (queries, start, end)
+        """
+        return [
+            (chunk, window_start, window_end)
+            for chunk_start in range(0, len(queries), MAX_METRIC_DATA_QUERIES)
+            for chunk in [queries[chunk_start:chunk_start + MAX_METRIC_DATA_QUERIES]]
+            for window_start, window_end in cls._metric_data_windows(chunk, start_time, end_time)
+        ]
+
+    @staticmethod
+    def _metric_data_windows(queries: list, start_time: datetime.datetime, end_time: datetime.datetime) -> list:
+        """
+        Split a range into time windows whose GetMetricData response fits MAX_METRIC_DATA_POINTS.
+
+        Window boundaries are multiples of every query period, so no bucket is split.
+
+        Returns:
+            List of (start, end) UTC datetimes, oldest first
+        """
+        periods = [int(query['Period']) for query in queries]
+        alignment = math.lcm(*periods)
+        points_per_query = max(1, MAX_METRIC_DATA_POINTS // len(queries))
+        window_seconds = max(alignment, points_per_query * min(periods) // alignment * alignment)
+
+        start = to_epoch(start_time)
+        end = to_epoch(end_time)
+        windows = []
+        window_start = start
+        while window_start < end:
+            window_end = min(end, (window_start // window_seconds + 1) * window_seconds)
+            windows.append((from_epoch(window_start), from_epoch(window_end)))
+            window_start = window_end
+        return windows or [(start_time, end_time)]
+
+    @staticmethod
+    def _fetch_metric_data_window(cloudwatch, queries: list, start_time: datetime.datetime,
+                                  end_time: datetime.datetime) -> dict:
+        """
+        One paginated GetMetricData call (up to MAX_METRIC_DATA_QUERIES queries).
+
+        Returns:
+            Dict Key -> {timestamp: value}
+        """
+        # GetMetricData Ids must start with a lowercase letter; map them back to the keys
+        keys_by_id = {f"q{position}": query['Key'] for position, query in enumerate(queries)}
+        metric_data_queries = [
+            {
+                'Id': query_id,
+                'MetricStat': {
+                    'Metric': {
+                        'Namespace': query['Namespace'],
+                        'MetricName': query['MetricName'],
+                        'Dimensions': query['Dimensions']
+                    },
+                    'Period': query['Period'],
+                    'Stat': query['Stat']
+                },
+                'ReturnData': True
+            }
+            for query_id, query in zip(keys_by_id, queries)
+        ]
+
+        results = {key: {} for key in keys_by_id.values()}
+        pages = cloudwatch.get_paginator('get_metric_data').paginate(
+            MetricDataQueries=metric_data_queries,
+            StartTime=start_time,
+            EndTime=end_time,
+            ScanBy='TimestampAscending'
+        )
+        for page in pages:
+            for result in page['MetricDataResults']:
+                results[keys_by_id[result['Id']]].update(zip(result['Timestamps'], result['Values']))
+        return results
+
+    def get_instance_detail_metrics(self, instance_id: str, hours: int = 3) -> dict:
+        """
+        Get every metric shown on the instance detail page in one GetMetricData batch.
+
+        The exact CWAgent memory and disk metrics of the instance (dimensions differ per
+        device and agent configuration) come from the metric catalog, so CPU, network,
+        memory and disk queries go out together without discovery calls.
+
+        Args:
+            instance_id: EC2 Instance ID
+            hours: Hours of history for the CPU and network charts
+
+        Returns:
+            Dict with:
+                cpu: DataFrame with Timestamp and Average (CPUUtilization)
+                network_in / network_out: DataFrames with Timestamp and Sum
+                memory: Latest memory datapoint dict (Timestamp, Average in %) or None
+                disks: List of dicts with device, usage (%) and dimensions
+        """
+        end_time = datetime.datetime.utcnow()
+        start_time = end_time - datetime.timedelta(hours=hours)
+        latest_since = end_time - datetime.timedelta(minutes=15)
+        instance_dimensions = [{'Name': 'InstanceId', 'Value': instance_id}]
+
+        queries = [
+            {'Key': 'cpu', 'Namespace': 'AWS/EC2', 'MetricName': 'CPUUtilization', 'Stat': 'Average'},
+            {'Key': 'network_in', 'Namespace': 'AWS/EC2', 'MetricName': 'NetworkIn', 'Stat': 'Sum'},
+            {'Key': 'network_out', 'Namespace': 'AWS/EC2', 'MetricName': 'NetworkOut', 'Stat': 'Sum'},
+        ]
+        for query in queries:
+            query.update(Dimensions=instance_dimensions, Period=300)
+
+        # Only the memory metrics the instance actually reports (exact dimensions from the catalog)
+        for position, (namespace, metric_name) in enumerate(MEMORY_METRICS):
+            if namespace == 'CWAgent':
+                catalog_metrics = self.metric_catalog.get_metrics(namespace, instance_id, metric_names=[metric_name])
+                dimensions = catalog_metrics[0]['Dimensions'] if catalog_metrics else None
+            else:
+                dimensions = instance_dimensions
+            if dimensions:
+                queries.append({'Key': ('memory', position), 'Namespace': namespace, 'MetricName': metric_name,
+                                'Dimensions': dimensions, 'Stat': 'Average', 'Period': 300})
+
+        disks = self._get_disk_metrics(instance_id)
+        for position, disk in enumerate(disks):
+            queries.append({'Key': ('disk', position), 'Namespace': 'CWAgent', 'MetricName': disk['metric_name'],
+                            'Dimensions': disk['dimensions'], 'Stat': 'Average', 'Period': 300})
+
+        frames = self.get_metric_data_batch(queries, start_time, end_time)
+
+        def history(key, column):
+            df = frames[key]
+            return df.rename(columns={'Value': column}) if not df.empty else df
+
+        def latest(key):
+            df = frames[key]
+            if df.empty:
+                return None
+            df = df[df['Timestamp'] >= pd.Timestamp(latest_since, tz='UTC')]
+            return None if df.empty else df.iloc[-1]
+
+        # Memory: first metric with data wins, in the same order the detail page used to probe them
+        memory = None
+        for position, (_, metric_name) in enumerate(MEMORY_METRICS):
+            point = latest(('memory', position)) if ('memory', position) in frames else None
+            if point is None:
+                continue
+            value = point['Value']
+            # For Memory Available Bytes, convert to percentage (assuming 8GB total for estimate)
+            if metric_name == 'Memory Available Bytes':
+                available_gb = value / (1024**3)
+                estimated_total_gb = 8  # Default estimate, could be improved
+                value = max(0, 100 - (available_gb / estimated_total_gb * 100))
+            memory = {'Timestamp': point['Timestamp'], 'Average': value}
+            break
+
+        disk_usage = []
+        for position, disk in enumerate(disks):
+            point = latest(('disk', position))
+            if point is None:
+                continue
+            usage_value = point['Value']
+            # Convert Windows "Free Space" to "Used Space"
+            if disk['metric_name'] == 'LogicalDisk % Free Space':
+                usage_value = 100 - usage_value
+            disk_usage.append({
+                'device': disk['device'],
+                'usage': usage_value,
+                'dimensions': disk['dimensions']  # Return all dimensions for debugging
+            })
+
+        return {
+            'cpu': history('cpu', 'Average'),
+            'network_in': history('network_in', 'Sum'),
+            'network_out': history('network_out', 'Sum'),
+            'memory': memory,
+            'disks': disk_usage,
+        }
+
+    def _get_disk_metrics(self, instance_id: str) -> list:
+        """
+        Get the CWAgent disk metrics of an instance (Linux disk_used_percent or
+        Windows LogicalDisk % Free Space) from the metric catalog.
+
+        Returns:
+            List of dicts with metric_name, device and dimensions
+        """
+        metrics_by_name = defaultdict(list)
+        for metric in self.metric_catalog.get_metrics('CWAgent', instance_id, metric_names=DISK_METRIC_NAMES):
+            metrics_by_name[metric['MetricName']].append(metric)
+
+        # Linux metrics take precedence; Windows ones are only used when there are none
+        for metric_name in DISK_METRIC_NAMES:
+            disks = []
+            for metric in metrics_by_name.get(metric_name, []):
+                dims = {dim['Name']: dim['Value'] for dim in metric['Dimensions']}
+
+                # Determine disk name based on OS type
+                if dims.get('objectname') == 'LogicalDisk' and dims.get('instance'):  # Windows drive letter
+                    disk_name = dims['instance']
+                    if any(exclude in disk_name.lower() for exclude in ['_total', 'system', 'harddisk']):
+                        continue
+                else:  # Linux
+                    disk_name = dims.get('device') or dims.get('path') or 'Unknown'
+                    if any(exclude in disk_name.lower() for exclude in ['tmpfs', 'devtmpfs', 'udev', 'proc', 'sys', 'run']):
+                        continue
+
+                disks.append({'metric_name': metric_name, 'device': disk_name, 'dimensions': metric['Dimensions']})
+            if disks:
+                return disks
+        return []
 
     def get_metric_history_by_name(self, instance_name: str, metric_name: str, namespace: str,
                                      start_time: datetime.datetime, end_time: datetime.datetime,
@@ -326,7 +1008,8 @@ class AWSService:
             return df
 
         except Exception as e:
-            st.error(f"Error obteniendo métrica {metric_name} para {instance_name}: {str(e)}")
+            # Logged, not shown: this also runs on worker threads without a Streamlit context
+            logger.warning("Error obteniendo métrica %s para %s: %s", metric_name, instance_name, e)
             return pd.DataFrame()
 
     def get_availability_metrics_for_instance(self, instance_id: str, environment: str) -> list:
@@ -341,37 +1024,25 @@ class AWSService:
             List of metric dictionaries with MetricName and Dimensions
         """
         try:
-            cloudwatch = self.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch:
-                return []
-
             # Determine namespace based on environment
             if environment and environment.upper() == 'PRODUCTION':
                 namespace = 'SAP_Monitoring_Availability_Prod'
             else:
                 namespace = 'SAP_Monitoring_Availability'
 
-            # List all metrics in the namespace filtered by InstanceId
-            paginator = cloudwatch.get_paginator('list_metrics')
-            page_iterator = paginator.paginate(
-                Namespace=namespace,
-                Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}]
-            )
-
-            metrics = []
-            for page in page_iterator:
-                for metric in page['Metrics']:
-                    if 'heartbeat' in metric['MetricName'].lower():
-                        metrics.append(metric)
-
-            return metrics
+            # Metrics of the instance in the namespace, from the metric catalog
+            return [
+                metric for metric in self.metric_catalog.get_metrics(namespace, instance_id)
+                if 'heartbeat' in metric['MetricName'].lower()
+            ]
 
         except Exception as e:
+            logger.warning("Could not list availability metrics for %s: %s", instance_id, e)
             return []
 
     def get_availability_metric_data(self, namespace: str, metric_name: str, dimensions: list,
                                        start_time: datetime.datetime, end_time: datetime.datetime,
-                                       period: int = 900) -> pd.DataFrame:
+                                       period: int = 900, raise_errors: bool = False) -> pd.DataFrame:
         """
         Get availability metric data with dimensions.
 
@@ -382,34 +1053,28 @@ class AWSService:
             start_time: Start datetime
             end_time: End datetime
             period: Period in seconds (default 900 = 15 minutes)
+            raise_errors: If True, re-raise fetch errors instead of returning an empty DataFrame
 
         Returns:
-            DataFrame with Timestamp and metric values
+            DataFrame with Timestamp and Maximum columns
         """
         try:
-            cloudwatch = self.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch:
-                return pd.DataFrame()
-
-            response = cloudwatch.get_metric_statistics(
-                Namespace=namespace,
-                MetricName=metric_name,
-                Dimensions=dimensions,
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=period,
-                Statistics=['Average', 'Minimum', 'Maximum']
-            )
-
-            if not response['Datapoints']:
-                return pd.DataFrame()
-
-            # Convert to DataFrame and sort
-            df = pd.DataFrame(response['Datapoints'])
-            df = df.sort_values(by='Timestamp').reset_index(drop=True)
-            return df
+            query = {
+                'Key': metric_name,
+                'Namespace': namespace,
+                'MetricName': metric_name,
+                'Dimensions': dimensions,
+                'Stat': 'Maximum',
+                'Period': period
+            }
+            # Closed days come from the metric store; only the open tail goes to CloudWatch
+            df = self.get_metric_data_history([query], start_time, end_time, raise_errors=raise_errors)[metric_name]
+            return df.rename(columns={'Value': 'Maximum'})
 
         except Exception as e:
+            logger.warning("Could not retrieve availability metric %s: %s", metric_name, e)
+            if raise_errors:
+                raise
             return pd.DataFrame()
 
     def get_alarms_for_instance(self, instance_id: str):
@@ -0,0 +1,328 @@
+"""
+Inventory Collector that keeps a single shared AWS inventory snapshot for all sessions.
+"""
+import streamlit as st
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, NamedTuple, Optional
+from services.availability_rollups import AvailabilityRollupWorker
+from services.aws_service import AWSService, DEFAULT_REGION
+from services.metric_store import MetricStore
+from utils.debug_log import get_logger
+
+
+logger = get_logger('inventory_collector')
+
+CONNECTION_OK = "Conexión AWS OK"
+
+
+class TargetStatus(NamedTuple):
+    """Result of the last sweep of one (account role, region) target."""
+    name: str
+    account_id: str
+    region: str
+    connection_status: str = "Desconocido"
+    connection_error: Optional[str] = None
+    instance_count: int = 0
+    last_updated: Optional[float] = None
+    stale: bool = False  # True while the target keeps the instances of an earlier sweep
+
+
+class InventorySnapshot(NamedTuple):
+    """Immutable result of one inventory sweep (instances with their alarms)."""
+    instances: tuple = ()
+    last_updated: Optional[float] = None
+    connection_status: str = "Desconocido"
+    connection_error: Optional[str] = None
+    error_message: Optional[str] = None
+    version: int = 0
+    targets: tuple = ()  # TargetStatus per configured target
+    # Lookup tables built once per sweep (see InventoryCollector._build_snapshot)
+    by_id: Optional[dict] = None  # instance ID -> instance
+    by_name: Optional[dict] = None  # Name tag -> instance (first one if repeated)
+    by_environment: Optional[dict] = None  # upper-case Environment -> list of instances
+    # Bumped only when the instances or their report fields (Name, Environment, Schedule) change
+    inventory_version: int = 0
+
+
+class InventoryCollector:
+    """
+    Background collector that refreshes the AWS inventory on a fixed schedule.
+
+    One collector runs per server process (see get_inventory_collector), so the
+    AWS traffic is the same no matter how many browser sessions are connected.
+    Sessions only read the latest published snapshot.
+
+    Every (account role, region) target has its own AWSService and is collected in
+    parallel. A target that fails or does not answer within target_timeout keeps the
+    instances of its last good sweep, so only its own slice of the dashboard goes stale.
+    The first sweep waits for every target instead, so no snapshot is published
+    without the instances of a slow target.
+    """
+
+    def __init__(self, aws_services: List[AWSService], refresh_interval: int = 30,
+                 target_timeout: float = None):
+        """
+        Initialize the collector.
+
+        Args:
+            aws_services: One AWSService per target; the first one is the primary service
+            refresh_interval: Seconds between sweeps
+            target_timeout: Seconds a sweep waits for each target (defaults to refresh_interval;
+                            the first sweep has no timeout)
+        """
+        self.aws_services = list(aws_services)
+        self.aws_service = self.aws_services[0]
+        self.refresh_interval = refresh_interval
+        self.target_timeout = target_timeout or refresh_interval
+        self._snapshot = InventorySnapshot()
+        self._first_sweep_done = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.aws_services), thread_name_prefix='inventory-target'
+        )
+        self._pending = {}  # target index -> Future of a sweep still running
+        self._slices = {}  # target index -> (instances tuple, TargetStatus)
+        self._service_by_instance = {}  # instance ID -> AWSService of its target
+        self._inventory_fingerprint = None
+
+    def start(self):
+        """Start the background refresh thread (no-op if it is already running)."""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="InventoryCollector", daemon=True)
+            self._thread.start()
+
+        # Warm the metric catalogs so the first detail page or report does not wait for them
+        for service in self.aws_services:
+            service.metric_catalog.start()
+
+    def get_snapshot(self, wait_timeout: float = 0) -> InventorySnapshot:
+        """
+        Return the latest published snapshot.
+
+        Args:
+            wait_timeout: Seconds to wait for the first sweep if none has finished yet.
+                          Pages that need data right away (detail, reports) pass a value > 0.
+        """
+        if wait_timeout and not self._first_sweep_done.is_set():
+            self._first_sweep_done.wait(wait_timeout)
+        return self._snapshot
+
+    def get_instance(self, instance_id: str, wait_timeout: float = 0) -> Optional[dict]:
+        """
+        Get one instance by ID (O(1), no AWS call).
+
+        The dict has the dashboard fields (Name, State, AlarmObjects, ...) plus
+        RawInstance, the describe_instances record of the last sweep.
+        """
+        return (self.get_snapshot(wait_timeout).by_id or {}).get(instance_id)
+
+    def get_instance_by_name(self, instance_name: str, wait_timeout: float = 0) -> Optional[dict]:
+        """Get one instance by its Name tag (O(1), no AWS call)."""
+        return (self.get_snapshot(wait_timeout).by_name or {}).get(instance_name)
+
+    def get_instances_by_environment(self, environment: str, wait_timeout: float = 0) -> list:
+        """
+        Get the instances of an environment (case insensitive, no AWS call).
+        Production also includes Production-Burbuja, like the dashboard.
+        """
+        by_environment = self.get_snapshot(wait_timeout).by_environment or {}
+        environment = environment.upper()
+        if environment == 'PRODUCTION':
+            return by_environment.get('PRODUCTION', []) + by_environment.get('PRODUCTION-BURBUJA', [])
+        return list(by_environment.get(environment, []))
+
+    def service_for(self, instance_id: str) -> AWSService:
+        """Return the AWSService of the target an instance belongs to (primary if unknown)."""
+        return self._service_by_instance.get(instance_id, self.aws_service)
+
+    def _run(self):
+        """Refresh loop executed in the background thread."""
+        while True:
+            self._collect()
+            time.sleep(self.refresh_interval)
+
+    def _collect(self):
+        """Run one sweep over every target and publish a new snapshot."""
+        try:
+            # A target still busy with an earlier sweep is not submitted again
+            for index, service in enumerate(self.aws_services):
+                if index not in self._pending:
+                    self._pending[index] = self._executor.submit(self._collect_target, service)
+
+            # Until the first snapshot is out, a slow target would only be published as an empty slice
+            timeout = self.target_timeout if self._first_sweep_done.is_set() else None
+            wait(list(self._pending.values()), timeout=timeout)
+
+            for index, service in enumerate(self.aws_services):
+                future = self._pending[index]
+                if future.done():
+                    del self._pending[index]
+                    self._apply_target_result(index, service, *future.result())
+                else:
+                    self._mark_stale(index, service, "Sin respuesta del destino")
+
+            snapshot = self._build_snapshot()
+        except Exception as e:
+            # Keep the previous instances; only surface the error
+            snapshot = self._snapshot._replace(
+                error_message=str(e),
+                version=self._snapshot.version + 1
+            )
+
+        # Publishing is a single reference assignment, so readers never see a partial snapshot
+        self._snapshot = snapshot
+        self._first_sweep_done.set()
+
+        logger.info("Published snapshot v%d with %d instances from %d targets",
+                    snapshot.version, len(snapshot.instances), len(snapshot.targets))
+
+    @staticmethod
+    def _collect_target(service: AWSService):
+        """
+        Sweep one target (runs on the target pool).
+
+        Returns:
+            Tuple (connection_status, connection_error, instances or None if the sweep failed)
+        """
+        try:
+            connection_status, connection_error = service.test_aws_connection()
+            if connection_status != CONNECTION_OK:
+                return connection_status, connection_error, None
+            return connection_status, None, tuple(service.get_aws_data(raise_errors=True))
+        except Exception as e:
+            return "Error Inesperado de Conexión AWS", str(e), None
+
+    def _apply_target_result(self, index: int, service: AWSService, connection_status: str,
+                             connection_error: Optional[str], instances: Optional[tuple]):
+        """Store the new slice of a target, or keep its previous slice if the sweep failed."""
+        if instances is None:
+            self._mark_stale(index, service, connection_error or connection_status, connection_status)
+            logger.warning("Target %s/%s failed: %s", service.target_name, service.region_name, connection_error)
+            return
+
+        status = TargetStatus(
+            name=service.target_name,
+            account_id=service.account_id,
+            region=service.region_name,
+            connection_status=connection_status,
+            instance_count=len(instances),
+            last_updated=time.time()
+        )
+        self._slices[index] = (instances, status)
+
+    def _mark_stale(self, index: int, service: AWSService, error: str, connection_status: str = None):
+        """Keep the previous instances of a target and record why they were not refreshed."""
+        instances, status = self._slices.get(index, ((), TargetStatus(
+            name=service.target_name, account_id=service.account_id, region=service.region_name
+        )))
+        self._slices[index] = (instances, status._replace(
+            connection_status=connection_status or status.connection_status,
+            connection_error=error,
+            stale=True
+        ))
+
+    def _build_snapshot(self) -> InventorySnapshot:
+        """Merge the target slices, in configuration order, into one snapshot."""
+        instances = []
+        statuses = []
+        service_by_instance = {}
+        by_id = {}
+        by_name = {}
+        by_environment = defaultdict(list)
+        for index, service in enumerate(self.aws_services):
+            target_instances, status = self._slices[index]
+            instances.extend(target_instances)
+            statuses.append(status)
+            for instance in target_instances:
+                service_by_instance[instance['ID']] = service
+                by_id[instance['ID']] = instance
+                by_name.setdefault(instance.get('Name'), instance)
+                by_environment[(instance.get('Environment') or '').upper()].append(instance)
+        self._service_by_instance = service_by_instance
+
+        fingerprint = hash(frozenset(
+            (instance['ID'], instance.get('Name'), instance.get('Environment'), instance.get('Schedule'))
+            for instance in instances
+        ))
+        inventory_version = self._snapshot.inventory_version + (fingerprint != self._inventory_fingerprint)
+        self._inventory_fingerprint = fingerprint
+
+        failed = [status for status in statuses if status.stale or status.connection_status != CONNECTION_OK]
+        updated = [status.last_updated for status in statuses if status.last_updated]
+
+        if len(failed) < len(statuses):
+            connection_status, connection_error = CONNECTION_OK, None
+        else:
+            connection_status = failed[0].connection_status
+            connection_error = failed[0].connection_error
+
+        error_message = "; ".join(
+            f"{status.name} ({status.region}): {status.connection_error}" for status in failed
+        ) or None
+
+        return InventorySnapshot(
+            instances=tuple(instances),
+            last_updated=max(updated) if updated else None,
+            connection_status=connection_status,
+            connection_error=connection_error,
+            error_message=error_message,
+            version=self._snapshot.version + 1,
+            targets=tuple(statuses),
+            by_id=by_id,
+            by_name=by_name,
+            by_environment=dict(by_environment),
+            inventory_version=inventory_version
+        )
+
+
+def build_aws_services(targets: list = None, metric_store: MetricStore = None) -> List[AWSService]:
+    """
+    Create one AWSService per configured target.
+
+    Args:
+        targets: List of dicts with role_arn, region and an optional name
+                 (the aws_targets list in config.yaml); None means the default account
+        metric_store: Metric store shared by every target (None disables it)
+    """
+    if not targets:
+        return [AWSService(metric_store=metric_store)]
+    return [
+        AWSService(
+            role_arn=target['role_arn'],
+            region_name=target.get('region', DEFAULT_REGION),
+            target_name=target.get('name'),
+            metric_store=metric_store
+        )
+        for target in targets
+    ]
+
+
+@st.cache_resource
+def get_inventory_collector(refresh_interval: int = 30, targets: list = None,
+                            metric_store_dir: str = None) -> InventoryCollector:
+    """
+    Create and start the process-wide inventory collector.
+    Cached with st.cache_resource so every session shares the same thread and snapshot.
+
+    Args:
+        refresh_interval: Seconds between sweeps
+        targets: The aws_targets list in config.yaml
+        metric_store_dir: Directory of the on-disk metric store (settings.metric_store_dir);
+                          it also enables the daily availability rollups
+    """
+    metric_store = MetricStore(metric_store_dir) if metric_store_dir else None
+    collector = InventoryCollector(build_aws_services(targets, metric_store), refresh_interval)
+    collector.start()
+
+    # Daily availability rollups of the fleet, written as soon as each day closes
+    if metric_store is not None:
+        collector.rollup_worker = AvailabilityRollupWorker(collector)
+        collector.rollup_worker.start()
+    return collector
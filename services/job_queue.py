@@ -0,0 +1,177 @@
+"""
+Job Queue - In-process worker pool for long-running reports, shared by every session.
+"""
+import streamlit as st
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional
+from utils.debug_log import get_logger
+
+
+logger = get_logger('job_queue')
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_JOB_TTL = 3600  # seconds a finished job (and its result) is kept
+
+# Seconds between the progress polls of a page waiting for a job
+JOB_POLL_INTERVAL = 1
+
+
+class Job:
+    """
+    One submitted job. Only its worker writes it; sessions read its fields while polling.
+
+    The job function receives the job and reports progress with set_progress.
+    """
+
+    def __init__(self, key: Hashable, title: str, ttl: float):
+        """Initialize a queued job."""
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.title = title
+        self.ttl = ttl
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.message = "En cola..."
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the job is done or failed."""
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def set_progress(self, progress: float, message: str = None):
+        """
+        Report progress (called by the job function).
+
+        Args:
+            progress: Fraction done, from 0 to 1
+            message: Text shown next to the progress bar
+        """
+        self.progress = min(max(progress, 0.0), 1.0)
+        if message:
+            self.message = message
+
+
+class JobQueue:
+    """
+    Worker pool that runs long reports outside the Streamlit script thread.
+
+    Jobs are identified by a key (e.g. the report parameters): submitting a key that
+    already has a queued, running or kept job returns that job instead of starting a
+    new one, so duplicate requests from any session attach to the same work. Finished
+    jobs keep their result for their ttl, so a session that reconnects (or any other
+    session) picks it up without running the job again.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS, ttl: float = DEFAULT_JOB_TTL):
+        """
+        Initialize the queue.
+
+        Args:
+            max_workers: Jobs that run at the same time (the rest wait in the queue)
+            ttl: Default seconds a finished job is kept
+        """
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-job')
+        self._jobs = {}  # job ID -> Job
+        self._by_key = {}  # key -> Job
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, title: str, fn: Callable, *args, ttl: float = None, **kwargs) -> Job:
+        """
+        Run fn(job, *args, **kwargs) on the pool, or attach to the job that already has this key.
+
+        Args:
+            key: Identity of the work (hashable)
+            title: Human-readable name of the job (for logs)
+            fn: Job function; its return value becomes job.result
+            ttl: Seconds the finished job is kept (defaults to the queue ttl)
+
+        Returns:
+            The new or existing Job
+        """
+        with self._lock:
+            self._purge()
+            job = self._by_key.get(key)
+            if job is not None:
+                return job
+            job = Job(key, title, self.ttl if ttl is None else ttl)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        logger.info("Job %s queued: %s", job.id, title)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID (None if it expired or never existed)."""
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def discard(self, key: Hashable):
+        """Forget the finished job of a key so the next submit runs it again (running jobs are kept)."""
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.finished:
+                self._forget(job)
+
+    def _run(self, job: Job, fn: Callable, args: tuple, kwargs: dict):
+        """Execute one job on a worker thread."""
+        job.status = JOB_RUNNING
+        job.message = "Procesando..."
+        started = time.perf_counter()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            status = JOB_DONE
+            logger.info("Job %s done in %.1fs: %s", job.id, time.perf_counter() - started, job.title)
+        except Exception as e:
+            job.error = str(e)
+            status = JOB_FAILED
+            logger.warning("Job %s failed after %.1fs: %s: %s", job.id, time.perf_counter() - started, job.title, e)
+
+        # Readers see a finished job only once its result and finish time are set
+        job.progress = 1.0
+        job.finished_at = time.time()
+        with self._lock:
+            job.status = status
+
+    def _purge(self):
+        """Drop finished jobs older than their ttl (called with the lock held)."""
+        now = time.time()
+        expired = [
+            job for job in self._jobs.values()
+            if job.finished and job.finished_at is not None and now - job.finished_at >= job.ttl
+        ]
+        for job in expired:
+            self._forget(job)
+
+    def _forget(self, job: Job):
+        """Remove a job from both indexes (called with the lock held)."""
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+
+@st.cache_resource
+def get_job_queue(max_workers: int = DEFAULT_JOB_WORKERS, ttl: float = DEFAULT_JOB_TTL) -> JobQueue:
+    """
+    Create the process-wide job queue.
+    Cached with st.cache_resource so every session shares the same workers and results.
+
+    Args:
+        max_workers: Jobs that run at the same time (settings.report_job_workers)
+        ttl: Seconds a finished job is kept (settings.report_job_ttl_seconds)
+    """
+    return JobQueue(max_workers, ttl)
@@ -0,0 +1,158 @@
+"""
+Metric Catalog - Fleet-wide index of CloudWatch metrics built from one list_metrics sweep per namespace.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+from utils.debug_log import get_logger
+
+
+logger = get_logger('metric_catalog')
+
+# Namespaces whose metrics are discovered per instance by the detail page and the reports
+CATALOG_NAMESPACES = [
+    'CWAgent',
+    'EC2/ICMPHealthcheck',
+    'SAP_Monitoring_Availability',
+    'SAP_Monitoring_Availability_Prod',
+]
+
+# Metrics change only when agents or checks are (re)configured
+DEFAULT_CATALOG_TTL = 3600  # seconds
+
+
+class NamespaceIndex(NamedTuple):
+    """Metrics of one namespace indexed by their InstanceId and Name dimensions."""
+    by_instance_id: Dict[str, List[dict]]
+    by_name: Dict[str, List[dict]]
+    metric_count: int
+    built_at: float
+
+
+class MetricCatalog:
+    """
+    Background-refreshed catalog of the metrics that exist for each instance.
+
+    Every namespace is swept with a single list_metrics pagination (in parallel, on a
+    small pool of the catalog, so the hourly sweep never queues behind the GetMetricData
+    windows of the AWSService pool) and indexed by InstanceId and Name, so lookups never
+    call AWS.
+    The catalog is rebuilt every ttl seconds; a namespace whose sweep fails keeps its
+    previous index. Note that list_metrics only returns metrics with data in the last
+    two weeks.
+    """
+
+    def __init__(self, aws_service, namespaces: List[str] = None, ttl: int = DEFAULT_CATALOG_TTL):
+        """Initialize the catalog for the target of the given AWS service. Nothing is fetched until first use."""
+        self.aws_service = aws_service
+        self.namespaces = list(namespaces or CATALOG_NAMESPACES)
+        self.ttl = ttl
+        self._indexes = {}  # namespace -> NamespaceIndex, replaced as a whole on every refresh
+        self._first_build_done = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.namespaces), thread_name_prefix='metric-catalog')
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh thread (no-op if it is already running)."""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="MetricCatalog", daemon=True)
+            self._thread.start()
+
+    def is_ready(self) -> bool:
+        """True once the first build has finished."""
+        return self._first_build_done.is_set()
+
+    def get_metrics(self, namespace: str, instance_id: str = None, instance_name: str = None,
+                    metric_names: Optional[List[str]] = None, wait_timeout: float = 30) -> List[dict]:
+        """
+        Look up the metrics of an instance.
+
+        Args:
+            namespace: CloudWatch namespace (one of the catalog namespaces)
+            instance_id: Match metrics whose InstanceId dimension is this ID
+            instance_name: Match metrics whose Name dimension is this name (case insensitive)
+            metric_names: Only return metrics with one of these names
+            wait_timeout: Seconds to wait for the first build if it has not finished yet
+
+        Returns:
+            List of metric dictionaries as returned by list_metrics (Namespace, MetricName, Dimensions)
+        """
+        self.start()
+        if wait_timeout and not self._first_build_done.is_set():
+            self._first_build_done.wait(wait_timeout)
+
+        index = self._indexes.get(namespace)
+        if index is None:
+            return []
+
+        metrics = list(index.by_instance_id.get(instance_id, [])) if instance_id else []
+        if instance_name:
+            known = {id(metric) for metric in metrics}
+            metrics.extend(
+                metric for metric in index.by_name.get(instance_name.upper(), [])
+                if id(metric) not in known
+            )
+
+        if metric_names is not None:
+            metrics = [metric for metric in metrics if metric['MetricName'] in metric_names]
+        return metrics
+
+    def _run(self):
+        """Refresh loop executed in the background thread."""
+        while True:
+            self.refresh()
+            time.sleep(self.ttl)
+
+    def refresh(self):
+        """Sweep every namespace in parallel and publish the new indexes."""
+        started = time.perf_counter()
+        futures = {
+            namespace: self._executor.submit(self._build_namespace_index, namespace)
+            for namespace in self.namespaces
+        }
+
+        indexes = dict(self._indexes)
+        for namespace, future in futures.items():
+            try:
+                indexes[namespace] = future.result()
+            except Exception as e:
+                logger.warning("Could not list metrics for namespace %s (keeping previous index): %s", namespace, e)
+
+        # Publishing is a single reference assignment, so lookups never see a partial catalog
+        self._indexes = indexes
+        self._first_build_done.set()
+
+        logger.info("Metric catalog refreshed in %.1fs: %s", time.perf_counter() - started,
+                    ", ".join(f"{ns}={index.metric_count}" for ns, index in indexes.items()))
+
+    def _build_namespace_index(self, namespace: str) -> NamespaceIndex:
+        """Paginate list_metrics for one namespace and index the metrics by InstanceId and Name."""
+        cloudwatch = self.aws_service.get_cross_account_boto3_client('cloudwatch')
+        if not cloudwatch:
+            raise RuntimeError("Failed to get CloudWatch client")
+
+        by_instance_id = defaultdict(list)
+        by_name = defaultdict(list)
+        seen = set()
+
+        paginator = cloudwatch.get_paginator('list_metrics')
+        for page in paginator.paginate(Namespace=namespace):
+            for metric in page['Metrics']:
+                dimensions = tuple((d['Name'], d['Value']) for d in metric.get('Dimensions', []))
+                identity = (metric['MetricName'], dimensions)
+                if identity in seen:
+                    continue
+                seen.add(identity)
+
+                for name, value in dimensions:
+                    if name == 'InstanceId':
+                        by_instance_id[value].append(metric)
+                    elif name == 'Name':
+                        by_name[value.upper()].append(metric)
+
+        return NamespaceIndex(dict(by_instance_id), dict(by_name), len(seen), time.time())
@@ -0,0 +1,206 @@
+"""
+Metric Store - On-disk SQLite store of closed days of CloudWatch series and their computed availability.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from services.timeseries_cache import DEFAULT_SETTLE_SECONDS
+from utils.debug_log import get_logger
+
+
+logger = get_logger('metric_store')
+
+SECONDS_PER_DAY = 86400
+
+DEFAULT_STORE_FILENAME = 'metrics.sqlite3'
+
+# Columns of a daily availability rollup (AvailabilityCalculator.ROLLUP_COUNTS)
+ROLLUP_COLUMNS = ('total_points', 'available_points', 'scheduled_downtime_points', 'unscheduled_downtime_points')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datapoints (
+    series TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS closed_days (
+    series TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    PRIMARY KEY (series, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_availability (
+    series TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    total_points INTEGER NOT NULL,
+    available_points INTEGER NOT NULL,
+    scheduled_downtime_points INTEGER NOT NULL,
+    unscheduled_downtime_points INTEGER NOT NULL,
+    PRIMARY KEY (series, schedule, day)
+) WITHOUT ROWID;
+"""
+
+
+class MetricStore:
+    """
+    Persistent store of the datapoints of closed (UTC) days, per series.
+
+    A day is closed once it ended more than settle_seconds ago; it is written after a
+    complete fetch and never fetched from CloudWatch again (a closed day without
+    datapoints is stored as such). The daily availability counts of closed days
+    (rollups, see services.availability_rollups) are stored too, so historical reports
+    skip both the API and the calculation.
+    One SQLite file is shared by every target and thread of the process.
+    """
+
+    def __init__(self, directory: str, filename: str = DEFAULT_STORE_FILENAME,
+                 settle_seconds: int = DEFAULT_SETTLE_SECONDS):
+        """
+        Open (or create) the store.
+
+        Args:
+            directory: Directory of the SQLite file (created if missing)
+            filename: SQLite file name
+            settle_seconds: Seconds after its end before a day is considered closed
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, filename)
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        logger.info("Metric store opened at %s", self.path)
+
+    @staticmethod
+    def series_id(account_id: str, region: str, cache_key: tuple) -> str:
+        """Build the stored identity of a series from its TimeSeriesCache key and its target."""
+        namespace, metric_name, dimension_key, statistic, period = cache_key
+        return json.dumps([account_id, region, namespace, metric_name, dimension_key, statistic, period])
+
+    def first_open_day(self, now: float = None) -> int:
+        """Day number (epoch days) of the oldest day that is not closed yet."""
+        return int((now or time.time()) - self.settle_seconds) // SECONDS_PER_DAY
+
+    def closed_days(self, series_ids: Iterable[str], first_day: int, last_day: int) -> Dict[str, Set[int]]:
+        """
+        Get the closed days of several series within a day range.
+
+        Returns:
+            Dict series id -> set of closed day numbers (epoch days)
+        """
+        series_ids = list(series_ids)
+        closed = {series: set() for series in series_ids}
+        with self._lock:
+            for chunk in self._chunks(series_ids):
+                rows = self._connection.execute(
+                    f"SELECT series, day FROM closed_days WHERE day BETWEEN ? AND ? "
+                    f"AND series IN ({','.join('?' * len(chunk))})",
+                    [first_day, last_day, *chunk]
+                ).fetchall()
+                for series, day in rows:
+                    closed[series].add(day)
+        return closed
+
+    def read(self, series_ids: Iterable[str], start: int, end: int) -> Dict[str, List[Tuple[int, float]]]:
+        """
+        Read the stored datapoints of several series.
+
+        Args:
+            series_ids: Series ids from series_id
+            start: Window start (epoch seconds, inclusive)
+            end: Window end (epoch seconds, inclusive)
+
+        Returns:
+            Dict series id -> list of (epoch seconds, value) sorted by time
+        """
+        series_ids = list(series_ids)
+        points = defaultdict(list)
+        with self._lock:
+            for chunk in self._chunks(series_ids):
+                rows = self._connection.execute(
+                    f"SELECT series, ts, value FROM datapoints WHERE ts BETWEEN ? AND ? "
+                    f"AND series IN ({','.join('?' * len(chunk))}) ORDER BY series, ts",
+                    [start, end, *chunk]
+                ).fetchall()
+                for series, ts, value in rows:
+                    points[series].append((ts, value))
+        return {series: points.get(series, []) for series in series_ids}
+
+    def write_closed_days(self, series_id: str, days: Iterable[int], points: List[Tuple[int, float]]):
+        """
+        Store the complete datapoints of closed days of a series and mark the days closed.
+
+        Args:
+            series_id: Series id from series_id
+            days: Day numbers (epoch days) that were fetched completely
+            points: (epoch seconds, value) tuples; points outside the days are ignored
+        """
+        days = set(days)
+        if not days:
+            return
+        rows = [(series_id, ts, value) for ts, value in points if ts // SECONDS_PER_DAY in days]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO datapoints (series, ts, value) VALUES (?, ?, ?)", rows
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO closed_days (series, day) VALUES (?, ?)",
+                [(series_id, day) for day in days]
+            )
+
+    def get_daily_availability(self, series_ids: Iterable[str], schedule: Optional[str],
+                               first_day: int, last_day: int) -> Dict[str, Dict[int, dict]]:
+        """
+        Get the stored daily availability counts (rollups) of several series.
+
+        Args:
+            series_ids: Series ids from series_id
+            schedule: Schedule tag the counts were calculated with (None for no schedule)
+            first_day: First day number (epoch days, inclusive)
+            last_day: Last day number (epoch days, inclusive)
+
+        Returns:
+            Dict series id -> {day number: dict of ROLLUP_COLUMNS counts}
+        """
+        series_ids = list(series_ids)
+        rollups = {series: {} for series in series_ids}
+        with self._lock:
+            for chunk in self._chunks(series_ids):
+                rows = self._connection.execute(
+                    f"SELECT series, day, {', '.join(ROLLUP_COLUMNS)} FROM daily_availability "
+                    f"WHERE schedule = ? AND day BETWEEN ? AND ? "
+                    f"AND series IN ({','.join('?' * len(chunk))})",
+                    [schedule or '', first_day, last_day, *chunk]
+                ).fetchall()
+                for series, day, *counts in rows:
+                    rollups[series][day] = dict(zip(ROLLUP_COLUMNS, counts))
+        return rollups
+
+    def put_daily_availability(self, series_id: str, schedule: Optional[str], rollups: Dict[int, dict]):
+        """Store daily availability counts of a series (only call it for closed, complete days)."""
+        if not rollups:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO daily_availability (series, schedule, day, {', '.join(ROLLUP_COLUMNS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(ROLLUP_COLUMNS))})",
+                [
+                    (series_id, schedule or '', day, *(int(counts[column]) for column in ROLLUP_COLUMNS))
+                    for day, counts in rollups.items()
+                ]
+            )
+
+    @staticmethod
+    def _chunks(values: list, size: int = 500):
+        """Split IN (...) parameter lists below SQLite's variable limit."""
+        for position in range(0, len(values), size):
+            yield values[position:position + size]
@@ -6,8 +6,11 @@ import time
 import json
 import re
 import pandas as pd
+from utils.debug_log import get_logger
 
 
+logger = get_logger('sap_service')
+
 class SAPService:
     """Manages SAP availability operations, wrapping existing functions."""
     
@@ -27,8 +30,7 @@ class SAPService:
             # Get CloudWatch Logs client
             logs_client = self.aws_service.get_cross_account_boto3_client_cached('logs')
             if not logs_client:
-                with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                    f.write(f"[{time.ctime()}] Failed to get CloudWatch Logs client\n")
+                logger.error("Failed to get CloudWatch Logs client")
                 return []
             
             # Get instance details to get the instance name
@@ -94,19 +96,16 @@ class SAPService:
                         parsed_services = self.parse_sap_log_results(results_response['results'], instance_id)
                         sap_services.extend(parsed_services)
                         
-                        with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                            f.write(f"[{time.ctime()}] Found {len(parsed_services)} SAP services in {log_group} for {instance_name}\n")
+                        logger.debug("Found %d SAP services in %s for %s", len(parsed_services), log_group, instance_name)
                     
                 except Exception as log_group_error:
                     # Log group might not exist, continue to next one
-                    with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                        f.write(f"[{time.ctime()}] Log group {log_group} not accessible: {str(log_group_error)}\n")
+                    logger.warning("Log group %s not accessible: %s", log_group, log_group_error)
                     continue
             
             # If no real data found, return placeholder data for demo
             if not sap_services:
-                with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                    f.write(f"[{time.ctime()}] No SAP data found in CloudWatch Logs for {instance_name}, using placeholder data\n")
+                logger.info("No SAP data found in CloudWatch Logs for %s, using placeholder data", instance_name)
                 
                 # Return placeholder data based on instance name patterns
                 return self.get_placeholder_sap_data(instance_name)
@@ -114,8 +113,7 @@ class SAPService:
             return sap_services
             
         except Exception as e:
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Error getting SAP availability data from CloudWatch Logs: {str(e)}\n")
+            logger.error("Error getting SAP availability data from CloudWatch Logs: %s", e)
             return []
 
     def parse_sap_log_results(self, log_results, instance_id):
@@ -209,8 +207,7 @@ class SAPService:
                     }
                 
             except Exception as parse_error:
-                with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                    f.write(f"[{time.ctime()}] Error parsing log result: {str(parse_error)}\n")
+                logger.warning("Error parsing log result: %s", parse_error)
                 continue
         
         return list(services.values())
@@ -365,6 +362,5 @@ class SAPService:
             return None
             
         except Exception as e:
-            with open("/tmp/streamlit_aws_debug.log", "a") as f:
-                f.write(f"[{time.ctime()}] Error getting available.log content: {e}\n")
+            logger.error("Error getting available.log content: %s", e)
             return None
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Time-Series Cache - Keeps fetched CloudWatch datapoints and the ranges they cover, so only gaps are fetched.
+"""
+import calendar
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+import pandas as pd
+
+
+# Datapoints newer than this may still change (late agent data, partial aggregation),
+# so they are never marked as held for good
+DEFAULT_SETTLE_SECONDS = 600
+
+# A not-yet-settled tail fetched this recently is served from the cache as is
+DEFAULT_TAIL_REFRESH_SECONDS = 60
+
+DEFAULT_MAX_SERIES = 5000
+
+# Datapoints kept across every series (a few hundred bytes each in memory)
+DEFAULT_MAX_POINTS = 1000000
+
+
+def to_epoch(value) -> int:
+    """Convert a datetime (naive values are UTC, like datetime.utcnow()) to epoch seconds."""
+    return calendar.timegm(value.utctimetuple())
+
+
+def from_epoch(value: int) -> datetime.datetime:
+    """Convert epoch seconds to a timezone-aware UTC datetime."""
+    return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+
+
+class _Series:
+    """Datapoints of one series plus the settled ranges and the provisional tail they cover."""
+    __slots__ = ('points', 'ranges', 'tail', 'tail_fetched_at')
+
+    def __init__(self):
+        self.points = {}  # epoch seconds -> value
+        self.ranges = []  # sorted, non-overlapping [start, end) epoch ranges that are settled
+        self.tail = None  # (start, end) of the last unsettled range fetched
+        self.tail_fetched_at = 0.0
+
+
+class TimeSeriesCache:
+    """
+    Cache of metric series keyed by (namespace, metric, dimensions, statistic, period).
+
+    For every series it remembers which time ranges were already fetched. Callers ask
+    for the missing ranges of a window, fetch only those (usually just the newest tail),
+    store the result and read the merged, sorted series back. The most recent
+    settle_seconds of a fetch are kept as a provisional tail that is reused for
+    tail_refresh_seconds and then fetched again. Least recently used series are
+    evicted beyond max_series or max_points (datapoints of all series) by evict.
+    """
+
+    def __init__(self, max_series: int = DEFAULT_MAX_SERIES, settle_seconds: int = DEFAULT_SETTLE_SECONDS,
+                 tail_refresh_seconds: int = DEFAULT_TAIL_REFRESH_SECONDS, max_points: int = DEFAULT_MAX_POINTS):
+        """Initialize an empty cache."""
+        self.max_series = max_series
+        self.max_points = max_points
+        self.settle_seconds = settle_seconds
+        self.tail_refresh_seconds = tail_refresh_seconds
+        self._series = OrderedDict()
+        self._points = 0  # datapoints of every series
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, metric_name: str, dimensions: List[dict], statistic: str, period: int) -> tuple:
+        """Build the cache key of a series (dimension order does not matter)."""
+        dimension_key = tuple(sorted((d['Name'], d['Value']) for d in dimensions))
+        return (namespace, metric_name, dimension_key, statistic, int(period))
+
+    def missing_ranges(self, key: tuple, start_time, end_time) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """
+        Get the parts of a window that are not in the cache.
+
+        Args:
+            key: Series key from make_key
+            start_time: Window start (aligned down to the period)
+            end_time: Window end
+
+        Returns:
+            List of (start, end) UTC datetimes to fetch, oldest first
+        """
+        period = key[4]
+        start = to_epoch(start_time) // period * period
+        end = to_epoch(end_time)
+
+        with self._lock:
+            series = self._series.get(key)
+            held = list(series.ranges) if series else []
+            if series and series.tail and time.time() - series.tail_fetched_at < self.tail_refresh_seconds:
+                # A fresh tail also covers the seconds elapsed since it was fetched
+                held.append((series.tail[0], max(series.tail[1], end)))
+
+        gaps = []
+        cursor = start
+        for held_start, held_end in sorted(held):
+            if held_end <= cursor:
+                continue
+            if held_start >= end:
+                break
+            if held_start > cursor:
+                gaps.append((cursor, held_start))
+            cursor = max(cursor, held_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+
+        return [(from_epoch(gap_start), from_epoch(gap_end)) for gap_start, gap_end in gaps]
+
+    def store(self, key: tuple, start_time, end_time, points: List[Tuple]):
+        """
+        Store the datapoints fetched for a range (an empty list records a range without data).
+        Nothing is evicted here, so a batch can read back every series it stored; call
+        evict afterwards.
+
+        Args:
+            key: Series key from make_key
+            start_time: Start of the fetched range
+            end_time: End of the fetched range
+            points: List of (timestamp, value) tuples
+        """
+        period = key[4]
+        start = to_epoch(start_time) // period * period
+        end = to_epoch(end_time)
+        now = time.time()
+        settled_end = min(end, int(now - self.settle_seconds) // period * period)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+            self._series.move_to_end(key)
+
+            # Fresh values replace older ones for the same bucket
+            held_points = len(series.points)
+            for timestamp, value in points:
+                series.points[to_epoch(timestamp)] = value
+            self._points += len(series.points) - held_points
+
+            if settled_end > start:
+                series.ranges = self._merge_ranges(series.ranges + [(start, settled_end)])
+            if end > max(start, settled_end):
+                series.tail = (max(start, settled_end), end)
+                series.tail_fetched_at = now
+
+    def evict(self):
+        """Drop least recently used series until the cache is within max_series and max_points."""
+        with self._lock:
+            while self._series and (len(self._series) > self.max_series or self._points > self.max_points):
+                _, series = self._series.popitem(last=False)
+                self._points -= len(series.points)
+
+    def get(self, key: tuple, start_time, end_time) -> pd.DataFrame:
+        """
+        Read a window of a series.
+
+        Returns:
+            DataFrame with Timestamp (UTC) and Value columns sorted by Timestamp,
+            or an empty DataFrame if there are no datapoints in the window
+        """
+        period = key[4]
+        start = to_epoch(start_time) // period * period
+        end = to_epoch(end_time)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return pd.DataFrame()
+            self._series.move_to_end(key)
+            window = sorted((ts, value) for ts, value in series.points.items() if start <= ts <= end)
+
+        if not window:
+            return pd.DataFrame()
+        timestamps, values = zip(*window)
+        return pd.DataFrame({'Timestamp': pd.to_datetime(timestamps, unit='s', utc=True), 'Value': values})
+
+    def clear(self):
+        """Drop every cached series."""
+        with self._lock:
+            self._series.clear()
+            self._points = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @staticmethod
+    def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Merge overlapping or touching ranges."""
+        merged = []
+        for range_start, range_end in sorted(ranges):
+            if merged and range_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_start, range_end))
+        return merged
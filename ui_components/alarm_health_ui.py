@@ -5,13 +5,18 @@ UI component for the Alarm Health Analysis page.
 import streamlit as st
 from typing import Dict, List
 import math
+import time
+from services.job_queue import JOB_POLL_INTERVAL
 
 class AlarmHealthUI:
     """UI for displaying alarm health analysis."""
 
-    def __init__(self, aws_service):
-        """Initialize with AWS service dependency."""
+    def __init__(self, aws_service, job_queue):
+        """Initialize with AWS service and the process-wide job queue that runs the analysis."""
         self.aws_service = aws_service
+        self.job_queue = job_queue
+        # One analysis per account and region, shared by every session until it expires
+        self.job_key = ('alarm_health', aws_service.account_id, aws_service.region_name)
 
     def display_alarm_health_page(self):
         """Display the full alarm health analysis page."""
@@ -25,25 +30,26 @@ class AlarmHealthUI:
         st.info("Este reporte analiza todas las alarmas de CloudWatch para encontrar problemas comunes como alarmas huérfanas, duplicadas o con estados problemáticos persistentes.")
 
         if st.button("Recargar Análisis", help="Vuelve a ejecutar el análisis de salud de alarmas para obtener los datos más recientes."):
-            if 'alarm_health_results' in st.session_state:
-                del st.session_state['alarm_health_results']
+            self.job_queue.discard(self.job_key)
             st.rerun()
 
-        # Cache analysis results in session state
-        if 'alarm_health_results' not in st.session_state:
-            with st.spinner("Ejecutando análisis... Esto puede tardar uno o dos minutos."):
-                st.session_state.alarm_health_results = self.aws_service.analyze_alarm_health()
-        
-        analysis_results = st.session_state.get('alarm_health_results')
+        # The analysis runs in the background; sessions asking while it runs attach to the same job
+        job = self.job_queue.submit(self.job_key, "Alarm health analysis", self._run_analysis)
+        if not job.finished:
+            self._render_analysis_progress(job.id)
+            return
+
+        analysis_results = job.result
 
         if not analysis_results or 'error' in analysis_results:
-            error_msg = analysis_results.get('error', 'Unknown') if analysis_results else 'Unknown'
+            error_msg = (analysis_results or {}).get('error', job.error or 'Unknown')
             st.error(f"No se pudo completar el análisis de alarmas. Error: {error_msg}")
-            # Clear cached results on error to allow for a retry
-            if 'alarm_health_results' in st.session_state:
-                del st.session_state['alarm_health_results']
+            # Drop the failed analysis to allow for a retry
+            self.job_queue.discard(self.job_key)
             return
 
+        st.caption(f"Análisis ejecutado a las {time.strftime('%H:%M:%S', time.localtime(job.finished_at))}.")
+
         # --- Render Results with Checkboxes ---
         self._display_orphan_alarms(
             "🚨 Alarmas Huérfanas por Instancia Terminada",
@@ -100,6 +106,22 @@ class AlarmHealthUI:
                 st.success("Script generado con éxito. Cópialo y ejecútalo en tu terminal.")
                 st.code(script_text, language='bash')
 
+    def _run_analysis(self, job):
+        """Run the alarm health analysis (on the job queue)."""
+        job.set_progress(0.0, "Ejecutando análisis... Esto puede tardar uno o dos minutos.")
+        return self.aws_service.analyze_alarm_health()
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def _render_analysis_progress(self, job_id):
+        """Show a running analysis; the whole page reruns once it finishes."""
+        job = self.job_queue.get(job_id)
+        if job is None or job.finished:
+            st.rerun()
+
+        st.info(f"⏳ {job.message}")
+        elapsed = int(time.time() - job.submitted_at)
+        st.caption(f"En ejecución desde hace {elapsed} s. Puede salir de esta página y volver más tarde.")
+
     def _display_orphan_alarms(self, title: str, alarms: List[Dict]):
         """Display alarms associated with terminated instances."""
         with st.expander(f"{title} ({len(alarms)})", expanded=True):
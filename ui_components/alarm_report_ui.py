@@ -12,9 +12,10 @@ import re
 class AlarmReportUI:
     """UI component for the global alarm report page."""
     
-    def __init__(self, aws_service):
-        """Initialize the alarm report UI with AWS service."""
+    def __init__(self, aws_service, inventory):
+        """Initialize the alarm report UI with AWS service and shared inventory."""
         self.aws_service = aws_service
+        self.inventory = inventory
     
     def display_alarm_report(self):
         """Display the alarm report page."""
@@ -28,7 +29,7 @@ class AlarmReportUI:
         st.markdown(f"<h3 style='text-align: center; margin: 0;'>Reporte Global de Alarmas</h3>", unsafe_allow_html=True)
         
         # Get all instance data with alarms that have the DashboardGroup tag
-        instances_data = self.aws_service.get_aws_data()
+        instances_data = list(self.inventory.get_snapshot(wait_timeout=60).instances)
         
         # Process alarm data for all instances
         report_data = self._process_alarm_data(instances_data)
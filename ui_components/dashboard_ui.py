@@ -4,16 +4,19 @@ Dashboard UI Components that preserve the exact original UI behavior and appeara
 import streamlit as st
 from collections import defaultdict, Counter
 from copy import deepcopy
-import time
 from utils.helpers import load_css, create_alarm_item_html, create_alarm_legend
+from utils.debug_log import get_logger, get_recent_log_lines
+
+logger = get_logger('dashboard_ui')
 
 
 class DashboardUI:
     """Manages dashboard UI components, preserving original appearance and behavior."""
     
-    def __init__(self, aws_service):
-        """Initialize with AWS service dependency."""
+    def __init__(self, aws_service, inventory):
+        """Initialize with AWS service and shared inventory dependencies."""
         self.aws_service = aws_service
+        self.inventory = inventory
     
     def get_state_color_and_status(self, state: str):
         """Same logic as original function."""
@@ -150,17 +153,14 @@ class DashboardUI:
             with cols[idx % 3]:
                 self.create_server_card(instance)
 
-    def display_debug_log(self):
-        """Display debug log. Same as original function."""
-        try:
-            with open("/tmp/streamlit_aws_debug.log", "r") as f:
-                log_content = f.read()
-            st.subheader("AWS Debug Log (/tmp/streamlit_aws_debug.log)")
-            st.code(log_content, language="text")
-        except FileNotFoundError:
-            st.warning("AWS Debug Log file not found.")
-        except Exception as e:
-            st.error(f"Error reading debug log: {e}")
+    def display_debug_log(self, max_lines: int = 200):
+        """Display the most recent debug log lines from the in-memory ring buffer."""
+        log_lines = get_recent_log_lines(max_lines)
+        st.subheader(f"AWS Debug Log (últimas {max_lines} líneas)")
+        if log_lines:
+            st.code("\n".join(log_lines), language="text")
+        else:
+            st.warning("AWS Debug Log vacío.")
 
     def build_and_display_dashboard(self, environment: str, show_aws_errors: bool):
         """Build and display dashboard. Exact same logic as original function."""
@@ -174,8 +174,12 @@ class DashboardUI:
 
         # Log _data_cache content for debugging
         connection_status = st.session_state.data_cache.get("connection_status", "Desconocido")
-        with open("/tmp/streamlit_aws_debug.log", "a") as f:
-            f.write(f"[{time.ctime()}] Main thread: _data_cache instances count: {len(instances)}, connection_status: {connection_status}\n")
+        logger.debug("Main thread: _data_cache instances count: %d, connection_status: %s", len(instances), connection_status)
+
+        # A failing account/region only keeps its own instances from the last good sweep
+        stale_targets = st.session_state.data_cache.get("stale_targets")
+        if stale_targets and instances:
+            st.warning(f"Datos no actualizados para: {', '.join(stale_targets)}")
 
         if not instances:
             st.info("Cargando datos desde AWS... La primera actualización puede tardar hasta 30 segundos.")
@@ -309,18 +313,16 @@ class DashboardUI:
         if 'poc_vm_id' in st.query_params:
             return  # Don't refresh on detail pages
         
-        # Fetch data
-        connection_status_msg, connection_error_details = self.aws_service.test_aws_connection()
-        st.session_state.data_cache["connection_status"] = connection_status_msg
-        st.session_state.data_cache["connection_error"] = connection_error_details
-
-        if connection_status_msg == "Conexión AWS OK":
-            instances_data = self.aws_service.get_aws_data()
-            st.session_state.data_cache["instances"] = instances_data
-            st.session_state.data_cache["last_updated"] = time.time()
-        else:
-            st.session_state.data_cache["instances"] = []
-            st.session_state.data_cache["last_updated"] = None
+        # Read the shared snapshot; the InventoryCollector thread does the AWS calls
+        snapshot = self.inventory.get_snapshot()
+        st.session_state.data_cache["connection_status"] = snapshot.connection_status
+        st.session_state.data_cache["connection_error"] = snapshot.connection_error
+        st.session_state.data_cache["error_message"] = snapshot.error_message
+        st.session_state.data_cache["instances"] = list(snapshot.instances)
+        st.session_state.data_cache["last_updated"] = snapshot.last_updated
+        st.session_state.data_cache["stale_targets"] = [
+            f"{target.name} ({target.region})" for target in snapshot.targets if target.stale
+        ]
 
         # --- Renderizado del Dashboard ---
         self.build_and_display_dashboard(current_env, show_aws_errors)
@@ -3,164 +3,36 @@ Detail page UI Components that preserve the exact original detail page behavior.
 """
 import streamlit as st
 import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import plotly.graph_objects as go
 import pandas as pd
 from utils.helpers import create_alarm_item_html, create_alarm_legend
 from utils.parameters_loader import ParametersLoader
 
 
+# Seconds a section waits for its AWS data before showing a timeout message
+DETAIL_FETCH_TIMEOUT = 60
+
+# A full reload of the same instance within this window reuses the running/finished fetches
+DETAIL_FETCH_REUSE_SECONDS = 30
+
+
+@st.cache_resource
+def get_detail_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for the detail-page AWS calls (shared by every session)."""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix='detail-page')
+
+
 class DetailUI:
     """Manages detail page UI components, preserving original appearance and behavior."""
     
-    def __init__(self, aws_service):
-        """Initialize with AWS service dependency."""
+    def __init__(self, aws_service, inventory):
+        """Initialize with AWS service and shared inventory dependencies."""
         self.aws_service = aws_service
+        self.inventory = inventory
         self.params_loader = ParametersLoader()
 
-    def get_cpu_utilization(self, instance_id: str):
-        """Get CPU utilization. Same as original function."""
-        try:
-            cloudwatch = self.aws_service.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch: return None
-            response = cloudwatch.get_metric_statistics(
-                Namespace='AWS/EC2', MetricName='CPUUtilization',
-                Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                StartTime=datetime.datetime.utcnow() - datetime.timedelta(minutes=15),
-                EndTime=datetime.datetime.utcnow(), Period=300, Statistics=['Average']
-            )
-            return sorted(response['Datapoints'], key=lambda x: x['Timestamp'], reverse=True)[0] if response['Datapoints'] else None
-        except Exception:
-            return None
-
-    def get_memory_utilization(self, instance_id: str):
-        """Get memory utilization for both Linux and Windows systems."""
-        try:
-            cloudwatch = self.aws_service.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch: return None
-            
-            # Try different memory metrics for Linux and Windows
-            memory_metrics = [
-                # Linux CloudWatch Agent
-                {'Namespace': 'CWAgent', 'MetricName': 'mem_used_percent', 'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]},
-                # Windows CloudWatch Agent - various possible names
-                {'Namespace': 'CWAgent', 'MetricName': 'Memory % Committed Bytes In Use', 'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]},
-                {'Namespace': 'CWAgent', 'MetricName': 'Memory Available Bytes', 'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]},
-                # Windows Performance Counters
-                {'Namespace': 'AWS/EC2', 'MetricName': 'MemoryUtilization', 'Dimensions': [{'Name': 'InstanceId', 'Value': instance_id}]},
-            ]
-            
-            for metric in memory_metrics:
-                try:
-                    response = cloudwatch.get_metric_statistics(
-                        Namespace=metric['Namespace'],
-                        MetricName=metric['MetricName'],
-                        Dimensions=metric['Dimensions'],
-                        StartTime=datetime.datetime.utcnow() - datetime.timedelta(minutes=15),
-                        EndTime=datetime.datetime.utcnow(),
-                        Period=300,
-                        Statistics=['Average']
-                    )
-                    if response['Datapoints']:
-                        datapoint = sorted(response['Datapoints'], key=lambda x: x['Timestamp'], reverse=True)[0]
-                        # For Memory Available Bytes, convert to percentage (assuming 8GB total for estimate)
-                        if metric['MetricName'] == 'Memory Available Bytes':
-                            available_gb = datapoint['Average'] / (1024**3)  # Convert to GB
-                            estimated_total_gb = 8  # Default estimate, could be improved
-                            datapoint['Average'] = max(0, 100 - (available_gb / estimated_total_gb * 100))
-                        return datapoint
-                except Exception:
-                    continue
-            
-            return None
-        except Exception:
-            return None
-
-    def get_disk_utilization(self, instance_id: str):
-        """Get disk utilization for both Linux and Windows systems."""
-        try:
-            cloudwatch = self.aws_service.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch: return []
-            
-            disk_metrics = []
-            
-            # Try different disk metrics for Linux and Windows
-            disk_metric_names = [
-                'disk_used_percent',        # Linux CWAgent
-                'LogicalDisk % Free Space', # Windows CWAgent
-            ]
-            
-            paginator = cloudwatch.get_paginator('list_metrics')
-            
-            for metric_name in disk_metric_names:
-                try:
-                    pages = paginator.paginate(
-                        Namespace='CWAgent',
-                        MetricName=metric_name,
-                        Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}]
-                    )
-                    
-                    for page in pages:
-                        for metric in page['Metrics']:
-                            # Get the device/path/objectname dimension
-                            instance_dim = None # For Windows drive letters
-                            
-                            for dim in metric['Dimensions']:
-                                if dim['Name'] == 'device':
-                                    device = dim['Value']
-                                elif dim['Name'] == 'path':
-                                    path = dim['Value']
-                                elif dim['Name'] == 'objectname':
-                                    objectname = dim['Value']
-                                elif dim['Name'] == 'instance': # This dimension often holds the drive letter
-                                    instance_dim = dim['Value']
-                            
-                            # Determine disk name based on OS type
-                            if objectname == 'LogicalDisk' and instance_dim:  # Windows
-                                disk_name = instance_dim
-                                if any(exclude in disk_name.lower() for exclude in ['_total', 'system', 'harddisk']):
-                                    continue
-                            else:  # Linux
-                                disk_name = device or path or 'Unknown'
-                                if any(exclude in disk_name.lower() for exclude in ['tmpfs', 'devtmpfs', 'udev', 'proc', 'sys', 'run']):
-                                    continue
-                            
-                            if disk_name:
-                                # Get the latest value
-                                response = cloudwatch.get_metric_statistics(
-                                    Namespace='CWAgent',
-                                    MetricName=metric_name,
-                                    Dimensions=metric['Dimensions'],
-                                    StartTime=datetime.datetime.utcnow() - datetime.timedelta(minutes=15),
-                                    EndTime=datetime.datetime.utcnow(),
-                                    Period=300,
-                                    Statistics=['Average']
-                                )
-                                
-                                if response['Datapoints']:
-                                    latest = sorted(response['Datapoints'], key=lambda x: x['Timestamp'], reverse=True)[0]
-                                    usage_value = latest['Average']
-                                    
-                                    # Convert Windows "Free Space" to "Used Space"
-                                    if metric_name == 'LogicalDisk % Free Space':
-                                        usage_value = 100 - usage_value
-                                    
-                                    disk_metrics.append({
-                                        'device': disk_name,
-                                        'usage': usage_value,
-                                        'dimensions': metric['Dimensions'] # Return all dimensions for debugging
-                                    })
-                    
-                    # If we found metrics with this metric name, break to avoid duplicates
-                    if disk_metrics:
-                        break
-                        
-                except Exception:
-                    continue
-            
-            return disk_metrics
-        except Exception:
-            return []
-
     def create_gauge(self, value, title, max_value=100):
         """Create a gauge chart using plotly. Same as original function."""
         # Determine color based on value
@@ -245,12 +117,9 @@ class DetailUI:
         disk_keywords = ['DISK', 'DISCO', 'STORAGE', 'FILESYSTEM', 'VOLUME']
         return any(kw in alarm_name.upper() for kw in disk_keywords)
 
-    def _display_sap_service_alarms(self, alarms: list, instance_details: dict):
+    def _display_sap_service_alarms(self, alarms: list, instance_name: str):
         """Displays a dedicated UI component for specific SAP service alarms."""
         st.markdown("## ✳️ Estado Servicios SAP")
-
-        # Get instance name for alarm matching
-        instance_name = next((tag['Value'] for tag in instance_details.get('Tags', []) if tag['Key'] == 'Name'), instance_details.get('InstanceId', ''))
         
         # Dynamically find all SAP alarms for this instance
         sap_alarms = []
@@ -345,13 +214,17 @@ class DetailUI:
         st.markdown("</div>", unsafe_allow_html=True)
 
     def display_detail_page(self, instance_id: str):
-        """Display detail page. Now uses efficient data fetching."""
-        # Get all data once
-        all_instances_data = self.aws_service.get_aws_data()
-        instance_data = next((inst for inst in all_instances_data if inst.get('ID') == instance_id), None)
-        
-        # Also get detailed metadata (for now, for VPC, SG, etc.)
-        details = self.aws_service.get_instance_details(instance_id)
+        """
+        Display the detail page progressively.
+
+        Header, general info (from the raw describe_instances record kept in the
+        inventory), alarms and the log viewer paint immediately from the shared inventory.
+        Metrics and EBS volumes are fetched concurrently on the detail worker pool; their
+        sections show skeletons and fill in as each result arrives. The log viewer is a
+        fragment, so its download buttons only rerun that section.
+        """
+        # Dictionary lookup in the shared inventory snapshot (no AWS call per page view)
+        instance_data = self.inventory.get_instance(instance_id, wait_timeout=60)
 
         # Preserve columns parameter when returning to dashboard
         columns_param = st.query_params.get('columns', '2')
@@ -361,16 +234,20 @@ class DetailUI:
             st.query_params.update({"columns": columns_param})
             st.rerun()
 
-        if not details or not instance_data:
+        if not instance_data:
             st.error(f"No se pudieron obtener los detalles para la instancia con ID: {instance_id}")
             return
 
-        # Get alarms and name from the pre-fetched, consolidated data
+        # Start the slow AWS calls right away; the sections below only wait for their own result
+        self._start_detail_fetches(instance_id, instance_data)
+
+        # Get alarms, name and instance metadata from the pre-fetched, consolidated data
         alarms = instance_data.get('AlarmObjects', [])
         instance_name = instance_data.get('Name', instance_id)
+        details = instance_data.get('RawInstance', {})
 
         # Get machine state and create badge if not running
-        state = details.get('State', {}).get('Name', 'unknown')
+        state = instance_data.get('State', 'unknown')
         state_badge = ''
         if state != 'running':
             state_info = {
@@ -388,269 +265,387 @@ class DetailUI:
         col1, col2 = st.columns([1, 2])
         with col1:
             st.markdown("## ℹ️ Información General")
-            st.text(f"ID: {details.get('InstanceId')}")
+            st.text(f"ID: {instance_id}")
             st.text(f"Tipo: {details.get('InstanceType')}")
-            st.text(f"Estado: {details.get('State', {}).get('Name')}")
+            st.text(f"Estado: {state}")
             st.text(f"Zona: {details.get('Placement', {}).get('AvailabilityZone')}")
-            st.text(f"IP Privada: {details.get('PrivateIpAddress')}")
-            st.text(f"S.O.: {details.get('PlatformDetails', 'Linux/UNIX')}")
-
-            with st.expander("⚙️ Metadatos de la Instancia"):
-                st.text(f"AMI ID: {details.get('ImageId')}")
-                # Format launch time for readability
-                launch_time = details.get('LaunchTime')
-                if launch_time:
-                    st.text(f"Lanzamiento: {launch_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                st.text(f"VPC ID: {details.get('VpcId')}")
-                st.text(f"Subnet ID: {details.get('SubnetId')}")
-            
-            # Display Security Groups in a separate expander
-            sgs = details.get('SecurityGroups', [])
-            with st.expander(f"🔒 Grupos de Seguridad ({len(sgs)})"):
-                if sgs:
-                    for sg in sgs:
-                        st.text(f"- {sg['GroupName']} ({sg['GroupId']})")
-                else:
-                    st.text("No hay grupos de seguridad asociados.")
+            st.text(f"IP Privada: {instance_data.get('PrivateIP')}")
+            st.text(f"S.O.: {instance_data.get('OperatingSystem', 'Linux/UNIX')}")
+            self._render_instance_metadata(details)
 
             # --- SAP Service Status ---
-            self._display_sap_service_alarms(alarms, details)
+            self._display_sap_service_alarms(alarms, instance_name)
+
+            self._render_alarm_sections(alarms, instance_data.get('BlockDeviceMappings', []))
 
-            st.markdown("## 🚨 Alarmas Generales")
-            st.markdown(create_alarm_legend(), unsafe_allow_html=True)
-            
-            if alarms:
-                # --- Advanced Alarm Categorization ---
-                alerta_disk_alarms = []
-                incidente_disk_alarms = []
-                unassociated_disk_alarms = []
-                other_alarms = []
-                
-                block_devices = details.get('BlockDeviceMappings', [])
-                known_volume_ids = {bd.get('Ebs', {}).get('VolumeId') for bd in block_devices}
-
-                for alarm in alarms:
-                    alarm_name_upper = alarm.get('AlarmName', '').upper()
-
-                    # Exclude SAP alarms from general categorization
-                    if 'INCIDENTE SAP' in alarm_name_upper:
-                        continue
-
-                    # Category 1: Named INCIDENTE-DISK
-                    if 'INCIDENTE-DISK' in alarm_name_upper:
-                        incidente_disk_alarms.append(alarm)
-                        continue
-                    
-                    # Category 2: Named ALERTA-DISK
-                    if 'ALERTA-DISK' in alarm_name_upper:
-                        alerta_disk_alarms.append(alarm)
-                        continue
-
-                    # Category 3: Unassociated Disk Alarms
-                    if self._is_disk_alarm(alarm_name_upper):
-                        is_associated = False
-                        for dim in alarm.get('Dimensions', []):
-                            if dim.get('Name') == 'VolumeId' and dim.get('Value') in known_volume_ids:
-                                is_associated = True
-                                break
-                        if not is_associated:
-                            unassociated_disk_alarms.append(alarm)
-                        else:
-                            other_alarms.append(alarm) # Is a disk alarm, but associated and not named
-                    else:
-                        # Category 4: All other alarms
-                        other_alarms.append(alarm)
-
-                # --- Render Categorized Alarms ---
-                # Determine status for ALERTA-DISK
-                alerta_disk_status_icon = "🟢"
-                if any(alarm.get('StateValue') == 'ALARM' for alarm in alerta_disk_alarms):
-                    alerta_disk_status_icon = "🟡"
-
-                with st.expander(f"{alerta_disk_status_icon} Alarmas ALERTA-DISK ({len(alerta_disk_alarms)})"):
-                    if alerta_disk_alarms:
-                        for alarm in alerta_disk_alarms:
-                            state = alarm.get('StateValue')
-                            alarm_name = alarm.get('AlarmName', '')
-                            # Check if alarm contains SMDA98 to mark as preventive (yellow)
-                            if state == "ALARM" and 'SMDA98' in alarm_name.upper():
-                                color = "yellow"
-                            else:
-                                color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
-                            st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
-                    else:
-                        st.text("No hay alarmas de este tipo.")
-
-                # Determine status for INCIDENTE-DISK
-                incidente_disk_status_icon = "🟢"
-                if any(alarm.get('StateValue') == 'ALARM' for alarm in incidente_disk_alarms):
-                    incidente_disk_status_icon = "🔴"
-
-                with st.expander(f"{incidente_disk_status_icon} Incidentes de Disco ({len(incidente_disk_alarms)})"):
-                    if incidente_disk_alarms:
-                        for alarm in incidente_disk_alarms:
-                            state = alarm.get('StateValue')
-                            alarm_name = alarm.get('AlarmName', '')
-                            color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
-                            st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
-                    else:
-                        st.text("No hay alarmas de este tipo.")
-
-                with st.expander(f"❓ Alarmas de Disco No Asociado ({len(unassociated_disk_alarms)})"):
-                    if unassociated_disk_alarms:
-                        for alarm in unassociated_disk_alarms:
-                            state = alarm.get('StateValue')
-                            alarm_name = alarm.get('AlarmName', '')
-                            # Check if alarm contains SMDA98 to mark as preventive (yellow)
-                            if state == "ALARM" and 'SMDA98' in alarm_name.upper():
-                                color = "yellow"
-                            else:
-                                color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
-                            st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
-                    else:
-                        st.text("No hay alarmas de este tipo.")
-
-                # Render other alarms
-                if other_alarms:
-                    st.markdown("--- ") # Separator
-                    for alarm in other_alarms:
-                        state = alarm.get('StateValue')
-                        alarm_name = alarm.get('AlarmName', '')
-                        # Check if alarm contains SMDA98 to mark as preventive (yellow)
-                        if state == "ALARM" and 'SMDA98' in alarm_name.upper():
-                            color = "yellow"
-                        else:
-                            color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
-                        st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
-            else:
-                st.info("No se encontraron alarmas para esta instancia.")
         with col2:
-            
-            
             st.markdown("---")
             st.markdown("## 📊 Métricas de Rendimiento (Últimas 3 Horas)")
-
-            # --- CPU History Chart ---
-            cpu_df = self.aws_service.get_metric_history(instance_id, 'CPUUtilization', 'AWS/EC2')
-            if not cpu_df.empty:
-                cpu_chart = self.create_history_chart(cpu_df, "🖥️ Uso de CPU (%)", 'Average', 'Uso Promedio (%)')
-                st.plotly_chart(cpu_chart, use_container_width=True)
-            else:
-                st.info("No hay datos históricos de CPU disponibles.")
+            cpu_slot = st.empty()
+            with cpu_slot.container():
+                self._render_skeleton(6)
 
             # --- Network History Chart ---
             st.markdown("### 🌐 Tráfico de Red")
-            net_in_df = self.aws_service.get_metric_history(instance_id, 'NetworkIn', 'AWS/EC2', statistic='Sum')
-            net_out_df = self.aws_service.get_metric_history(instance_id, 'NetworkOut', 'AWS/EC2', statistic='Sum')
-
-            if not net_in_df.empty or not net_out_df.empty:
-                net_fig = go.Figure()
-                if not net_in_df.empty:
-                    net_fig.add_trace(go.Scatter(x=net_in_df['Timestamp'], y=net_in_df['Sum'] / 1024**2, name='Entrada (MB)', line=dict(color='#00d4ff')))
-                if not net_out_df.empty:
-                    net_fig.add_trace(go.Scatter(x=net_out_df['Timestamp'], y=net_out_df['Sum'] / 1024**2, name='Salida (MB)', line=dict(color='#ffb700')))
-                
-                net_fig.update_layout(
-                    title={'text': 'Tráfico de Red (MB)', 'y':0.9, 'x':0.5, 'xanchor': 'center', 'yanchor': 'top', 'font': {'color': 'white', 'size': 16}},
-                    paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0.1)", font_color="white", height=300,
-                    margin=dict(l=20, r=20, t=50, b=20), yaxis_title="Megabytes (MB)", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-                st.plotly_chart(net_fig, use_container_width=True)
-            else:
-                st.info("No hay datos históricos de red disponibles.")
+            network_slot = st.empty()
+            with network_slot.container():
+                self._render_skeleton(6)
 
             # --- Disk I/O History Chart ---
             st.markdown("**💾 Utilización de Discos**")
 
             # --- OS-Level Disk Usage ---
             st.markdown("##### Uso de Disco (Vista del Sistema Operativo)")
-            disk_usage_metrics = self.get_disk_utilization(instance_id)
-            if disk_usage_metrics:
-                df_usage = pd.DataFrame(disk_usage_metrics)
-                df_usage.rename(columns={'device': 'Unidad', 'usage': 'Uso %', 'dimensions': 'Dimensiones'}, inplace=True)
-                df_usage['Uso %'] = df_usage['Uso %'].map('{:,.2f}%'.format)
-                st.dataframe(df_usage[['Unidad', 'Uso %']], use_container_width=True)
-            else:
-                st.info("No se encontraron métricas de uso de disco desde el Agente de CloudWatch.")
+            disk_slot = st.empty()
+            with disk_slot.container():
+                self._render_skeleton(2)
 
             # --- AWS EBS Volume Details ---
             st.markdown("##### Volúmenes EBS (Vista de AWS)")
-            block_devices = details.get('BlockDeviceMappings', [])
-            volume_details = self.aws_service.get_volume_details(block_devices)
-            if volume_details:
-                aws_disk_data = []
-                for mapping in block_devices:
-                    vol_id = mapping.get('Ebs', {}).get('VolumeId')
-                    if vol_id and vol_id in volume_details:
-                        details = volume_details[vol_id]
-                        aws_disk_data.append({
-                            "Device AWS": mapping.get('DeviceName'),
-                            "Tamaño (GB)": details.get('Size'),
-                            "IOPS": details.get('Iops'),
-                            "Tipo": details.get('VolumeType'),
-                            "Owner": details.get('Owner', 'TBD')
-                        })
-                df_vols = pd.DataFrame(aws_disk_data)
-                # Sort by device name
-                df_vols = df_vols.sort_values(by="Device AWS").reset_index(drop=True)
-                st.dataframe(df_vols, use_container_width=True)
-            else:
-                st.info("No se encontraron volúmenes EBS para esta instancia.")
+            volumes_slot = st.empty()
+            with volumes_slot.container():
+                self._render_skeleton(2)
 
             # --- SAP Available.log Viewer ---
-            st.markdown("---")
-            st.markdown("## 📄 Visor de Logs SAP (available.log)")
+            self._render_log_viewer(instance_id, instance_name)
+
+        # Fill each placeholder as soon as its data arrives
+        sections_by_job = {
+            'metrics': [
+                (cpu_slot, self._render_cpu_chart),
+                (network_slot, self._render_network_chart),
+                (disk_slot, self._render_disk_usage),
+            ],
+            'volumes': [(volumes_slot, self._render_ebs_volumes)],
+        }
+        futures = st.session_state.detail_fetches['futures']
+        job_by_future = {futures[job]: job for job in sections_by_job}
+        # Fetches whose failure was already shown in this run (several sections share one fetch)
+        st.session_state.detail_fetches['reported'] = set()
+        try:
+            for future in as_completed(job_by_future, timeout=DETAIL_FETCH_TIMEOUT):
+                for slot, render_section in sections_by_job[job_by_future[future]]:
+                    with slot.container():
+                        render_section(instance_id)
+        except FuturesTimeoutError:
+            for future, job in job_by_future.items():
+                if not future.done():
+                    for slot, _ in sections_by_job[job]:
+                        slot.warning("AWS no respondió a tiempo. Recargue la página para reintentar.")
+
+    def _start_detail_fetches(self, instance_id: str, instance_data: dict):
+        """
+        Submit the detail-page AWS calls to the shared worker pool.
+
+        The futures are kept in the session, so fragment reruns reuse them; a full page
+        load of the same instance starts new fetches only after DETAIL_FETCH_REUSE_SECONDS
+        (the metric calls themselves are mostly served by the time-series cache).
+        """
+        fetches = st.session_state.get('detail_fetches')
+        if (fetches and fetches['instance_id'] == instance_id
+                and time.time() - fetches['started_at'] < DETAIL_FETCH_REUSE_SECONDS):
+            return
 
-            # Get available.log paths from parameters
-            available_log_paths = self.params_loader.get_available_log_paths(instance_id)
-            vm_info = self.params_loader.get_instance_info(instance_id)
+        # Calls go to the account/region the instance was collected from
+        aws_service = self.inventory.service_for(instance_id)
+        executor = get_detail_executor()
+        st.session_state.detail_fetches = {
+            'instance_id': instance_id,
+            'started_at': time.time(),
+            'futures': {
+                'metrics': executor.submit(aws_service.get_instance_detail_metrics, instance_id, 3),
+                'volumes': executor.submit(aws_service.get_volume_details,
+                                           instance_data.get('BlockDeviceMappings', []), raise_errors=True),
+            },
+        }
+
+    def _get_fetch_result(self, job: str, default=None):
+        """
+        Result of a detail fetch (waits if it is still running).
+        A failed or timed-out fetch is shown here, on the script thread, once per run
+        (by the first section that reads it), and gives the default.
+        """
+        fetches = st.session_state.detail_fetches
+        future = fetches['futures'][job]
+        reported = fetches.setdefault('reported', set())
+        try:
+            result = future.result(timeout=DETAIL_FETCH_TIMEOUT)
+        except FuturesTimeoutError:
+            if job not in reported:
+                reported.add(job)
+                st.warning("AWS no respondió a tiempo. Recargue la página para reintentar.")
+            return default
+        except Exception as e:
+            if job not in reported:
+                reported.add(job)
+                st.error(f"Error al obtener datos de AWS: {e}")
+            return default
+        return default if result is None else result
+
+    def _render_skeleton(self, lines: int = 3):
+        """Grey placeholder bars shown while a section is loading."""
+        bars = "".join(
+            "<div style='height: 0.9rem; margin: 0.5rem 0; border-radius: 4px; "
+            "background: rgba(255,255,255,0.08);'></div>"
+            for _ in range(lines)
+        )
+        st.markdown(f"<div>{bars}</div>", unsafe_allow_html=True)
+
+    def _render_instance_metadata(self, details: dict):
+        """Instance metadata and security groups (from the describe_instances record)."""
+        with st.expander("⚙️ Metadatos de la Instancia"):
+            st.text(f"AMI ID: {details.get('ImageId')}")
+            # Format launch time for readability
+            launch_time = details.get('LaunchTime')
+            if launch_time:
+                st.text(f"Lanzamiento: {launch_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            st.text(f"VPC ID: {details.get('VpcId')}")
+            st.text(f"Subnet ID: {details.get('SubnetId')}")
+
+        # Display Security Groups in a separate expander
+        sgs = details.get('SecurityGroups', [])
+        with st.expander(f"🔒 Grupos de Seguridad ({len(sgs)})"):
+            if sgs:
+                for sg in sgs:
+                    st.text(f"- {sg['GroupName']} ({sg['GroupId']})")
+            else:
+                st.text("No hay grupos de seguridad asociados.")
+
+    def _render_alarm_sections(self, alarms: list, block_devices: list):
+        """General alarms, split into disk categories (renders from inventory data only)."""
+        st.markdown("## 🚨 Alarmas Generales")
+        st.markdown(create_alarm_legend(), unsafe_allow_html=True)
 
-            if not available_log_paths:
-                st.info("No se encontraron archivos available.log configurados para esta instancia.")
+        if not alarms:
+            st.info("No se encontraron alarmas para esta instancia.")
+            return
+
+        # --- Advanced Alarm Categorization ---
+        alerta_disk_alarms = []
+        incidente_disk_alarms = []
+        unassociated_disk_alarms = []
+        other_alarms = []
+
+        known_volume_ids = {bd.get('Ebs', {}).get('VolumeId') for bd in block_devices}
+
+        for alarm in alarms:
+            alarm_name_upper = alarm.get('AlarmName', '').upper()
+
+            # Exclude SAP alarms from general categorization
+            if 'INCIDENTE SAP' in alarm_name_upper:
+                continue
+
+            # Category 1: Named INCIDENTE-DISK
+            if 'INCIDENTE-DISK' in alarm_name_upper:
+                incidente_disk_alarms.append(alarm)
+                continue
+
+            # Category 2: Named ALERTA-DISK
+            if 'ALERTA-DISK' in alarm_name_upper:
+                alerta_disk_alarms.append(alarm)
+                continue
+
+            # Category 3: Unassociated Disk Alarms
+            if self._is_disk_alarm(alarm_name_upper):
+                is_associated = False
+                for dim in alarm.get('Dimensions', []):
+                    if dim.get('Name') == 'VolumeId' and dim.get('Value') in known_volume_ids:
+                        is_associated = True
+                        break
+                if not is_associated:
+                    unassociated_disk_alarms.append(alarm)
+                else:
+                    other_alarms.append(alarm) # Is a disk alarm, but associated and not named
+            else:
+                # Category 4: All other alarms
+                other_alarms.append(alarm)
+
+        # --- Render Categorized Alarms ---
+        # Determine status for ALERTA-DISK
+        alerta_disk_status_icon = "🟢"
+        if any(alarm.get('StateValue') == 'ALARM' for alarm in alerta_disk_alarms):
+            alerta_disk_status_icon = "🟡"
+
+        with st.expander(f"{alerta_disk_status_icon} Alarmas ALERTA-DISK ({len(alerta_disk_alarms)})"):
+            if alerta_disk_alarms:
+                for alarm in alerta_disk_alarms:
+                    state = alarm.get('StateValue')
+                    alarm_name = alarm.get('AlarmName', '')
+                    # Check if alarm contains SMDA98 to mark as preventive (yellow)
+                    if state == "ALARM" and 'SMDA98' in alarm_name.upper():
+                        color = "yellow"
+                    else:
+                        color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
+                    st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
+            else:
+                st.text("No hay alarmas de este tipo.")
+
+        # Determine status for INCIDENTE-DISK
+        incidente_disk_status_icon = "🟢"
+        if any(alarm.get('StateValue') == 'ALARM' for alarm in incidente_disk_alarms):
+            incidente_disk_status_icon = "🔴"
+
+        with st.expander(f"{incidente_disk_status_icon} Incidentes de Disco ({len(incidente_disk_alarms)})"):
+            if incidente_disk_alarms:
+                for alarm in incidente_disk_alarms:
+                    state = alarm.get('StateValue')
+                    alarm_name = alarm.get('AlarmName', '')
+                    color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
+                    st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
             else:
-                st.markdown(f"**{len(available_log_paths)} archivo(s) disponible(s):**")
-
-                # Display each path as a download button
-                for idx, log_path in enumerate(available_log_paths):
-                    col_btn, col_info = st.columns([1, 3])
-
-                    with col_btn:
-                        # Create unique key for each button
-                        button_key = f"download_log_{instance_id}_{idx}"
-
-                        if st.button(f"📥 Descargar", key=button_key, help=f"Descargar {log_path}"):
-                            # Get OS type
-                            os_type = vm_info.get('os_type', 'linux') if vm_info else 'linux'
-
-                            # Show loading message
-                            with st.spinner(f"Leyendo archivo desde instancia..."):
-                                result = self.aws_service.read_file_from_instance(
-                                    instance_id=instance_id,
-                                    file_path=log_path,
-                                    os_type=os_type
-                                )
-
-                            if result['success']:
-                                # Generate filename: AvailableLog_SERVERNAME_PATH_YYYYMMDD_HHMM.log
-                                now = datetime.datetime.now()
-                                timestamp = now.strftime("%Y%m%d_%H%M")
-
-                                # Clean path for filename (replace / or \ with _)
-                                clean_path = log_path.replace('/', '_').replace('\\', '_').replace(':', '')
-
-                                filename = f"AvailableLog_{instance_name}_{clean_path}_{timestamp}.log"
-
-                                # Offer download
-                                st.download_button(
-                                    label=f"💾 Guardar como {filename}",
-                                    data=result['content'],
-                                    file_name=filename,
-                                    mime="text/plain",
-                                    key=f"save_{button_key}"
-                                )
-                                st.success("✅ Archivo leído correctamente")
-                            else:
-                                st.error(f"❌ Error al leer archivo: {result['error']}")
-
-                    with col_info:
-                        st.code(log_path, language=None)
\ No newline at end of file
+                st.text("No hay alarmas de este tipo.")
+
+        with st.expander(f"❓ Alarmas de Disco No Asociado ({len(unassociated_disk_alarms)})"):
+            if unassociated_disk_alarms:
+                for alarm in unassociated_disk_alarms:
+                    state = alarm.get('StateValue')
+                    alarm_name = alarm.get('AlarmName', '')
+                    # Check if alarm contains SMDA98 to mark as preventive (yellow)
+                    if state == "ALARM" and 'SMDA98' in alarm_name.upper():
+                        color = "yellow"
+                    else:
+                        color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
+                    st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
+            else:
+                st.text("No hay alarmas de este tipo.")
+
+        # Render other alarms
+        if other_alarms:
+            st.markdown("--- ") # Separator
+            for alarm in other_alarms:
+                state = alarm.get('StateValue')
+                alarm_name = alarm.get('AlarmName', '')
+                # Check if alarm contains SMDA98 to mark as preventive (yellow)
+                if state == "ALARM" and 'SMDA98' in alarm_name.upper():
+                    color = "yellow"
+                else:
+                    color = "red" if state == "ALARM" else "gray" if state == "INSUFFICIENT_DATA" else "green"
+                st.markdown(create_alarm_item_html(alarm_name, color), unsafe_allow_html=True)
+
+    def _render_cpu_chart(self, instance_id: str):
+        """CPU history chart (from the detail-page metric batch)."""
+        cpu_df = self._get_fetch_result('metrics', {}).get('cpu', pd.DataFrame())
+        if not cpu_df.empty:
+            cpu_chart = self.create_history_chart(cpu_df, "🖥️ Uso de CPU (%)", 'Average', 'Uso Promedio (%)')
+            st.plotly_chart(cpu_chart, use_container_width=True)
+        else:
+            st.info("No hay datos históricos de CPU disponibles.")
+
+    def _render_network_chart(self, instance_id: str):
+        """Network in/out chart (from the detail-page metric batch)."""
+        metrics = self._get_fetch_result('metrics', {})
+        net_in_df = metrics.get('network_in', pd.DataFrame())
+        net_out_df = metrics.get('network_out', pd.DataFrame())
+
+        if not net_in_df.empty or not net_out_df.empty:
+            net_fig = go.Figure()
+            if not net_in_df.empty:
+                net_fig.add_trace(go.Scatter(x=net_in_df['Timestamp'], y=net_in_df['Sum'] / 1024**2, name='Entrada (MB)', line=dict(color='#00d4ff')))
+            if not net_out_df.empty:
+                net_fig.add_trace(go.Scatter(x=net_out_df['Timestamp'], y=net_out_df['Sum'] / 1024**2, name='Salida (MB)', line=dict(color='#ffb700')))
+
+            net_fig.update_layout(
+                title={'text': 'Tráfico de Red (MB)', 'y':0.9, 'x':0.5, 'xanchor': 'center', 'yanchor': 'top', 'font': {'color': 'white', 'size': 16}},
+                paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0.1)", font_color="white", height=300,
+                margin=dict(l=20, r=20, t=50, b=20), yaxis_title="Megabytes (MB)", legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            )
+            st.plotly_chart(net_fig, use_container_width=True)
+        else:
+            st.info("No hay datos históricos de red disponibles.")
+
+    def _render_disk_usage(self, instance_id: str):
+        """OS-level disk usage table (from the detail-page metric batch)."""
+        disk_usage_metrics = self._get_fetch_result('metrics', {}).get('disks', [])
+        if disk_usage_metrics:
+            df_usage = pd.DataFrame(disk_usage_metrics)
+            df_usage.rename(columns={'device': 'Unidad', 'usage': 'Uso %', 'dimensions': 'Dimensiones'}, inplace=True)
+            df_usage['Uso %'] = df_usage['Uso %'].map('{:,.2f}%'.format)
+            st.dataframe(df_usage[['Unidad', 'Uso %']], use_container_width=True)
+        else:
+            st.info("No se encontraron métricas de uso de disco desde el Agente de CloudWatch.")
+
+    def _render_ebs_volumes(self, instance_id: str):
+        """EBS volume table (describe_volumes for the block devices in the inventory)."""
+        volume_details = self._get_fetch_result('volumes', {})
+        instance_data = self.inventory.get_instance(instance_id) or {}
+        block_devices = instance_data.get('BlockDeviceMappings', [])
+        if volume_details:
+            aws_disk_data = []
+            for mapping in block_devices:
+                vol_id = mapping.get('Ebs', {}).get('VolumeId')
+                if vol_id and vol_id in volume_details:
+                    details = volume_details[vol_id]
+                    aws_disk_data.append({
+                        "Device AWS": mapping.get('DeviceName'),
+                        "Tamaño (GB)": details.get('Size'),
+                        "IOPS": details.get('Iops'),
+                        "Tipo": details.get('VolumeType'),
+                        "Owner": details.get('Owner', 'TBD')
+                    })
+            df_vols = pd.DataFrame(aws_disk_data)
+            # Sort by device name
+            df_vols = df_vols.sort_values(by="Device AWS").reset_index(drop=True)
+            st.dataframe(df_vols, use_container_width=True)
+        else:
+            st.info("No se encontraron volúmenes EBS para esta instancia.")
+
+    @st.fragment
+    def _render_log_viewer(self, instance_id: str, instance_name: str):
+        """SAP available.log viewer; a download only reruns this fragment."""
+        st.markdown("---")
+        st.markdown("## 📄 Visor de Logs SAP (available.log)")
+
+        # Get available.log paths from parameters
+        available_log_paths = self.params_loader.get_available_log_paths(instance_id)
+        vm_info = self.params_loader.get_instance_info(instance_id)
+
+        if not available_log_paths:
+            st.info("No se encontraron archivos available.log configurados para esta instancia.")
+            return
+
+        st.markdown(f"**{len(available_log_paths)} archivo(s) disponible(s):**")
+
+        # Display each path as a download button
+        for idx, log_path in enumerate(available_log_paths):
+            col_btn, col_info = st.columns([1, 3])
+
+            with col_btn:
+                # Create unique key for each button
+                button_key = f"download_log_{instance_id}_{idx}"
+
+                if st.button(f"📥 Descargar", key=button_key, help=f"Descargar {log_path}"):
+                    # Get OS type
+                    os_type = vm_info.get('os_type', 'linux') if vm_info else 'linux'
+
+                    # Show loading message
+                    with st.spinner(f"Leyendo archivo desde instancia..."):
+                        result = self.inventory.service_for(instance_id).read_file_from_instance(
+                            instance_id=instance_id,
+                            file_path=log_path,
+                            os_type=os_type
+                        )
+
+                    if result['success']:
+                        # Generate filename: AvailableLog_SERVERNAME_PATH_YYYYMMDD_HHMM.log
+                        now = datetime.datetime.now()
+                        timestamp = now.strftime("%Y%m%d_%H%M")
+
+                        # Clean path for filename (replace / or \ with _)
+                        clean_path = log_path.replace('/', '_').replace('\\', '_').replace(':', '')
+
+                        filename = f"AvailableLog_{instance_name}_{clean_path}_{timestamp}.log"
+
+                        # Offer download
+                        st.download_button(
+                            label=f"💾 Guardar como {filename}",
+                            data=result['content'],
+                            file_name=filename,
+                            mime="text/plain",
+                            key=f"save_{button_key}"
+                        )
+                        st.success("✅ Archivo leído correctamente")
+                    else:
+                        st.error(f"❌ Error al leer archivo: {result['error']}")
+
+            with col_info:
+                st.code(log_path, language=None)
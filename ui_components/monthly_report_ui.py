@@ -2,10 +2,23 @@
 Monthly Report UI component for historical alarm and metrics reporting.
 """
 import streamlit as st
+import importlib.util
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from typing import Optional
 import plotly.graph_objects as go
 import pandas as pd
-from utils.availability_calculator import AvailabilityCalculator
+from services.availability_rollups import (
+    AvailabilityRollups, availability_series, ping_query, sap_service_name
+)
+from services.job_queue import JOB_FAILED, JOB_POLL_INTERVAL
+from services.timeseries_cache import DEFAULT_SETTLE_SECONDS
+from utils.pdf_charts import ChartRasterPool, create_binary_step_chart
+from utils.report_cache import DEFAULT_OPEN_RANGE_TTL, ReportCache, ReportResult
+from utils.state_intervals import encode_intervals, outage_intervals, step_points
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.units import inch
@@ -13,14 +26,71 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
 from reportlab.lib import colors
+from utils.debug_log import get_logger
+
+
+logger = get_logger('monthly_report_ui')
+
+# Metric batches collected at the same time by all report sessions. The CloudWatch calls are
+# also paced by the per account/region ApiRateLimiter, so this only bounds threads and open connections.
+REPORT_MAX_WORKERS = 8
+
+# CloudWatch keeps 1-minute datapoints for 15 days and 5-minute datapoints for 63 days
+RESOLUTION_BY_AGE = [
+    (timedelta(days=15), 60),
+    (timedelta(days=63), 300),
+]
+
+
+@st.cache_resource
+def get_report_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for the monthly report AWS calls (shared by every session)."""
+    return ThreadPoolExecutor(max_workers=REPORT_MAX_WORKERS, thread_name_prefix='monthly-report')
+
+
+@st.cache_resource
+def get_report_cache() -> ReportCache:
+    """Process-wide cache of built reports (shared by every session)."""
+    return ReportCache()
+
+
+@st.cache_resource
+def get_chart_raster_pool(max_workers: int = None) -> Optional[ChartRasterPool]:
+    """
+    Process-wide pool of chart rasterization workers (only used by the 'plotly' PDF renderer).
+    Returns None, warning once per process, if kaleido (an optional dependency) is not installed.
+    """
+    if importlib.util.find_spec('kaleido') is None:
+        logger.warning("pdf_chart_renderer is 'plotly' but kaleido is not installed; using native PDF charts")
+        return None
+    return ChartRasterPool(max_workers)
 
 
 class MonthlyReportUI:
     """UI component for the monthly report page."""
 
-    def __init__(self, aws_service):
-        """Initialize the monthly report UI with AWS service."""
+    def __init__(self, aws_service, inventory, job_queue, pdf_chart_renderer='native', pdf_render_workers=None):
+        """
+        Initialize the monthly report UI with AWS service and shared inventory.
+
+        Args:
+            job_queue: Process-wide JobQueue that builds the reports in the background
+            pdf_chart_renderer: 'native' (ReportLab vector charts) or 'plotly' (Plotly PNGs
+                                rendered in a process pool; needs kaleido and Chromium,
+                                and falls back to 'native' if kaleido is not installed)
+            pdf_render_workers: Worker processes of the 'plotly' renderer (defaults to CPU cores)
+        """
         self.aws_service = aws_service
+        self.inventory = inventory
+        self.job_queue = job_queue
+        self.pdf_render_workers = pdf_render_workers
+
+        # Process-wide resources are resolved here, on the script thread, because the
+        # reports are built on job queue threads (no ScriptRunContext there)
+        self.report_executor = get_report_executor()
+        self.report_cache = get_report_cache()
+        self.chart_raster_pool = get_chart_raster_pool(pdf_render_workers) if pdf_chart_renderer == 'plotly' else None
+        self.pdf_chart_renderer = 'plotly' if self.chart_raster_pool is not None else 'native'
 
     def _get_available_months(self):
         """
@@ -76,6 +146,30 @@ class MonthlyReportUI:
 
         return months
 
+    def _get_available_periods(self):
+        """
+        Get the report periods of the selector: year to date, quarters and months.
+        Returns list of tuples: (display_name, start_date, end_date), most recent first
+        """
+        months = self._get_available_months()
+        first_available = months[-1][1]
+        today = datetime.now().date()
+
+        # Quarters made of the available months (the first one may be partial)
+        quarters = []
+        for _, month_start, month_end in reversed(months):
+            display_name = f"{(month_start.month - 1) // 3 + 1}º Trimestre {month_start.year}"
+            if quarters and quarters[-1][0] == display_name:
+                quarters[-1] = (display_name, quarters[-1][1], month_end)
+            else:
+                quarters.append((display_name, month_start, month_end))
+        quarters.reverse()
+
+        year_start = max(datetime(today.year, 1, 1).date(), first_available)
+        year_to_date = (f"Año {today.year} a la fecha", year_start, today)
+
+        return [year_to_date] + quarters + months
+
     def _get_current_month_dates(self):
         """Get first day of current month and today's date."""
         now = datetime.now()
@@ -93,8 +187,8 @@ class MonthlyReportUI:
             st.query_params.update({"columns": columns_param})
             st.rerun()
 
-        # Get available months
-        available_months = self._get_available_months()
+        # Get available periods (year to date, quarters and months)
+        available_months = self._get_available_periods()
 
         # Initialize session state for dates if not exists
         if 'monthly_report_start_date' not in st.session_state:
@@ -116,14 +210,14 @@ class MonthlyReportUI:
 
         st.markdown("---")
 
-        # Month selector dropdown and date pickers in compact layout
+        # Period selector dropdown and date pickers in compact layout
         col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
 
         with col1:
             # Dropdown with month options
             month_options = ["Personalizado"] + [m[0] for m in available_months]
             selected_month_index = st.selectbox(
-                "Seleccionar mes:",
+                "Seleccionar período:",
                 options=range(len(month_options)),
                 format_func=lambda x: month_options[x],
                 index=st.session_state.selected_month_index,
@@ -204,137 +298,329 @@ class MonthlyReportUI:
             # Validate dates
             if start_date > end_date:
                 st.error("La fecha de inicio debe ser anterior a la fecha de término.")
+                st.session_state.pop('monthly_report_query', None)
             else:
-                # Process based on metric type
-                if metric_type == "Ping":
-                    self._display_ping_metrics(start_date, end_date)
-                elif metric_type == "Availability":
-                    self._display_availability_metrics(start_date, end_date)
-                elif metric_type == "Availability Percentage":
-                    st.info("Funcionalidad de Availability Percentage en desarrollo...")
+                # The last query stays on screen across reruns (downloads, widget changes)
+                st.session_state.monthly_report_query = (metric_type, start_date, end_date)
+
+        if st.session_state.get('monthly_report_query'):
+            self._display_report(*st.session_state.monthly_report_query)
+
+    def _display_report(self, metric_type, start_date, end_date):
+        """
+        Display a report from the process-wide report cache, building it on a miss.
+
+        Reports are built by a background job of the shared job queue, so the session only
+        polls its progress; asking again for a report that is being built (from this or any
+        other session) attaches to the running job instead of starting another one.
+
+        The cache key includes the inventory version, so a report is rebuilt when the
+        instances change; reports of ranges with open days also expire after a few minutes.
+        """
+        inventory_version = self.inventory.get_snapshot(wait_timeout=60).inventory_version
+        cache_key = (metric_type, start_date, end_date, inventory_version)
+        result = self.report_cache.get(cache_key)
+
+        if result is None:
+            closed = datetime.utcnow() >= (
+                datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+                + timedelta(seconds=DEFAULT_SETTLE_SECONDS)
+            )
+            ttl = None if closed else DEFAULT_OPEN_RANGE_TTL
+            # Finished jobs of open ranges expire with their cached report; the others use the queue ttl
+            job = self.job_queue.submit(
+                cache_key, f"{metric_type} {start_date} - {end_date}", self._run_report_job,
+                metric_type, start_date, end_date, cache_key, ttl, ttl=ttl
+            )
+
+            if job.status == JOB_FAILED:
+                st.error(f"No se pudo generar el informe. Error: {job.error}")
+                if st.button("Reintentar", key="monthly_report_retry"):
+                    self.job_queue.discard(cache_key)
+                    st.rerun()
+                return
+            if not job.finished:
+                self._render_job_progress(job.id)
+                return
+            result = job.result
+
+        self._render_report_result(result)
+        self._render_outage_table(result)
+        self._render_pdf_download(result)
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def _render_job_progress(self, job_id):
+        """Show the progress of a report job; the whole page reruns once it finishes."""
+        job = self.job_queue.get(job_id)
+        if job is None or job.finished:
+            st.rerun()
+
+        st.progress(job.progress, text=job.message)
+        st.caption("El informe se genera en segundo plano: puede salir de esta página y volver más tarde.")
+
+    def _run_report_job(self, job, metric_type, start_date, end_date, cache_key, cache_ttl):
+        """
+        Build a report (runs on the job queue) and store it in the report cache.
+
+        Args:
+            job: Job used to report progress
+            cache_key: Report cache key of the report
+            cache_ttl: Seconds the report stays cached (None for closed ranges)
+
+        Returns:
+            The ReportResult of the built report
+        """
+        if metric_type == "Ping":
+            result = self._build_ping_report(job, start_date, end_date)
+        elif metric_type == "Availability":
+            result = self._build_availability_report(job, start_date, end_date)
+        elif metric_type == "Availability Percentage":
+            result = self._build_availability_percentage(job, start_date, end_date)
+        else:
+            raise ValueError(f"Unknown metric type: {metric_type}")
+
+        if result.errors:
+            # A partial report is rebuilt soon, like a report of an open range
+            cache_ttl = DEFAULT_OPEN_RANGE_TTL if cache_ttl is None else min(cache_ttl, DEFAULT_OPEN_RANGE_TTL)
+            job.ttl = min(job.ttl, cache_ttl)
+        self.report_cache.put(cache_key, result, ttl=cache_ttl)
+        return result
+
+    def _render_report_result(self, result):
+        """Display a built report."""
+        st.markdown(f"### {result.title}")
+        if result.errors:
+            st.warning(
+                f"Informe incompleto: {len(result.errors)} consulta(s) a CloudWatch fallaron y sus series "
+                f"aparecen sin datos. El informe se volverá a generar en unos minutos. ({result.errors[0]})"
+            )
+        for subtitle, charts in result.sections:
+            st.markdown(f"#### {subtitle}")
+
+            # Display charts for this environment in a 4-column grid
+            cols_per_row = 4
+            for row_start in range(0, len(charts), cols_per_row):
+                cols = st.columns(cols_per_row)
+                for col_idx, chart_data in enumerate(charts[row_start:row_start + cols_per_row]):
+                    with cols[col_idx]:
+                        st.plotly_chart(chart_data[2], use_container_width=True)
+
+            if charts:
+                # Add spacing between environment sections
+                st.markdown("---")
+
+        if not result.sections and result.table is not None:
+            if result.table.empty:
+                st.info("No se encontraron datos de disponibilidad para el período seleccionado.")
+            else:
+                self._render_availability_table(result.table)
+
+    def _render_outage_table(self, result):
+        """Show the outages of a chart report (from the state intervals of its series)."""
+        if result.outages is None or result.outages.empty:
+            return
+
+        with st.expander(f"Interrupciones ({len(result.outages)})"):
+            st.dataframe(
+                result.outages,
+                column_config={
+                    'Inicio (UTC)': st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm"),
+                    'Fin (UTC)': st.column_config.DatetimeColumn(format="DD/MM/YYYY HH:mm")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
+    def _render_pdf_download(self, result):
+        """Show the PDF download button of a report (no rerun on click)."""
+        if not result.pdf_bytes:
+            return
+
+        st.markdown("---")
+
+        # Show download button in centered column
+        col1, col2, col3 = st.columns([2, 1, 2])
+        with col2:
+            st.download_button(
+                label="📄 Descargar PDF",
+                data=result.pdf_bytes,
+                file_name=result.pdf_filename,
+                mime="application/pdf",
+                on_click="ignore",
+                use_container_width=True,
+                type="primary"
+            )
+
+    @staticmethod
+    def _render_availability_table(table):
+        """Display an availability percentage table, one section per environment."""
+        for environment, rows in table.groupby('Entorno', sort=False):
+            servers = rows['Servidor'].nunique()
+            st.markdown(f"#### {environment} ({servers} servidor{'es' if servers > 1 else ''})")
+            st.dataframe(
+                rows.drop(columns=['Entorno']),
+                column_config={
+                    'Disponibilidad (%)': st.column_config.NumberColumn(format="%.2f %%")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
+    @staticmethod
+    def _build_availability_table(sections):
+        """Availability per chart of a report, as a DataFrame (Entorno, Servidor, Disponibilidad (%))."""
+        rows = [
+            {'Entorno': environment, 'Servidor': label, 'Disponibilidad (%)': round(availability_percentage, 2)}
+            for environment, charts in sections
+            for label, availability_percentage, _, _ in charts
+        ]
+        return pd.DataFrame(rows, columns=['Entorno', 'Servidor', 'Disponibilidad (%)'])
+
+    @staticmethod
+    def _build_outage_table(sections):
+        """Outages (runs at 0) of every chart of a report, as a DataFrame in display order."""
+        frames = [
+            outage_intervals(intervals).assign(Entorno=environment, Servidor=label)
+            for environment, charts in sections
+            for label, _, _, intervals in charts
+        ]
+        columns = ['Entorno', 'Servidor', 'Inicio (UTC)', 'Fin (UTC)', 'Duración (min)']
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
+
+    def _build_report_result(self, job, title, sections, start_date, end_date, pdf_prefix, pdf_units, line_color,
+                             errors=()):
+        """
+        Generate the PDF of a built report and bundle everything for the report cache.
+
+        Args:
+            job: Job used to report progress
+            title: Report title
+            sections: List of (environment display name, subtitle, charts)
+            pdf_prefix: PDF file name prefix (e.g. 'Ping_Report')
+            pdf_units: Singular and plural noun used in the progress text (e.g. ('servidor', 'servidores'))
+            line_color: Hex color of the PDF chart lines
+            errors: Failed fetches of a partial report
+        """
+        # We'll store chart data for PDF generation (all environments, in display order)
+        all_charts_data = [chart_data for _, _, charts in sections for chart_data in charts]
+
+        pdf_bytes = pdf_filename = None
+        if all_charts_data:
+            unit = pdf_units[0] if len(all_charts_data) == 1 else pdf_units[1]
+            job.set_progress(job.progress, f"Preparando informe PDF con {len(all_charts_data)} {unit}...")
+            pdf_bytes = self._generate_pdf_report(all_charts_data, start_date, end_date, line_color).getvalue()
+            pdf_filename = f"{pdf_prefix}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.pdf"
+
+        return ReportResult(
+            title=title,
+            sections=tuple((subtitle, tuple(charts)) for _, subtitle, charts in sections),
+            table=self._build_availability_table([(environment, charts) for environment, _, charts in sections]),
+            outages=self._build_outage_table([(environment, charts) for environment, _, charts in sections]),
+            pdf_bytes=pdf_bytes,
+            pdf_filename=pdf_filename,
+            built_at=time.time(),
+            errors=tuple(errors)
+        )
 
     def _get_instance_data_by_name(self, instance_name):
         """Get instance ID and Schedule tag from instance name."""
-        try:
-            # Get all instances data (cached)
-            instances_data = self.aws_service.get_aws_data()
-
-            # Find instance by name
-            for instance in instances_data:
-                if instance.get('Name') == instance_name:
-                    return {
-                        'ID': instance.get('ID'),
-                        'Name': instance.get('Name'),
-                        'Schedule': instance.get('Schedule', None)  # Case sensitive
-                    }
-
-            return None
-        except Exception as e:
-            st.error(f"Error buscando instancia: {str(e)}")
+        # Dictionary lookup in the shared inventory snapshot
+        instance = self.inventory.get_instance_by_name(instance_name, wait_timeout=60)
+        if not instance:
             return None
+        return {
+            'ID': instance.get('ID'),
+            'Name': instance.get('Name'),
+            'Schedule': instance.get('Schedule', None)  # Case sensitive
+        }
 
     def _get_instances_by_environment(self, environment):
         """Get all instances for a specific environment."""
-        try:
-            # Get all instances data (cached)
-            instances_data = self.aws_service.get_aws_data()
-
-            # Filter instances by environment
-            # Para Production, también incluir Production-Burbuja
-            env_instances = []
-            for instance in instances_data:
-                instance_env = instance.get('Environment', '').upper()
-                if environment.upper() == 'PRODUCTION':
-                    if instance_env in ['PRODUCTION', 'PRODUCTION-BURBUJA']:
-                        env_instances.append({
-                            'ID': instance.get('ID'),
-                            'Name': instance.get('Name'),
-                            'Schedule': instance.get('Schedule', None)
-                        })
-                else:
-                    if instance_env == environment.upper():
-                        env_instances.append({
-                            'ID': instance.get('ID'),
-                            'Name': instance.get('Name'),
-                            'Schedule': instance.get('Schedule', None)
-                        })
-
-            return env_instances
-        except Exception as e:
-            st.error(f"Error obteniendo instancias de {environment}: {str(e)}")
-            return []
-
-    def _get_ping_metric_with_dimensions(self, instance_id, instance_name, start_time, end_time, period):
-        """
-        Get PingReachable metric using both InstanceId and Name dimensions.
-
-        The EC2/ICMPHealthcheck namespace requires BOTH dimensions.
+        # Para Production, también incluye Production-Burbuja (see InventoryCollector)
+        return [
+            {
+                'ID': instance.get('ID'),
+                'Name': instance.get('Name'),
+                'Schedule': instance.get('Schedule', None)
+            }
+            for instance in self.inventory.get_instances_by_environment(environment, wait_timeout=60)
+        ]
+
+    def _calculate_availability(self, aws_service, query, df, schedule_tag, start_datetime, end_datetime,
+                                value_column='Maximum'):
         """
-        try:
-            # Get CloudWatch client
-            cloudwatch = self.aws_service.get_cross_account_boto3_client('cloudwatch')
-            if not cloudwatch:
-                return pd.DataFrame()
-
-            # Query with BOTH dimensions
-            response = cloudwatch.get_metric_statistics(
-                Namespace='EC2/ICMPHealthcheck',
-                MetricName='PingReachable',
-                Dimensions=[
-                    {'Name': 'InstanceId', 'Value': instance_id},
-                    {'Name': 'Name', 'Value': instance_name}
-                ],
-                StartTime=start_time,
-                EndTime=end_time,
-                Period=period,
-                Statistics=['Maximum']
-            )
+        Calculate availability with the AvailabilityCalculator.
+        Closed days come from their daily rollups in the metric store (see AvailabilityRollups).
+        """
+        return AvailabilityRollups(aws_service).calculate(
+            query, df, schedule_tag, start_datetime, end_datetime, value_column=value_column
+        )
 
-            if not response['Datapoints']:
-                return pd.DataFrame()
+    def _get_ping_metrics_batch(self, aws_service, instances, start_time, end_time, period, progress=None):
+        """
+        Get the PingReachable series of many instances with batched GetMetricData calls.
 
-            # Convert to DataFrame and sort
-            df = pd.DataFrame(response['Datapoints'])
-            df = df.sort_values(by='Timestamp').reset_index(drop=True)
-            return df
+        The EC2/ICMPHealthcheck namespace requires BOTH dimensions (InstanceId and Name).
+        Up to 500 instances share one request, whose NextToken pages are merged by
+        AWSService.get_metric_data_history.
 
-        except Exception as e:
-            st.error(f"Error obteniendo métrica PingReachable: {str(e)}")
-            return pd.DataFrame()
+        Args:
+            aws_service: AWSService of the target the instances belong to
+            instances: List of instance dicts with ID and Name
+            progress: Optional progress(done, total) callback per GetMetricData window
 
-    def _calculate_optimal_period(self, start_date, end_date):
+        Returns:
+            DataFrame with InstanceId, Timestamp and Maximum columns, one row per datapoint
         """
-        Calculate optimal period to avoid CloudWatch 1440 datapoints limit.
+        queries = [ping_query(instance, period) for instance in instances]
+        # Closed days come from the metric store; only the open tail goes to CloudWatch
+        series = aws_service.get_metric_data_history(
+            queries, start_time, end_time, raise_errors=True, progress=progress
+        )
 
-        CloudWatch limits: max 1440 datapoints per request.
-        Formula: period = total_seconds / 1440
+        frames = [df.assign(InstanceId=instance_id) for instance_id, df in series.items() if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=['InstanceId', 'Timestamp', 'Maximum'])
+        return pd.concat(frames, ignore_index=True).rename(columns={'Value': 'Maximum'})[
+            ['InstanceId', 'Timestamp', 'Maximum']
+        ]
 
-        Minimum period is 60 seconds (1 minute).
+    def _calculate_optimal_period(self, start_date, end_date):
         """
-        # Calculate total seconds in the date range
-        total_seconds = (end_date - start_date).total_seconds()
-
-        # Calculate minimum period to stay under 1440 datapoints
-        min_period = total_seconds / 1440
-
-        # Round up to nearest minute (60 seconds minimum)
-        period = max(60, int(min_period / 60) * 60)
+        Calculate the finest period CloudWatch still keeps for the whole range.
 
-        # CloudWatch accepts periods: 60, 300 (5min), 900 (15min), 3600 (1hr), 86400 (1day)
-        # Round to next valid period
-        valid_periods = [60, 300, 900, 3600, 21600, 86400]  # 1min, 5min, 15min, 1hr, 6hr, 1day
-        period = next((p for p in valid_periods if p >= period), 86400)
+        GetMetricData has no 1440-datapoint limit (long ranges are fetched in concurrent
+        time windows, see AWSService._fetch_metric_data), so the period only depends on
+        CloudWatch retention of the oldest datapoint:
+        - up to 15 days old: 60 seconds (1 minute)
+        - up to 63 days old: 300 seconds (5 minutes)
+        - older: 3600 seconds (1 hour)
 
-        return period
+        Closed days already in the metric store at a finer period (stored while the range
+        was recent) are aggregated to the coarser period, not fetched again.
+        """
+        age = datetime.utcnow() - start_date
+        for max_age, period in RESOLUTION_BY_AGE:
+            if age <= max_age:
+                return period
+        return 3600
 
-    def _generate_pdf_report(self, charts_data, start_date, end_date):
+    def _generate_pdf_report(self, charts_data, start_date, end_date, line_color='#1f77b4'):
         """
         Generate PDF report with charts in landscape format.
 
+        Charts are drawn natively as ReportLab vector step lines (no Plotly image
+        export, so no Chromium); the Plotly figures are only used by the UI.
+
         Args:
-            charts_data: List of tuples (instance_name, availability_percentage, fig)
+            charts_data: List of tuples (label, availability_percentage, fig, intervals), where
+                         intervals are the StateIntervals of the series
             start_date: Report start date
             end_date: Report end date
+            line_color: Hex color of the chart lines
 
         Returns:
             BytesIO object containing the PDF
@@ -361,15 +647,8 @@ class MonthlyReportUI:
         story.append(Paragraph(title_text, title_style))
         story.append(Spacer(1, 0.3 * inch))
 
-        # Convert charts to images and add to PDF
-        # Organize in 4 columns (same as UI)
-        chart_images = []
-
-        for instance_name, availability_percentage, fig in charts_data:
-            # Convert plotly figure to image bytes
-            img_bytes = fig.to_image(format="png", width=300, height=250)
-            img = Image(BytesIO(img_bytes), width=2.4*inch, height=2*inch)
-            chart_images.append(img)
+        # Organize charts in 4 columns (same as UI)
+        chart_images = self._render_pdf_charts(charts_data, start_date, end_date, line_color)
 
         # Create table with 4 columns (landscape orientation)
         if chart_images:
@@ -400,11 +679,137 @@ class MonthlyReportUI:
         buffer.seek(0)
         return buffer
 
-    def _display_ping_metrics(self, start_date, end_date):
-        """Display ping metrics for the selected period organized by environment."""
+    def _render_pdf_charts(self, charts_data, start_date, end_date, line_color):
+        """
+        Render the charts of the PDF report as flowables, in order.
+
+        The 'plotly' renderer rasterizes the UI figures in the process pool and falls back
+        to the native charts if the export fails (e.g. Chromium missing).
+        """
+        if self.pdf_chart_renderer == 'plotly':
+            try:
+                images = self.chart_raster_pool.rasterize([chart[2] for chart in charts_data], width=300, height=250)
+                return [Image(BytesIO(img_bytes), width=2.4*inch, height=2*inch) for img_bytes in images]
+            except Exception as e:
+                logger.warning("Plotly chart export failed, using native PDF charts: %s", e)
+
+        # Draw charts as vector graphics
+        start_datetime = datetime.combine(start_date, datetime.min.time())
+        end_datetime = datetime.combine(end_date, datetime.max.time())
+        return [
+            create_binary_step_chart(
+                title="{} - Disp: {:.1f}%".format(label, availability_percentage),
+                intervals=intervals,
+                start=start_datetime,
+                end=end_datetime,
+                width=2.4*inch,
+                height=2*inch,
+                line_color=line_color
+            )
+            for label, availability_percentage, fig, intervals in charts_data
+        ]
+
+    @staticmethod
+    def _build_step_figure(intervals, chart_title, start_datetime, end_datetime, name, line_color, title_size):
+        """
+        Build the Plotly chart of a 0/1 series from its state intervals.
+
+        Only the transitions are sent to the browser (two vertices per run, with a break
+        where datapoints are missing), instead of a line and a marker per datapoint.
+        """
+        step_x, step_y = step_points(intervals)
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=pd.to_datetime(step_x, unit='s', utc=True),
+            y=step_y,
+            mode='lines',
+            name=name,
+            line=dict(color=line_color, width=2),
+            hovertemplate='<b>Fecha:</b> %{x|%d/%m/%Y %H:%M}<br><b>Estado:</b> %{y}<extra></extra>'
+        ))
+
+        # Configure layout for binary data (0 or 1)
+        fig.update_layout(
+            title=dict(
+                text=chart_title,
+                x=0.5,
+                xanchor='center',
+                font=dict(size=title_size, family='Arial, sans-serif', color='black')
+            ),
+            height=300,
+            margin=dict(l=30, r=20, t=50, b=40),
+            xaxis=dict(
+                title="",
+                gridcolor='lightgray',
+                showgrid=True,
+                tickfont=dict(color='black'),
+                range=[start_datetime, end_datetime]
+            ),
+            yaxis=dict(
+                title="",
+                gridcolor='lightgray',
+                showgrid=True,
+                tickmode='array',
+                tickvals=[0, 1],
+                ticktext=['0', '1'],
+                range=[-0.1, 1.1],
+                tickfont=dict(color='black')
+            ),
+            hovermode='x unified',
+            plot_bgcolor='white',
+            paper_bgcolor='white'
+        )
+        return fig
+
+    def _build_ping_chart(self, aws_service, instance_data, df, start_datetime, end_datetime, period):
+        """
+        Build the ping chart of one instance.
+
+        Returns:
+            Tuple (instance_name, availability_percentage, fig, intervals), or None if there is no data
+        """
+        instance_name = instance_data['Name']
+        schedule_tag = instance_data['Schedule']
+
+        # Skip silently if no data
+        if df.empty:
+            return None
+
+        # Calculate availability using the AvailabilityCalculator
+        stat_column = 'Maximum' if 'Maximum' in df.columns else 'Average'
+        availability_stats = self._calculate_availability(
+            aws_service, ping_query(instance_data, period), df, schedule_tag,
+            start_datetime, end_datetime, value_column=stat_column
+        )
+
+        # Use scheduled availability percentage (excludes scheduled downtime)
+        availability_percentage = availability_stats['scheduled_availability_percentage']
+
+        # Format title string (avoiding potential f-string issues with %)
+        chart_title = "{} - Disp: {:.1f}%".format(instance_name, availability_percentage)
+
+        # Step line of the state transitions (a few vertices instead of every datapoint)
+        intervals = encode_intervals(df['Timestamp'], df[stat_column], period)
+        fig = self._build_step_figure(
+            intervals, chart_title, start_datetime, end_datetime,
+            name='Ping Status', line_color='#1f77b4', title_size=16
+        )
+
+        return instance_name, availability_percentage, fig, intervals
+
+    def _build_ping_report(self, job, start_date, end_date):
+        """
+        Build the ping report of the selected period organized by environment (runs on the job queue).
+        Returns the ReportResult of the built report.
+
+        The PingReachable series of every instance of a target come from one batched
+        GetMetricData request; targets are fetched concurrently on the shared report pool.
+        Charts keep the environment/inventory order; instances without data get no chart.
+        """
         # Title
         title_text = f"Métricas de Ping Desde {start_date.strftime('%d/%m/%Y')} hasta {end_date.strftime('%d/%m/%Y')}"
-        st.markdown(f"### {title_text}")
 
         # Convert dates to datetime objects with time
         start_datetime = datetime.combine(start_date, datetime.min.time())
@@ -413,9 +818,6 @@ class MonthlyReportUI:
         # Calculate optimal period once (same for all instances)
         period = self._calculate_optimal_period(start_datetime, end_datetime)
 
-        # We'll store chart data for PDF generation (all environments)
-        all_charts_data = []
-
         # Process each environment in order: Production, QA, DEV
         environments = [
             ('Production', 'Producción'),
@@ -423,149 +825,181 @@ class MonthlyReportUI:
             ('DEV', 'Desarrollo')
         ]
 
+        sections = []
         for env_tag, env_display_name in environments:
-            # Get instances for this environment
-            with st.spinner(f"Obteniendo servidores de {env_display_name}..."):
-                env_instances = self._get_instances_by_environment(env_tag)
+            env_instances = self._get_instances_by_environment(env_tag)
 
             # Skip if no instances found
             if not env_instances:
                 continue
 
-            # Display section subtitle
-            st.markdown(f"#### {env_display_name} ({len(env_instances)} servidor{'es' if len(env_instances) > 1 else ''})")
-
-            # Store charts for this environment section
-            section_charts_data = []
-
-            # Process each instance in this environment
-            for idx, instance_data in enumerate(env_instances):
-                instance_id = instance_data['ID']
-                instance_name = instance_data['Name']
-                schedule_tag = instance_data['Schedule']
-
-                with st.spinner(f"Obteniendo datos de {instance_name}..."):
-                    # Get metric data from CloudWatch using BOTH dimensions
-                    df = self._get_ping_metric_with_dimensions(
-                        instance_id=instance_id,
-                        instance_name=instance_name,
-                        start_time=start_datetime,
-                        end_time=end_datetime,
-                        period=period
-                    )
-
-                    # Skip silently if no data
-                    if df.empty:
-                        continue
-
-                    # Calculate availability using the AvailabilityCalculator
-                    stat_column = 'Maximum' if 'Maximum' in df.columns else 'Average'
-                    availability_stats = AvailabilityCalculator.calculate_availability(
-                        df=df,
-                        schedule_tag=schedule_tag,
-                        value_column=stat_column
-                    )
-
-                    # Use scheduled availability percentage (excludes scheduled downtime)
-                    availability_percentage = availability_stats['scheduled_availability_percentage']
-
-                    # Format title string (avoiding potential f-string issues with %)
-                    chart_title = "{} - Disp: {:.1f}%".format(instance_name, availability_percentage)
-
-                    # Create plotly line chart
-                    fig = go.Figure()
-
-                    fig.add_trace(go.Scatter(
-                        x=df['Timestamp'],
-                        y=df[stat_column],
-                        mode='lines+markers',
-                        name='Ping Status',
-                        line=dict(color='#1f77b4', width=2),
-                        marker=dict(size=4),
-                        hovertemplate='<b>Fecha:</b> %{x|%d/%m/%Y %H:%M}<br><b>Estado:</b> %{y}<extra></extra>'
-                    ))
-
-                    # Configure layout for binary data (0 or 1)
-                    fig.update_layout(
-                        title=dict(
-                            text=chart_title,
-                            x=0.5,
-                            xanchor='center',
-                            font=dict(size=16, family='Arial, sans-serif', color='black')
-                        ),
-                        height=300,
-                        margin=dict(l=30, r=20, t=50, b=40),
-                        xaxis=dict(
-                            title="",
-                            gridcolor='lightgray',
-                            showgrid=True,
-                            tickfont=dict(color='black'),
-                            range=[start_datetime, end_datetime]
-                        ),
-                        yaxis=dict(
-                            title="",
-                            gridcolor='lightgray',
-                            showgrid=True,
-                            tickmode='array',
-                            tickvals=[0, 1],
-                            ticktext=['0', '1'],
-                            range=[-0.1, 1.1],
-                            tickfont=dict(color='black')
-                        ),
-                        hovermode='x unified',
-                        plot_bgcolor='white',
-                        paper_bgcolor='white'
+            subtitle = f"{env_display_name} ({len(env_instances)} servidor{'es' if len(env_instances) > 1 else ''})"
+            sections.append({
+                'environment': env_display_name,
+                'subtitle': subtitle,
+                'instances': env_instances,
+                'results': [None] * len(env_instances)  # chart tuple per position (None without data)
+            })
+
+        total = sum(len(section['instances']) for section in sections)
+        if total == 0:
+            return ReportResult(title=title_text, built_at=time.time())
+
+        # One batched GetMetricData request per account/region target
+        instances_by_service = defaultdict(list)
+        for section in sections:
+            for position, instance_data in enumerate(section['instances']):
+                service = self.inventory.service_for(instance_data['ID'])
+                instances_by_service[service].append((section, position, instance_data))
+
+        # Progress follows the GetMetricData windows of every batch, weighted by its instances
+        fetched = {}  # AWSService -> instances of its batch fetched (fraction of its windows done)
+        progress_lock = threading.Lock()
+
+        def batch_progress(service, instance_count):
+            def progress(windows_done, windows_total):
+                with progress_lock:
+                    fetched[service] = windows_done / windows_total * instance_count
+                    job.set_progress(sum(fetched.values()) / total)
+            return progress
+
+        job.set_progress(0.0, f"Obteniendo datos de ping: 0/{total} servidores")
+        futures = {
+            self.report_executor.submit(
+                self._get_ping_metrics_batch, service, [item[2] for item in items],
+                start_datetime, end_datetime, period, batch_progress(service, len(items))
+            ): (service, items)
+            for service, items in instances_by_service.items()
+        }
+
+        done = 0
+        errors = []
+        try:
+            for future in as_completed(futures):
+                try:
+                    frame = future.result()
+                except Exception as e:
+                    logger.warning("Ping batch of %d instances failed: %s", len(futures[future][1]), e)
+                    errors.append(f"{futures[future][0].target_name}: {e}")
+                    frame = pd.DataFrame(columns=['InstanceId', 'Timestamp', 'Maximum'])
+                series_by_instance = {
+                    instance_id: df.drop(columns='InstanceId').reset_index(drop=True)
+                    for instance_id, df in frame.groupby('InstanceId', sort=False)
+                }
+
+                service, items = futures[future]
+                for section, position, instance_data in items:
+                    df = series_by_instance.get(instance_data['ID'], pd.DataFrame())
+                    section['results'][position] = self._build_ping_chart(
+                        service, instance_data, df, start_datetime, end_datetime, period
                     )
+                done += len(items)
+                with progress_lock:
+                    # Batches served from the metric store have no windows to report
+                    fetched[service] = len(items)
+                    job.set_progress(sum(fetched.values()) / total,
+                                     f"Obteniendo datos de ping: {done}/{total} servidores")
+        finally:
+            # A failed job must not leave its queued batches on the shared pool
+            for future in futures:
+                future.cancel()
+
+        return self._build_report_result(
+            job, title_text,
+            [
+                (section['environment'], section['subtitle'],
+                 [chart_data for chart_data in section['results'] if chart_data is not None])
+                for section in sections
+            ],
+            start_date, end_date, pdf_prefix='Ping_Report', pdf_units=('servidor', 'servidores'), line_color='#1f77b4',
+            errors=errors
+        )
 
-                    # Store chart data for this section
-                    section_charts_data.append((instance_name, availability_percentage, fig))
-
-            # Display charts for this environment in a 4-column grid
-            if section_charts_data:
-                num_charts = len(section_charts_data)
-                cols_per_row = 4
-
-                # Create rows with 4 columns each
-                for row_start in range(0, num_charts, cols_per_row):
-                    cols = st.columns(cols_per_row)
-                    row_charts = section_charts_data[row_start:row_start + cols_per_row]
-
-                    for col_idx, (inst_name, avail_pct, chart_fig) in enumerate(row_charts):
-                        with cols[col_idx]:
-                            st.plotly_chart(chart_fig, use_container_width=True)
+    def _build_availability_percentage(self, job, start_date, end_date):
+        """
+        Build the availability percentage of every server (PingReachable) and SAP service
+        (heartbeat metrics) for the selected period, as one table per environment
+        (runs on the job queue).
+
+        CloudWatch returns Sum and SampleCount buckets instead of raw datapoints, and the
+        scheduled downtime of the Schedule tag is excluded per bucket (see
+        AvailabilityCalculator.calculate_availability_from_counts). Closed days are summed
+        from their daily rollups, so quarters and years cost little more than a month.
+        Returns the ReportResult of the built report.
+        """
+        # Title
+        title_text = f"Porcentaje de Disponibilidad Desde {start_date.strftime('%d/%m/%Y')} hasta {end_date.strftime('%d/%m/%Y')}"
 
-                # Add all section charts to the global list for PDF
-                all_charts_data.extend(section_charts_data)
+        # Convert dates to datetime objects with time
+        start_datetime = datetime.combine(start_date, datetime.min.time())
+        end_datetime = datetime.combine(end_date, datetime.max.time())
 
-                # Add spacing between environment sections
-                st.markdown("---")
+        environments = [
+            ('Production', 'Producción'),
+            ('QA', 'QA'),
+            ('DEV', 'Desarrollo')
+        ]
 
-        # Show PDF download button at the end if we have charts
-        if len(all_charts_data) > 0:
-            st.markdown("---")
-
-            # Generate PDF with spinner
-            with st.spinner(f"Preparando informe PDF con {len(all_charts_data)} servidor{'es' if len(all_charts_data) != 1 else ''}..."):
-                pdf_buffer = self._generate_pdf_report(all_charts_data, start_date, end_date)
-                filename = f"Ping_Report_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.pdf"
-
-            # Show download button in centered column
-            col1, col2, col3 = st.columns([2, 1, 2])
-            with col2:
-                st.download_button(
-                    label="📄 Descargar PDF",
-                    data=pdf_buffer,
-                    file_name=filename,
-                    mime="application/pdf",
-                    use_container_width=True,
-                    type="primary"
-                )
+        # One table row per series, in display order; series are grouped by target
+        rows = []  # (environment, server, service, schedule tag, (AWSService, query Key))
+        series_by_service = defaultdict(list)
+        job.set_progress(0.0, "Obteniendo servidores y métricas de disponibilidad...")
+        for env_tag, env_display_name in environments:
+            for instance_data in self._get_instances_by_environment(env_tag):
+                schedule_tag = instance_data['Schedule']
+                aws_service = self.inventory.service_for(instance_data['ID'])
+                for service_name, query in availability_series(aws_service, instance_data, env_tag):
+                    rows.append((env_display_name, instance_data['Name'], service_name, schedule_tag,
+                                 (aws_service, query['Key'])))
+                    series_by_service[aws_service].append((query, schedule_tag))
+
+        # One batch per target, collected concurrently on the shared report pool
+        results = {}
+        job.set_progress(0.0, f"Calculando disponibilidad de {len(rows)} series...")
+        futures = {
+            self.report_executor.submit(AvailabilityRollups(aws_service).get_availability, series,
+                            start_datetime, end_datetime, raise_errors=True): aws_service
+            for aws_service, series in series_by_service.items()
+        }
+        errors = []
+        for done, future in enumerate(as_completed(futures), start=1):
+            aws_service = futures[future]
+            try:
+                for key, availability_stats in future.result().items():
+                    results[(aws_service, key)] = availability_stats
+            except Exception as e:
+                logger.warning("Availability of %s failed: %s", aws_service.target_name, e)
+                errors.append(f"{aws_service.target_name}: {e}")
+            job.set_progress(done / len(futures))
+
+        table_rows = []
+        for env_display_name, instance_name, service_name, schedule_tag, series_key in rows:
+            availability_stats = results.get(series_key)
+            # Skip silently if no data
+            if availability_stats is None:
+                continue
+            table_rows.append({
+                'Entorno': env_display_name,
+                'Servidor': instance_name,
+                'Servicio': service_name,
+                'Schedule': schedule_tag or '',
+                # Scheduled availability percentage (excludes scheduled downtime)
+                'Disponibilidad (%)': round(availability_stats['scheduled_availability_percentage'], 2)
+            })
+
+        table = pd.DataFrame(
+            table_rows, columns=['Entorno', 'Servidor', 'Servicio', 'Schedule', 'Disponibilidad (%)']
+        )
+        return ReportResult(title=title_text, table=table, built_at=time.time(), errors=tuple(errors))
 
-    def _display_availability_metrics(self, start_date, end_date):
-        """Display SAP availability metrics for the selected period organized by environment."""
+    def _build_availability_report(self, job, start_date, end_date):
+        """
+        Build the SAP availability charts of the selected period organized by environment
+        (runs on the job queue).
+        Returns the ReportResult of the built report.
+        """
         # Title
         title_text = f"Métricas de Availability (SAP) Desde {start_date.strftime('%d/%m/%Y')} hasta {end_date.strftime('%d/%m/%Y')}"
-        st.markdown(f"### {title_text}")
 
         # Convert dates to datetime objects with time
         start_datetime = datetime.combine(start_date, datetime.min.time())
@@ -574,8 +1008,8 @@ class MonthlyReportUI:
         # Calculate optimal period once (same for all instances) - 15 min for availability
         period = 900  # Availability metrics use 15-minute intervals
 
-        # We'll store chart data for PDF generation (all environments)
-        all_charts_data = []
+        # Charts of every environment, for the PDF and the report cache
+        sections = []
 
         # Process each environment in order: Production, QA, DEV
         environments = [
@@ -584,17 +1018,21 @@ class MonthlyReportUI:
             ('DEV', 'Desarrollo')
         ]
 
-        for env_tag, env_display_name in environments:
-            # Get instances for this environment
-            with st.spinner(f"Obteniendo servidores de {env_display_name}..."):
-                env_instances = self._get_instances_by_environment(env_tag)
+        job.set_progress(0.0, "Obteniendo servidores...")
+        instances_by_environment = [
+            (env_tag, env_display_name, self._get_instances_by_environment(env_tag))
+            for env_tag, env_display_name in environments
+        ]
+        total = sum(len(env_instances) for _, _, env_instances in instances_by_environment)
+        done = 0
+        errors = []
 
+        for env_tag, env_display_name, env_instances in instances_by_environment:
             # Skip if no instances found
             if not env_instances:
                 continue
 
-            # Display section subtitle
-            st.markdown(f"#### {env_display_name} ({len(env_instances)} servidor{'es' if len(env_instances) > 1 else ''})")
+            subtitle = f"{env_display_name} ({len(env_instances)} servidor{'es' if len(env_instances) > 1 else ''})"
 
             # Store charts for this environment section
             section_charts_data = []
@@ -604,13 +1042,16 @@ class MonthlyReportUI:
                 instance_id = instance_data['ID']
                 instance_name = instance_data['Name']
                 schedule_tag = instance_data['Schedule']
+                aws_service = self.inventory.service_for(instance_id)
+
+                job.set_progress(done / total, f"Obteniendo métricas de {instance_name} ({done + 1}/{total})...")
+                done += 1
 
                 # Get all availability metrics for this instance
-                with st.spinner(f"Obteniendo métricas de {instance_name}..."):
-                    availability_metrics = self.aws_service.get_availability_metrics_for_instance(
-                        instance_id=instance_id,
-                        environment=env_tag
-                    )
+                availability_metrics = aws_service.get_availability_metrics_for_instance(
+                    instance_id=instance_id,
+                    environment=env_tag
+                )
 
                 # Skip if no availability metrics found
                 if not availability_metrics:
@@ -628,14 +1069,19 @@ class MonthlyReportUI:
                         namespace = 'SAP_Monitoring_Availability'
 
                     # Get metric data
-                    df = self.aws_service.get_availability_metric_data(
-                        namespace=namespace,
-                        metric_name=metric_name,
-                        dimensions=dimensions,
-                        start_time=start_datetime,
-                        end_time=end_datetime,
-                        period=period
-                    )
+                    try:
+                        df = aws_service.get_availability_metric_data(
+                            namespace=namespace,
+                            metric_name=metric_name,
+                            dimensions=dimensions,
+                            start_time=start_datetime,
+                            end_time=end_datetime,
+                            period=period,
+                            raise_errors=True
+                        )
+                    except Exception as e:
+                        errors.append(f"{instance_name} {metric_name}: {e}")
+                        continue
 
                     # Skip silently if no data
                     if df.empty:
@@ -644,110 +1090,43 @@ class MonthlyReportUI:
                     # Calculate availability using the AvailabilityCalculator
                     stat_column = 'Maximum' if 'Maximum' in df.columns else 'Average'
 
-                    availability_stats = AvailabilityCalculator.calculate_availability(
-                        df=df,
-                        schedule_tag=schedule_tag,
+                    query = {
+                        'Namespace': namespace,
+                        'MetricName': metric_name,
+                        'Dimensions': dimensions,
+                        'Stat': 'Maximum',
+                        'Period': period
+                    }
+                    availability_stats = self._calculate_availability(
+                        aws_service, query, df, schedule_tag, start_datetime, end_datetime,
                         value_column=stat_column
                     )
 
                     # Use scheduled availability percentage (excludes scheduled downtime)
                     availability_percentage = availability_stats['scheduled_availability_percentage']
 
-                    # Extract service name from metric name (e.g., ERQ_ASCS01 from SRVERPQA_ERQ_ASCS01_heartbeat)
-                    # Format: {ServerName}_{System}_{Service}_heartbeat
-                    service_name = metric_name.replace('_heartbeat', '').replace(f'{instance_name}_', '').replace(f'{instance_name}-', '')
-                    if not service_name or service_name == metric_name:
-                        # Fallback if pattern doesn't match
-                        service_name = metric_name.split('_')[0] if '_' in metric_name else metric_name
+                    service_name = sap_service_name(metric_name, instance_name)
 
                     # Format title string
                     chart_title = "{} - {} - Disp: {:.1f}%".format(instance_name, service_name, availability_percentage)
 
-                    # Create plotly line chart
-                    fig = go.Figure()
-
-                    fig.add_trace(go.Scatter(
-                        x=df['Timestamp'],
-                        y=df[stat_column],
-                        mode='lines+markers',
-                        name='Availability Status',
-                        line=dict(color='#2ca02c', width=2),  # Green color for availability
-                        marker=dict(size=4),
-                        hovertemplate='<b>Fecha:</b> %{x|%d/%m/%Y %H:%M}<br><b>Estado:</b> %{y}<extra></extra>'
-                    ))
-
-                    # Configure layout for binary data (0 or 1)
-                    fig.update_layout(
-                        title=dict(
-                            text=chart_title,
-                            x=0.5,
-                            xanchor='center',
-                            font=dict(size=14, family='Arial, sans-serif', color='black')
-                        ),
-                        height=300,
-                        margin=dict(l=30, r=20, t=50, b=40),
-                        xaxis=dict(
-                            title="",
-                            gridcolor='lightgray',
-                            showgrid=True,
-                            tickfont=dict(color='black'),
-                            range=[start_datetime, end_datetime]
-                        ),
-                        yaxis=dict(
-                            title="",
-                            gridcolor='lightgray',
-                            showgrid=True,
-                            tickmode='array',
-                            tickvals=[0, 1],
-                            ticktext=['0', '1'],
-                            range=[-0.1, 1.1],
-                            tickfont=dict(color='black')
-                        ),
-                        hovermode='x unified',
-                        plot_bgcolor='white',
-                        paper_bgcolor='white'
+                    # Step line of the state transitions (a few vertices instead of every datapoint)
+                    intervals = encode_intervals(df['Timestamp'], df[stat_column], period)
+                    fig = self._build_step_figure(
+                        intervals, chart_title, start_datetime, end_datetime,
+                        name='Availability Status', line_color='#2ca02c', title_size=14  # Green color for availability
                     )
 
                     # Store chart data for this section
-                    section_charts_data.append((f"{instance_name} - {service_name}", availability_percentage, fig))
-
-            # Display charts for this environment in a 4-column grid
-            if section_charts_data:
-                num_charts = len(section_charts_data)
-                cols_per_row = 4
-
-                # Create rows with 4 columns each
-                for row_start in range(0, num_charts, cols_per_row):
-                    cols = st.columns(cols_per_row)
-                    row_charts = section_charts_data[row_start:row_start + cols_per_row]
-
-                    for col_idx, (service_label, avail_pct, chart_fig) in enumerate(row_charts):
-                        with cols[col_idx]:
-                            st.plotly_chart(chart_fig, use_container_width=True)
-
-                # Add all section charts to the global list for PDF
-                all_charts_data.extend(section_charts_data)
+                    section_charts_data.append((
+                        f"{instance_name} - {service_name}", availability_percentage, fig, intervals
+                    ))
 
-                # Add spacing between environment sections
-                st.markdown("---")
+            sections.append((env_display_name, subtitle, section_charts_data))
 
-        # Show PDF download button at the end if we have charts
-        if len(all_charts_data) > 0:
-            st.markdown("---")
-
-            # Generate PDF with spinner
-            with st.spinner(f"Preparando informe PDF con {len(all_charts_data)} métrica{'s' if len(all_charts_data) != 1 else ''}..."):
-                pdf_buffer = self._generate_pdf_report(all_charts_data, start_date, end_date)
-                filename = f"Availability_Report_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.pdf"
-
-            # Show download button in centered column
-            col1, col2, col3 = st.columns([2, 1, 2])
-            with col2:
-                st.download_button(
-                    label="📄 Descargar PDF",
-                    data=pdf_buffer,
-                    file_name=filename,
-                    mime="application/pdf",
-                    use_container_width=True,
-                    type="primary"
-                )
+        job.set_progress(1.0)
+        return self._build_report_result(
+            job, title_text, sections, start_date, end_date,
+            pdf_prefix='Availability_Report', pdf_units=('métrica', 'métricas'), line_color='#2ca02c',
+            errors=errors
+        )
@@ -0,0 +1,72 @@
+"""
+Alarm Index - Maps CloudWatch alarms to instances with dictionary lookups.
+"""
+from collections import defaultdict
+from typing import Dict, List
+
+
+class AlarmIndex:
+    """
+    Inverted index of CloudWatch alarms by the dimensions used to attach them to instances.
+
+    Built once per sweep in O(alarms × dimensions). Each lookup then costs O(matches)
+    instead of scanning every alarm for every instance.
+    """
+
+    def __init__(self, alarms: List[Dict]):
+        """
+        Build the index.
+
+        Args:
+            alarms: List of MetricAlarm dictionaries as returned by describe_alarms
+        """
+        self._alarms = list(alarms)
+        self._by_instance_id = defaultdict(list)
+        self._by_server = defaultdict(list)
+
+        for position, alarm in enumerate(self._alarms):
+            for dimension in alarm.get('Dimensions', []):
+                name = dimension.get('Name')
+                value = dimension.get('Value', '')
+
+                # 1. InstanceId dimension (most reliable - covers 778/841 alarms)
+                if name == 'InstanceId':
+                    self._add(self._by_instance_id[value], position)
+
+                # 2. Server dimension for SSM/Composite alarms (covers remaining 63/841 alarms)
+                elif name == 'Server':
+                    self._add(self._by_server[value.upper()], position)
+
+    @staticmethod
+    def _add(positions: List[int], position: int):
+        """Append a position once, even if the alarm repeats the same dimension."""
+        if not positions or positions[-1] != position:
+            positions.append(position)
+
+    def __len__(self) -> int:
+        return len(self._alarms)
+
+    def alarms_for_instance(self, instance_id: str, instance_name: str) -> List[Dict]:
+        """
+        Get the alarms that belong to an instance.
+
+        An alarm belongs to the instance if its InstanceId dimension equals the instance ID
+        or its Server dimension equals the instance name (case insensitive). Alarms are
+        returned once, in the same order as the list the index was built from.
+
+        Args:
+            instance_id: EC2 Instance ID
+            instance_name: Value of the instance's Name tag
+
+        Returns:
+            List of alarm dictionaries
+        """
+        by_id = self._by_instance_id.get(instance_id, [])
+        by_server = self._by_server.get(instance_name.upper(), [])
+
+        if by_id and by_server:
+            positions = sorted(set(by_id).union(by_server))
+        else:
+            positions = by_id or by_server
+
+        return [self._alarms[position] for position in positions]
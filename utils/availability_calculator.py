@@ -2,12 +2,16 @@
 Availability Calculator - Handles availability percentage calculations considering schedules.
 """
 from datetime import datetime, time, timedelta
+import numpy as np
 import pandas as pd
 
 
 class AvailabilityCalculator:
     """Calculate availability percentages considering scheduled downtimes."""
 
+    # Counts that add up across days (daily rollups); every percentage is derived from them
+    ROLLUP_COUNTS = ('total_points', 'available_points', 'scheduled_downtime_points', 'unscheduled_downtime_points')
+
     SCHEDULES = {
         'Weekends': {
             'description': 'Powered off from Friday 21:00 to Monday 10:00',
@@ -220,6 +224,123 @@ class AvailabilityCalculator:
             'scheduled_availability_percentage': scheduled_availability_percentage
         }
 
+    @staticmethod
+    def calculate_availability_from_counts(df: pd.DataFrame, schedule_tag: str = None,
+                                           available_column: str = 'Sum',
+                                           total_column: str = 'SampleCount') -> dict:
+        """
+        Calculate availability from CloudWatch-aggregated buckets instead of raw datapoints.
+
+        Each row is one bucket of a 0/1 series: its number of samples (SampleCount
+        statistic) and how many of them were 1 (Sum statistic). Scheduled downtime is
+        decided per bucket with the same schedule rules as calculate_availability, so
+        buckets of scheduled series must be at most one hour long (every schedule
+        boundary is a whole hour).
+
+        Args:
+            df: DataFrame with 'Timestamp' (bucket start), available and total columns
+            schedule_tag: Schedule tag value (e.g., 'Weekends', 'Nights', 'BusinessHours')
+            available_column: Column with the number of samples equal to 1
+            total_column: Column with the number of samples
+
+        Returns:
+            Same dictionary as calculate_availability, counting samples instead of datapoints
+        """
+        if df.empty:
+            return AvailabilityCalculator.calculate_availability(df)
+
+        available = df[available_column].to_numpy(dtype=float)
+        total = df[total_column].to_numpy(dtype=float)
+
+        if schedule_tag in AvailabilityCalculator.SCHEDULES:
+            is_scheduled_downtime = AvailabilityCalculator.SCHEDULES[schedule_tag]['is_scheduled_downtime']
+            # The schedule rules compare naive datetimes (UTC)
+            timestamps = pd.to_datetime(df['Timestamp'], utc=True).dt.tz_localize(None)
+            scheduled = np.fromiter(
+                (is_scheduled_downtime(ts.to_pydatetime()) for ts in timestamps), dtype=bool, count=len(df)
+            )
+        else:
+            scheduled = np.zeros(len(df), dtype=bool)
+
+        return AvailabilityCalculator.stats_from_counts(
+            total_points=int(round(total.sum())),
+            available_points=int(round(available.sum())),
+            scheduled_downtime_points=int(round(total[scheduled].sum())),
+            unscheduled_downtime_points=int(round((total - available)[~scheduled].sum()))
+        )
+
+    @staticmethod
+    def stats_from_counts(total_points: int, available_points: int, scheduled_downtime_points: int,
+                          unscheduled_downtime_points: int) -> dict:
+        """
+        Build the calculate_availability dictionary from its ROLLUP_COUNTS.
+
+        Every point outside scheduled downtime is either available or unscheduled
+        downtime, so the scheduled availability can be derived from the four counts.
+
+        Returns:
+            Same dictionary as calculate_availability
+        """
+        non_scheduled_points = total_points - scheduled_downtime_points
+        available_during_non_scheduled = non_scheduled_points - unscheduled_downtime_points
+        return {
+            'total_points': total_points,
+            'available_points': available_points,
+            'unavailable_points': total_points - available_points,
+            'scheduled_downtime_points': scheduled_downtime_points,
+            'unscheduled_downtime_points': unscheduled_downtime_points,
+            'availability_percentage': (available_points / total_points * 100) if total_points > 0 else 0.0,
+            'scheduled_availability_percentage': (
+                (available_during_non_scheduled / non_scheduled_points * 100)
+                if non_scheduled_points > 0 else 0.0
+            )
+        }
+
+    @staticmethod
+    def combine_availability(results: list) -> dict:
+        """
+        Add up calculate_availability results (or rollup rows) of consecutive ranges.
+
+        Args:
+            results: Dictionaries with at least the ROLLUP_COUNTS keys
+
+        Returns:
+            Same dictionary as calculate_availability for the whole range
+        """
+        return AvailabilityCalculator.stats_from_counts(**{
+            count: sum(int(result[count]) for result in results)
+            for count in AvailabilityCalculator.ROLLUP_COUNTS
+        })
+
+    @staticmethod
+    def calculate_daily_availability(df: pd.DataFrame, schedule_tag: str = None,
+                                     value_column: str = 'Maximum', from_counts: bool = False) -> dict:
+        """
+        Calculate availability separately for every UTC day of a series (rollup rows).
+
+        Args:
+            df: DataFrame with 'Timestamp' and value columns (see calculate_availability), or
+                Sum and SampleCount columns if from_counts (see calculate_availability_from_counts)
+            schedule_tag: Schedule tag value
+            value_column: Column name containing the metric value (raw datapoints only)
+            from_counts: True if the rows are aggregated buckets instead of raw datapoints
+
+        Returns:
+            Dict epoch day number -> calculate_availability dictionary (days without rows are missing)
+        """
+        if df.empty:
+            return {}
+
+        timestamps = pd.to_datetime(df['Timestamp'], utc=True)
+        days = ((timestamps - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(days=1)).to_numpy()
+        daily = {}
+        for day, day_df in df.groupby(days, sort=True):
+            if from_counts:
+                daily[int(day)] = AvailabilityCalculator.calculate_availability_from_counts(day_df, schedule_tag)
+            else:
+                daily[int(day)] = AvailabilityCalculator.calculate_availability(day_df, schedule_tag, value_column)
+        return daily
+
     @staticmethod
     def get_schedule_description(schedule_tag: str) -> str:
         """
@@ -0,0 +1,112 @@
+"""
+Debug logging pipeline: queued, size-rotated file output plus an in-memory tail for the UI.
+"""
+import atexit
+import logging
+import queue
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List
+
+LOG_FILE_PATH = "/tmp/streamlit_aws_debug.log"
+LOG_MAX_BYTES = 5 * 1024 * 1024  # 5 MB per file
+LOG_BACKUP_COUNT = 3
+RING_BUFFER_LINES = 1000
+
+ROOT_LOGGER_NAME = "dashboard"
+LOG_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
+
+_setup_lock = threading.Lock()
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent formatted log lines in a bounded deque."""
+
+    def __init__(self, capacity: int = RING_BUFFER_LINES):
+        """Initialize with the maximum number of lines to keep."""
+        super().__init__()
+        self._lines = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        """Store the formatted record (the oldest line is dropped when full)."""
+        try:
+            self._lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def get_lines(self, max_lines: int = None) -> List[str]:
+        """Return up to max_lines of the most recent lines, oldest first."""
+        lines = list(self._lines)
+        if max_lines is not None:
+            lines = lines[-max_lines:]
+        return lines
+
+
+def setup_logging(level="INFO") -> logging.Logger:
+    """
+    Configure the dashboard logger once per process.
+
+    Callers only put records on a queue (QueueHandler); a background QueueListener
+    thread writes them to a size-rotated file and to the in-memory ring buffer, so
+    request threads never block on file I/O. Calling it again only updates the level.
+
+    Args:
+        level: Logging level name or number (e.g. 'DEBUG', 'INFO')
+
+    Returns:
+        The root dashboard logger
+    """
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+
+    with _setup_lock:
+        logger.setLevel(level)
+        if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            return logger
+
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        file_handler = RotatingFileHandler(
+            LOG_FILE_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+
+        ring_buffer = RingBufferHandler(RING_BUFFER_LINES)
+        ring_buffer.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        # Keep a reference so the UI can find the buffer even if this module is reloaded
+        queue_handler.ring_buffer = ring_buffer
+
+        listener = QueueListener(log_queue, file_handler, ring_buffer, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a child of the dashboard logger (e.g. get_logger('aws_service'))."""
+    setup_logging_if_needed()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def setup_logging_if_needed():
+    """Set up logging with the default level unless it was already configured."""
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    if not any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+        setup_logging()
+
+
+def get_recent_log_lines(max_lines: int = 200) -> List[str]:
+    """Return the most recent log lines from the in-memory ring buffer."""
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in logger.handlers:
+        ring_buffer = getattr(handler, 'ring_buffer', None)
+        if ring_buffer is not None:
+            return ring_buffer.get_lines(max_lines)
+    return []
@@ -0,0 +1,141 @@
+"""
+PDF Charts - Native ReportLab (vector) drawings of the binary 0/1 availability charts of the PDF reports.
+"""
+import calendar
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import repeat
+from typing import List
+import numpy as np
+from reportlab.graphics.shapes import Drawing, Line, PolyLine, Rect, String
+from reportlab.lib import colors
+from utils.state_intervals import StateIntervals, step_points
+
+
+# Plot area margins inside the drawing, in points
+MARGIN_LEFT = 14
+MARGIN_RIGHT = 6
+MARGIN_TOP = 16
+MARGIN_BOTTOM = 14
+
+# Same y range as the Plotly charts of the UI
+Y_MIN = -0.1
+Y_MAX = 1.1
+
+X_TICKS = 4
+
+
+def create_binary_step_chart(title: str, intervals: StateIntervals, start: datetime, end: datetime,
+                             width: float, height: float, line_color: str = '#1f77b4') -> Drawing:
+    """
+    Draw a 0/1 series as a vector step line, styled like the Plotly charts of the UI.
+
+    Args:
+        title: Chart title (e.g. 'SRVERPPRD - Disp: 99.8%')
+        intervals: State intervals of the series (see utils.state_intervals)
+        start: Start of the x axis (naive values are UTC)
+        end: End of the x axis
+        width: Drawing width in points
+        height: Drawing height in points
+        line_color: Hex color of the line
+
+    Returns:
+        ReportLab Drawing, usable as a flowable (e.g. in a Table cell)
+    """
+    drawing = Drawing(width, height)
+    plot_left = MARGIN_LEFT
+    plot_bottom = MARGIN_BOTTOM
+    plot_width = width - MARGIN_LEFT - MARGIN_RIGHT
+    plot_height = height - MARGIN_TOP - MARGIN_BOTTOM
+
+    x_start = calendar.timegm(start.utctimetuple())
+    x_end = max(calendar.timegm(end.utctimetuple()), x_start + 1)
+
+    def to_x(seconds):
+        return plot_left + (seconds - x_start) / (x_end - x_start) * plot_width
+
+    def to_y(value):
+        return plot_bottom + (value - Y_MIN) / (Y_MAX - Y_MIN) * plot_height
+
+    drawing.add(String(width / 2, height - MARGIN_TOP + 5, title, textAnchor='middle',
+                       fontName='Helvetica-Bold', fontSize=7, fillColor=colors.black))
+    drawing.add(Rect(plot_left, plot_bottom, plot_width, plot_height,
+                     strokeColor=colors.lightgrey, strokeWidth=0.5, fillColor=colors.white))
+
+    # Horizontal grid and labels at 0 and 1
+    for value in (0, 1):
+        y = to_y(value)
+        drawing.add(Line(plot_left, y, plot_left + plot_width, y, strokeColor=colors.lightgrey, strokeWidth=0.5))
+        drawing.add(String(plot_left - 3, y - 2, str(value), textAnchor='end', fontSize=5.5, fillColor=colors.black))
+
+    # Vertical grid with date labels (hours for ranges of up to two days)
+    label_format = '%H:%M' if x_end - x_start <= 2 * 86400 else '%d/%m'
+    for tick in range(X_TICKS + 1):
+        seconds = x_start + (x_end - x_start) * tick / X_TICKS
+        x = to_x(seconds)
+        drawing.add(Line(x, plot_bottom, x, plot_bottom + plot_height, strokeColor=colors.lightgrey, strokeWidth=0.5))
+        label = datetime.utcfromtimestamp(seconds).strftime(label_format)
+        drawing.add(String(x, plot_bottom - 8, label, textAnchor='middle', fontSize=5.5, fillColor=colors.black))
+
+    # One polyline per stretch of the series without missing datapoints
+    step_x, step_y = step_points(intervals)
+    step_x = np.clip(step_x, x_start, x_end)
+    for segment in np.split(np.arange(len(step_x)), np.flatnonzero(np.isnan(step_y))):
+        segment = segment[~np.isnan(step_y[segment])]
+        if len(segment) < 2:
+            continue
+        points = np.column_stack((to_x(step_x[segment]), to_y(step_y[segment]))).ravel().tolist()
+        drawing.add(PolyLine(points, strokeColor=colors.HexColor(line_color), strokeWidth=0.8))
+
+    return drawing
+
+
+def _rasterize_figure(figure_json: str, width: int, height: int) -> bytes:
+    """Render one Plotly figure (JSON) to PNG bytes; runs in a ChartRasterPool worker process."""
+    import plotly.io as pio
+    return pio.from_json(figure_json).to_image(format='png', width=width, height=height)
+
+
+class ChartRasterPool:
+    """
+    Process pool that rasterizes Plotly figures to PNG for the PDF reports.
+
+    Optional alternative to the native charts, for pixel-identical Plotly images; it
+    needs kaleido (and Chromium) installed, which the default deployment no longer has.
+    Figures travel as JSON and PNG bytes come back, so the work scales with the CPU
+    cores instead of running one figure at a time in the script thread. The worker
+    processes are started once and reused by every report.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        Initialize the pool.
+
+        Args:
+            max_workers: Worker processes (defaults to the number of CPU cores)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # spawn: forking the multi-threaded Streamlit server process is not safe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def rasterize(self, figures: list, width: int, height: int) -> List[bytes]:
+        """
+        Render Plotly figures to PNG bytes, in parallel and in the original order.
+
+        Raises:
+            Exception: Any export error of a worker (e.g. kaleido or Chromium missing)
+        """
+        figure_jsons = [figure.to_json() for figure in figures]
+        try:
+            return list(self._executor.map(_rasterize_figure, figure_jsons, repeat(width), repeat(height)))
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start fresh workers for the next report
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            raise
@@ -0,0 +1,70 @@
+"""
+Report Cache - Process-wide cache of built monthly reports (charts, availability table and PDF bytes).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+import pandas as pd
+
+
+# Reports whose range includes days that are not closed yet are rebuilt after this
+DEFAULT_OPEN_RANGE_TTL = 300  # seconds
+
+DEFAULT_MAX_REPORTS = 20
+
+
+class ReportResult(NamedTuple):
+    """Everything a built report needs to be shown again without AWS calls."""
+    title: str
+    sections: tuple = ()  # (subtitle, charts) per environment; charts are (label, availability_percentage, fig, intervals)
+    table: Optional[pd.DataFrame] = None  # Entorno / Servidor (/ Servicio / Schedule) / Disponibilidad (%) rows
+    outages: Optional[pd.DataFrame] = None  # Entorno / Servidor / Inicio (UTC) / Fin (UTC) / Duración (min) rows
+    pdf_bytes: Optional[bytes] = None
+    pdf_filename: Optional[str] = None
+    built_at: float = 0.0
+    errors: tuple = ()  # Fetches that failed: the report is partial and only cached like an open range
+
+
+class ReportCache:
+    """
+    LRU cache of ReportResult keyed by (metric type, start date, end date, inventory version).
+
+    Shared by every session, so reruns (downloads, widget changes) and other users asking
+    for the same report reuse it. Reports of fully closed ranges never expire (they are
+    only evicted beyond max_entries); the others expire after their ttl.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_REPORTS):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (ReportResult, expires_at or None)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[ReportResult]:
+        """Get a cached report, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: tuple, result: ReportResult, ttl: Optional[float] = None):
+        """
+        Store a built report.
+
+        Args:
+            key: (metric type, start date, end date, inventory version)
+            result: The built report
+            ttl: Seconds the report stays valid (None for reports of closed ranges)
+        """
+        with self._lock:
+            self._entries[key] = (result, time.time() + ttl if ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
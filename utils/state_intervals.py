@@ -0,0 +1,99 @@
+"""
+State Intervals - Run-length encoding of binary (0/1) metric series into state-transition intervals.
+"""
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+
+class StateIntervals(NamedTuple):
+    """
+    Runs of consecutive equal values of a series, oldest first.
+
+    A month of 1-minute ping datapoints usually becomes a handful of runs, which is
+    all the charts (UI and PDF) and the outage tables need.
+    """
+    starts: np.ndarray  # Epoch seconds of the first datapoint of each run
+    ends: np.ndarray  # Epoch seconds where each run ends (exclusive)
+    values: np.ndarray  # Value of each run
+
+    @property
+    def count(self) -> int:
+        """Number of runs."""
+        return len(self.starts)
+
+
+def to_epoch_seconds(timestamps) -> np.ndarray:
+    """Convert timestamps (naive values are UTC) to float epoch seconds."""
+    timestamps = pd.to_datetime(pd.Series(timestamps), utc=True)
+    return ((timestamps - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+
+
+def encode_intervals(timestamps, values, period: int = None) -> StateIntervals:
+    """
+    Run-length encode a series into state intervals (vectorized).
+
+    A run ends where the value changes or, when the period is known, where datapoints
+    are missing (a gap longer than the period); the missing time belongs to no run.
+
+    Args:
+        timestamps: Sorted datapoint timestamps
+        values: Datapoint values (0 or 1)
+        period: Seconds covered by each datapoint (None: runs end at the next run or the last datapoint)
+
+    Returns:
+        StateIntervals of the series
+    """
+    x = to_epoch_seconds(timestamps)
+    y = np.asarray(values, dtype=float)
+    if len(x) == 0:
+        return StateIntervals(x, x.copy(), y)
+
+    breaks = y[1:] != y[:-1]
+    if period:
+        breaks |= np.diff(x) > period
+    first = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+    last = np.concatenate((first[1:] - 1, [len(x) - 1]))
+
+    next_starts = np.append(x[first[1:]], np.inf)
+    if period:
+        ends = np.minimum(x[last] + period, next_starts)
+    else:
+        ends = np.where(np.isinf(next_starts), x[last], next_starts)
+    return StateIntervals(x[first], ends, y[first])
+
+
+def step_points(intervals: StateIntervals):
+    """
+    Vertices of the step line of a series: two per run, with a NaN break before every gap.
+
+    Returns:
+        Tuple (x epoch seconds, y values) as NumPy arrays
+    """
+    if not intervals.count:
+        return np.empty(0), np.empty(0)
+
+    x = np.column_stack((intervals.starts, intervals.ends)).ravel()
+    y = np.repeat(intervals.values, 2)
+
+    # A run that does not start where the previous one ended leaves a gap in the line
+    gaps = np.flatnonzero(intervals.starts[1:] != intervals.ends[:-1]) + 1
+    x = np.insert(x, gaps * 2, intervals.ends[gaps - 1])
+    y = np.insert(y, gaps * 2, np.nan)
+    return x, y
+
+
+def outage_intervals(intervals: StateIntervals, down_value: float = 0) -> pd.DataFrame:
+    """
+    Outages (runs with the down value) of a series.
+
+    Returns:
+        DataFrame with Inicio (UTC), Fin (UTC) and Duración (min) columns
+    """
+    down = intervals.values == down_value
+    starts, ends = intervals.starts[down], intervals.ends[down]
+    return pd.DataFrame({
+        'Inicio (UTC)': pd.to_datetime(starts, unit='s', utc=True),
+        'Fin (UTC)': pd.to_datetime(ends, unit='s', utc=True),
+        'Duración (min)': np.round((ends - starts) / 60, 1)
+    })